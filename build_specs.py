@@ -0,0 +1,186 @@
+"""
+Compila todas las especificaciones del proyecto en paralelo.
+
+Por cada spec/yalfiles/<ruta>.yal se genera lexers/lexer-<n>.{json,pickle} y, si
+existe spec/yalpfiles/<ruta>.yalp, las tablas del parser en output/<ruta>/.
+Cada especificación se compila en un proceso distinto y se omiten las que ya
+están al día (salidas más nuevas que sus entradas y compiladas con las mismas
+opciones, que se anotan en output/<ruta>/build_options.txt).
+
+Uso:
+    python build_specs.py [ruta ...] [--force] [--lazy] [--keywords] [--graphs] [--jobs N]
+"""
+
+import contextlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, "lex"))
+sys.path.insert(0, os.path.join(ROOT, "yapar"))
+
+from yalex_parser import build_lexer, lexer_name  # noqa: E402
+from graph_render import start_render_queue, wait_for_renders  # noqa: E402
+from parser import build_parser_tables  # noqa: E402
+
+YAL_DIR = os.path.join(ROOT, "spec", "yalfiles")
+YALP_DIR = os.path.join(ROOT, "spec", "yalpfiles")
+LEXERS_DIR = os.path.join(ROOT, "lexers")
+OUTPUT_DIR = os.path.join(ROOT, "output")
+
+# Opciones con las que se compiló cada especificación: --keywords escribe el
+# mismo lexer-<n>.pickle que la compilación normal, así que las fechas no
+# alcanzan para saber si las salidas corresponden al modo pedido
+OPTIONS_STAMP = "build_options.txt"
+
+
+def discover_specs(routes=None) -> list:
+    """Retorna [(ruta, yal_path, yalp_path | None)] ordenado por nombre."""
+    specs = []
+    for name in sorted(os.listdir(YAL_DIR)):
+        route, ext = os.path.splitext(name)
+        if ext != ".yal" or (routes and route not in routes):
+            continue
+        yalp_path = os.path.join(YALP_DIR, route + ".yalp")
+        specs.append(
+            (
+                route,
+                os.path.join(YAL_DIR, name),
+                yalp_path if os.path.exists(yalp_path) else None,
+            )
+        )
+    return specs
+
+
+def is_up_to_date(outputs: list, inputs: list) -> bool:
+    """True si todas las salidas existen y son más nuevas que todas las entradas."""
+    for path in outputs:
+        if not os.path.exists(path):
+            return False
+    newest_input = max(os.path.getmtime(path) for path in inputs)
+    oldest_output = min(os.path.getmtime(path) for path in outputs)
+    return oldest_output >= newest_input
+
+
+def read_stamp(path: str):
+    """Contenido de un archivo de opciones, o None si no existe."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def build_spec(
+    route, yal_path, yalp_path, force=False, lazy=False, graphs=False, keywords=False
+):
+    """
+    Compila el lexer y, si corresponde, las tablas del parser de una especificación.
+    Se ejecuta en un proceso del pool; retorna (ruta, {etapa: segundos | None}).
+    Una etapa con None se omitió por estar al día.
+    """
+    timings = {}
+    if graphs:
+        start_render_queue()
+    suffix = "-lazy.pickle" if lazy else ".pickle"
+    dfa_pickle = os.path.join(LEXERS_DIR, lexer_name(route) + suffix)
+
+    # Lo que imprimen las etapas va al log de la especificación
+    spec_out = os.path.join(OUTPUT_DIR, route)
+    os.makedirs(spec_out, exist_ok=True)
+    stamp = os.path.join(spec_out, OPTIONS_STAMP)
+    options = f"lazy={int(lazy)} keywords={int(keywords)}\n"
+    if read_stamp(stamp) != options:
+        force = True
+    with open(os.path.join(spec_out, "build_log.txt"), "w", encoding="utf-8") as log:
+        with contextlib.redirect_stdout(log):
+            if not force and is_up_to_date([dfa_pickle], [yal_path]):
+                timings["lexer"] = None
+            else:
+                start = time.perf_counter()
+                build_lexer(
+                    yal_path,
+                    LEXERS_DIR,
+                    route,
+                    lazy=lazy,
+                    visualize=graphs,
+                    verbose=False,
+                    keywords=keywords,
+                )
+                timings["lexer"] = time.perf_counter() - start
+
+            if yalp_path is not None:
+                table_pickle = os.path.join(spec_out, "SLR", "slr_table.pickle")
+                rebuilt_lexer = timings["lexer"] is not None
+                if not force and not rebuilt_lexer and is_up_to_date(
+                    [table_pickle], [yalp_path, dfa_pickle]
+                ):
+                    timings["parser"] = None
+                else:
+                    start = time.perf_counter()
+                    build_parser_tables(yalp_path, dfa_pickle, spec_out, visualize=graphs)
+                    timings["parser"] = time.perf_counter() - start
+
+            with open(stamp, "w", encoding="utf-8") as f:
+                f.write(options)
+
+            if graphs:
+                start = time.perf_counter()
+                wait_for_renders()
+                timings["grafos"] = time.perf_counter() - start
+    return route, timings
+
+
+def format_timing(seconds) -> str:
+    return "al día" if seconds is None else f"{seconds:.2f}s"
+
+
+def main(argv: list) -> int:
+    force = "--force" in argv
+    lazy = "--lazy" in argv
+    keywords = "--keywords" in argv
+    graphs = "--graphs" in argv
+    jobs = None
+    routes = []
+    i = 0
+    while i < len(argv):
+        if argv[i] == "--jobs" and i + 1 < len(argv):
+            jobs = int(argv[i + 1])
+            i += 2
+            continue
+        if argv[i][:2] != "--":
+            routes.append(argv[i])
+        i += 1
+
+    specs = discover_specs(routes)
+    if not specs:
+        print("No se encontraron especificaciones.")
+        return 1
+
+    start = time.perf_counter()
+    failures = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(
+                build_spec, route, yal, yalp, force, lazy, graphs, keywords
+            ): route
+            for route, yal, yalp in specs
+        }
+        for future in as_completed(futures):
+            route = futures[future]
+            try:
+                _, timings = future.result()
+            except Exception as exc:  # se reporta y se sigue con las demás
+                failures += 1
+                print(f"[ERROR] {route}: {exc}")
+                continue
+            parts = [f"{stage} {format_timing(t)}" for stage, t in timings.items()]
+            print(f"[OK] {route}: " + ", ".join(parts))
+
+    print(f"Total: {len(specs)} especificaciones en {time.perf_counter() - start:.2f}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
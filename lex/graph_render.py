@@ -0,0 +1,113 @@
+import atexit
+import queue
+import threading
+
+# Cantidad de estados/nodos a partir de la cual los grafos se dibujan resumidos
+SUMMARY_THRESHOLD = 60
+# Resolución usada para los grafos resumidos (los detallados mantienen la suya)
+SUMMARY_DPI = "96"
+
+_jobs = None
+_worker = None
+render_errors = []
+
+
+def set_summary_threshold(size: int) -> None:
+    """Cambia el tamaño a partir del cual se usa la salida resumida."""
+    global SUMMARY_THRESHOLD
+    SUMMARY_THRESHOLD = size
+
+
+def should_summarize(size: int) -> bool:
+    return size > SUMMARY_THRESHOLD
+
+
+def _work():
+    while True:
+        job = _jobs.get()
+        try:
+            if job is None:
+                return
+            dot, output_path, kwargs = job
+            try:
+                dot.render(output_path, **kwargs)
+            except Exception as exc:  # graphviz ausente, ruta inválida, etc.
+                render_errors.append((output_path, exc))
+                print(f"[WARN] No se pudo renderizar {output_path}: {exc}")
+        finally:
+            _jobs.task_done()
+
+
+def start_render_queue() -> None:
+    """
+    Activa la cola de renderizado: a partir de aquí render_graph() solo encola
+    el grafo y un hilo en segundo plano ejecuta Graphviz mientras la
+    compilación continúa. Sin activarla, render_graph() renderiza en el acto.
+    """
+    global _jobs, _worker
+    if _worker is not None:
+        return
+    _jobs = queue.Queue()
+    _worker = threading.Thread(target=_work, name="graph-render", daemon=True)
+    _worker.start()
+    atexit.register(stop_render_queue)
+
+
+def wait_for_renders() -> None:
+    """Bloquea hasta que todos los grafos encolados estén renderizados."""
+    if _jobs is not None:
+        _jobs.join()
+
+
+def stop_render_queue() -> None:
+    """Espera los renderizados pendientes y detiene el hilo de la cola."""
+    global _jobs, _worker
+    if _worker is None:
+        return
+    _jobs.put(None)
+    _worker.join()
+    _jobs = None
+    _worker = None
+
+
+def render_graph(dot, output_path: str, **kwargs) -> None:
+    """Renderiza `dot` en `output_path`, en segundo plano si la cola está activa."""
+    if _worker is None:
+        dot.render(output_path, **kwargs)
+    else:
+        _jobs.put((dot, output_path, kwargs))
+
+
+def _code_label(code: int) -> str:
+    ch = chr(code)
+    if ch == "\\" or ch == "]" or ch == "-":
+        return "\\" + ch
+    if 33 <= code <= 126:
+        return ch
+    return f"\\{code}"
+
+
+def char_class_label(symbols) -> str:
+    """
+    Colapsa los símbolos de varias transiciones en una etiqueta de clase:
+    ["48", "49", ..., "57", "97"] → "[0-9a]". Los símbolos que no son
+    códigos ASCII se agregan al final tal cual.
+    """
+    codes = sorted({int(s) for s in symbols if s.isdigit()})
+    others = sorted({s for s in symbols if not s.isdigit()})
+    parts = []
+    i = 0
+    while i < len(codes):
+        j = i
+        while j + 1 < len(codes) and codes[j + 1] == codes[j] + 1:
+            j += 1
+        if j - i >= 2:
+            parts.append(_code_label(codes[i]) + "-" + _code_label(codes[j]))
+        else:
+            for k in range(i, j + 1):
+                parts.append(_code_label(codes[k]))
+        i = j + 1
+    label = "[" + "".join(parts) + "]" if parts else ""
+    if others:
+        label += (" " if label else "") + " ".join(others)
+    return label
@@ -0,0 +1,90 @@
+from lazy_afd import LazyAFD
+from regex_parser import (
+    RegexParser,
+    TemplateBuilder,
+    build_rules_tree,
+    compile_definitions,
+)
+from yalex_utils import clean_token_action
+
+
+def literal_text(regexp: str, definitions: dict, templates: dict):
+    """
+    Si la regla describe una única cadena fija ("if", 'w''h''i''l''e', 101 113,
+    una definición que se expande a un literal, ...) retorna esa cadena;
+    en otro caso retorna None.
+    """
+    node = RegexParser(definitions, TemplateBuilder(), templates).parse(regexp)
+    chars = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.value == ".":
+            stack.append(current.right)
+            stack.append(current.left)
+        elif current.left is None and current.right is None and current.value.isdigit():
+            chars.append(chr(int(current.value)))
+        else:
+            return None
+    return "".join(chars)
+
+
+def _match_marker(afd: LazyAFD, text: str):
+    """Marcador ganador si `afd` acepta exactamente `text`; None si no lo acepta."""
+    transitions, token = afd.lookup(afd.initial_state)
+    for ch in text:
+        state = transitions.get(str(ord(ch)))
+        if state is None:
+            return None
+        transitions, token = afd.lookup(state)
+    return token
+
+
+def split_keyword_rules(rules: list, definitions: dict, start_id: int = 1000):
+    """
+    Separa las reglas literales subsumidas por una regla no literal (las
+    palabras reservadas dentro de 'id') del resto de reglas.
+
+    Una regla literal L está subsumida si alguna regla no literal acepta L.
+    Como el lexema L siempre lo reconoce esa regla, L se quita del AFD:
+      - si L tiene mayor prioridad (marcador menor) que la regla que ganaría
+        con el lexema L, se registra como palabra reservada y lex() la
+        clasifica después del match con una búsqueda en un diccionario;
+      - si no, la regla nunca puede ganar y simplemente se descarta.
+
+    Retorna (reglas_afd, marcadores_afd, palabras), donde reglas_afd y
+    marcadores_afd se pasan a build_rules_tree (conservando la numeración
+    original) y palabras es lexema → (regexp, TOKEN).
+    """
+    markers = [start_id + i for i in range(len(rules))]
+    templates = compile_definitions(definitions)
+    literals = {}
+    for i, (regexp, _) in enumerate(rules):
+        text = literal_text(regexp, definitions, templates)
+        if text:
+            literals[i] = text
+
+    others = [i for i in range(len(rules)) if i not in literals]
+    if not literals or not others:
+        return rules, markers, {}
+
+    # AFD perezoso solo con las reglas no literales; el "token" de cada estado
+    # es directamente el marcador ganador
+    root, psm, marker_mapping = build_rules_tree(
+        [rules[i] for i in others], definitions, markers=[markers[i] for i in others]
+    )
+    afd = LazyAFD(root, psm, {m: m for m in marker_mapping})
+
+    removed = set()
+    keywords = {}
+    for i, text in literals.items():
+        winner = _match_marker(afd, text)
+        if winner is None:
+            continue
+        removed.add(i)
+        if markers[i] < winner and text not in keywords:
+            regexp, action = rules[i]
+            keywords[text] = (regexp, clean_token_action(action))
+
+    kept = [i for i in range(len(rules)) if i not in removed]
+    return [rules[i] for i in kept], [markers[i] for i in kept], keywords
@@ -0,0 +1,189 @@
+from collections import OrderedDict
+
+from regexpToAFD import compute_followpos, epsilon_closure, is_marker
+from lexer import code_to_char
+
+
+class LazyAFD:
+    """
+    AFD construido bajo demanda (al estilo RE2) a partir del autómata de posiciones.
+
+    En lugar de ejecutar la construcción de subconjuntos completa (construct_afd),
+    se conservan el followpos y el mapa posición → símbolo del árbol de sintaxis.
+    Cada estado del AFD (un conjunto de posiciones) se materializa solo cuando el
+    escaneo lo alcanza y se guarda en una caché LRU. Si la caché supera el
+    presupuesto de memoria (medido en posiciones almacenadas), se descartan los
+    estados menos usados; si se vuelven a necesitar, simplemente se reconstruyen.
+    """
+
+    def __init__(
+        self,
+        root,
+        position_symbol_map,
+        marker_mapping,
+        memory_budget=200000,
+        keywords=None,
+    ):
+        """
+        Parámetros:
+          - root: nodo raíz del árbol de sintaxis (resultado de build_rules_tree).
+          - position_symbol_map: posición → símbolo.
+          - marker_mapping: marcador → (símbolo_literal, TOKEN), ya convertido como
+            en token_actions del AFD minimizado.
+          - memory_budget: máximo de posiciones + transiciones guardadas en la caché.
+          - keywords: lexema → (símbolo_literal, TOKEN) de las palabras reservadas
+            que quedaron fuera del autómata (ver keywords.split_keyword_rules).
+        """
+        followpos = {pos: set() for pos in position_symbol_map}
+        compute_followpos(root, followpos)
+
+        self.position_symbol_map = position_symbol_map
+        self.followpos = followpos
+        self.marker_mapping = marker_mapping
+        self.memory_budget = memory_budget
+        self.keywords = keywords or {}
+        self.initial_state = frozenset(
+            epsilon_closure(root.firstpos, position_symbol_map, followpos)
+        )
+        self._reset_cache()
+
+    def _reset_cache(self):
+        # estado (frozenset de posiciones) → (transiciones, tupla_token | None, costo)
+        self._cache = OrderedDict()
+        self._cache_size = 0
+        self.built_states = 0
+        self.cache_hits = 0
+        self.evictions = 0
+
+    # La caché no se serializa: un pickle del autómata perezoso solo contiene
+    # el autómata de posiciones, por lo que construirlo es prácticamente gratis.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ("_cache", "_cache_size", "built_states", "cache_hits", "evictions"):
+            del state[key]
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault("keywords", {})
+        self.__dict__.update(state)
+        self._reset_cache()
+
+    def _materialize(self, state):
+        """Calcula las transiciones y el token de aceptación de un estado."""
+        psm = self.position_symbol_map
+        followpos = self.followpos
+
+        symbol_map = {}
+        markers = []
+        for pos in state:
+            symbol = psm.get(pos)
+            if not symbol or symbol == "λ":
+                continue
+            if is_marker(symbol):
+                markers.append(int(symbol))
+                continue
+            if symbol not in symbol_map:
+                symbol_map[symbol] = set()
+            symbol_map[symbol] |= followpos.get(pos, set())
+
+        transitions = {}
+        for symbol, next_set in symbol_map.items():
+            next_closure = frozenset(epsilon_closure(next_set, psm, followpos))
+            if next_closure:
+                transitions[symbol] = next_closure
+
+        # Prioridad al marcador menor, igual que lex() con el AFD completo
+        token = self.marker_mapping[min(markers)] if markers else None
+
+        cost = len(state) + len(transitions)
+        self._cache[state] = (transitions, token, cost)
+        self._cache_size += cost
+        self.built_states += 1
+
+        while self._cache_size > self.memory_budget and len(self._cache) > 1:
+            _, (_, _, old_cost) = self._cache.popitem(last=False)
+            self._cache_size -= old_cost
+            self.evictions += 1
+
+        return transitions, token
+
+    def lookup(self, state):
+        """Retorna (transiciones, tupla_token) del estado, construyéndolo si hace falta."""
+        entry = self._cache.get(state)
+        if entry is None:
+            return self._materialize(state)
+        self._cache.move_to_end(state)
+        self.cache_hits += 1
+        return entry[0], entry[1]
+
+    def stats(self) -> dict:
+        return {
+            "cached_states": len(self._cache),
+            "cache_size": self._cache_size,
+            "built_states": self.built_states,
+            "cache_hits": self.cache_hits,
+            "evictions": self.evictions,
+        }
+
+    def lex(self, text: str, final: bool = True):
+        """
+        Mismo contrato que lexer.lex(): genera ((símbolo_convertido, TOKEN), lexema)
+        aplicando la regla del lexema más largo (y con final=False retorna
+        dónde continuar el siguiente bloque).
+        """
+        i, n = 0, len(text)
+        initial = self.initial_state
+        lookup = self.lookup
+        keywords = self.keywords
+
+        while i < n:
+            transitions, _ = lookup(initial)
+            j = i
+            last_token = None
+            last_j = i - 1
+
+            while j < n:
+                state = transitions.get(str(ord(text[j])))
+                if state is None:
+                    break
+                transitions, token = lookup(state)
+                if token is not None:
+                    last_token = token
+                    last_j = j
+                j += 1
+
+            if not final and j == n:
+                return i
+
+            if last_token is None:
+                yield (("ERROR", "LEXICAL"), text[i])
+                i += 1
+                continue
+
+            lexeme = text[i : last_j + 1]
+            if keywords:
+                last_token = keywords.get(lexeme, last_token)
+            sym_code, token_name = last_token
+            yield ((code_to_char(sym_code), token_name), lexeme)
+            i = last_j + 1
+        return i
+
+
+def build_lazy_afd(
+    root, position_symbol_map, marker_map_full, memory_budget=200000, keywords=None
+):
+    """
+    Construye el LazyAFD a partir del árbol de sintaxis y del mapping de marcadores
+    (marcador → (símbolo_literal, TOKEN)), resolviendo el símbolo de cada token
+    de la misma forma que el AFD minimizado exportado por yalex_parser.
+    """
+    token_to_symbol = {}
+    for sym_code, tok_name in marker_map_full.values():
+        if tok_name not in token_to_symbol:
+            token_to_symbol[tok_name] = sym_code
+
+    marker_mapping = {
+        marker: (token_to_symbol.get(tok_name, ""), tok_name)
+        for marker, (_, tok_name) in marker_map_full.items()
+    }
+    return LazyAFD(root, position_symbol_map, marker_mapping, memory_budget, keywords)
@@ -47,16 +47,29 @@ class LexicalError(Exception):
 
 
 # ────── motor léxico ──────
-def lex(text: str, dfa: dict):
+def lex(text: str, dfa: dict, final: bool = True):
     """
     Genera tuplas ((símbolo_convertido, TOKEN), lexema)
     por ejemplo: ((';', 'SEMICOLON'), ';')
+
+    `dfa` puede ser el diccionario del AFD minimizado o un AFD perezoso
+    (lazy_afd.LazyAFD), que construye sus estados durante el escaneo.
+
+    Con final=False el texto es un bloque intermedio de una entrada más larga:
+    el escaneo se detiene en el primer token que llega al final del bloque
+    (el siguiente bloque podría extenderlo) y el generador retorna la
+    posición desde la que hay que continuar (ver lex_file).
     """
+    if not isinstance(dfa, dict):
+        return (yield from dfa.lex(text, final))
+
     i, n = 0, len(text)
     trans = dfa["transitions"]
     acc = set(dfa["accepting_states"])
     token_actions = dfa["token_actions"]
     initial = dfa["initial_state"]
+    # Palabras reservadas sacadas del AFD (build_lexer(..., keywords=True))
+    keywords = dfa.get("keywords")
 
     while i < n:
         state = initial
@@ -75,8 +88,13 @@ def lex(text: str, dfa: dict):
                     last_j = j
                 j += 1
             else:
+                # Sin transición = estado muerto (prune_dead_states eliminó los
+                # estados desde los que ya no se alcanza la aceptación)
                 break
 
+        if not final and j == n:
+            return i
+
         # ── si no cayó en aceptación ──
         if last_state is None:
             yield (("ERROR", "LEXICAL"), text[i])
@@ -103,11 +121,67 @@ def lex(text: str, dfa: dict):
         if tup is None:
             tup = ("", "ID")
 
+        # la regla que reconoció el lexema (p. ej. 'id') cede ante la palabra reservada
+        if keywords:
+            tup = keywords.get(lexeme, tup)
+
         sym_code, token_name = tup
         symbol_conv = code_to_char(sym_code)
 
         yield ((symbol_conv, token_name), lexeme)
         i = last_j + 1
+    return i
+
+
+def lex_file(path: str, dfa: dict, chunk_size: int = 1 << 16):
+    """
+    Igual que lex() sobre el contenido de `path`, pero leyéndolo en bloques de
+    `chunk_size` caracteres: en memoria solo queda el bloque actual más el
+    token incompleto del final del bloque anterior.
+    """
+    pending = ""
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            text = pending + chunk
+            consumed = yield from lex(text, dfa, final=False)
+            pending = text[consumed:]
+    yield from lex(pending, dfa)
+
+
+class TokenBuffer:
+    """
+    Tokens de una entrada, leídos con una sola pasada de lex() y guardados en
+    dos listas paralelas (nombres y lexemas), sin los tokens de `skip`.
+    Se puede recorrer las veces que haga falta (parser, árbol, reporte) y
+    rellenar con otra entrada reutilizando las mismas listas.
+    """
+
+    def __init__(self, skip=()):
+        self.skip = frozenset(skip)
+        self.names = []
+        self.lexemes = []
+
+    def fill(self, text: str, dfa):
+        self.names.clear()
+        self.lexemes.clear()
+        skip = self.skip
+        add_name = self.names.append
+        add_lexeme = self.lexemes.append
+        for (_, token_name), lexeme in lex(text, dfa):
+            if token_name not in skip:
+                add_name(token_name)
+                add_lexeme(lexeme)
+        return self
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        """(token, lexema) en orden, como espera el parser."""
+        return zip(self.names, self.lexemes)
 
 
 # ────── pequeño CLI / prueba ──────
@@ -0,0 +1,389 @@
+from regexpToAFD import Node
+from yalex_utils import (
+    clean_token_action,
+    identifier_end,
+    is_alnum,
+    order_definitions,
+)
+
+
+# Dominio de los complementos [^ ...]: caracteres imprimibles
+PRINTABLE_CODES = range(32, 127)
+# Códigos que representa '_'
+ANY_CODES = range(33, 256)
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "s": " "}
+
+
+class RegexSyntaxError(ValueError):
+    pass
+
+
+class SyntaxTreeBuilder:
+    """
+    Construye nodos del árbol de sintaxis (Node de regexpToAFD) calculando
+    nullable, firstpos y lastpos al momento de crearlos.
+    Las hojas reciben posiciones consecutivas y se registran en position_symbol_map.
+    """
+
+    def __init__(self):
+        self.next_position = 1
+        self.position_symbol_map = {}
+
+    def leaf(self, symbol: str) -> Node:
+        node = Node(symbol)
+        node.position = self.next_position
+        self.next_position += 1
+        node.firstpos.add(node.position)
+        node.lastpos.add(node.position)
+        self.position_symbol_map[node.position] = symbol
+        return node
+
+    def concat(self, left: Node, right: Node) -> Node:
+        node = Node(".", left, right)
+        node.nullable = left.nullable and right.nullable
+        if left.nullable:
+            node.firstpos = left.firstpos | right.firstpos
+        else:
+            node.firstpos = left.firstpos.copy()
+        if right.nullable:
+            node.lastpos = right.lastpos | left.lastpos
+        else:
+            node.lastpos = right.lastpos.copy()
+        return node
+
+    def union(self, left: Node, right: Node) -> Node:
+        node = Node("|", left, right)
+        node.nullable = left.nullable or right.nullable
+        node.firstpos = left.firstpos | right.firstpos
+        node.lastpos = left.lastpos | right.lastpos
+        return node
+
+    def star(self, child: Node) -> Node:
+        node = Node("*", left=child)
+        node.nullable = True
+        node.firstpos = child.firstpos.copy()
+        node.lastpos = child.lastpos.copy()
+        return node
+
+    def char_class(self, codes) -> Node:
+        """Alternativa de hojas, una por código: (c1|c2|...|cn)."""
+        node = None
+        for code in codes:
+            leaf = self.leaf(str(code))
+            node = leaf if node is None else self.union(node, leaf)
+        if node is None:
+            return self.leaf("λ")
+        return node
+
+    def clone(self, node: Node) -> Node:
+        """Copia un subárbol asignando posiciones nuevas (usado por R+ → R R*)."""
+        if node.left is None and node.right is None:
+            return self.leaf(node.value)
+        if node.value == "*":
+            return self.star(self.clone(node.left))
+        left = self.clone(node.left)
+        right = self.clone(node.right)
+        if node.value == ".":
+            return self.concat(left, right)
+        return self.union(left, right)
+
+
+class TemplateBuilder(SyntaxTreeBuilder):
+    """
+    Constructor para las plantillas de las definiciones 'let'. Las plantillas no
+    tienen posiciones: son subárboles compartidos (un DAG) que solo se copian,
+    con posiciones nuevas, al ser referenciados desde una regla.
+    """
+
+    def leaf(self, symbol: str) -> Node:
+        return Node(symbol)
+
+    def concat(self, left: Node, right: Node) -> Node:
+        return Node(".", left, right)
+
+    def union(self, left: Node, right: Node) -> Node:
+        return Node("|", left, right)
+
+    def star(self, child: Node) -> Node:
+        return Node("*", left=child)
+
+    def clone(self, node: Node) -> Node:
+        return node
+
+
+class RegexParser:
+    """
+    Parser descendente recursivo para las expresiones regulares de YALex.
+
+    Recorre el texto de la regla una sola vez y construye el árbol de sintaxis
+    directamente, sin reescrituras de texto intermedias ni notación postfix.
+
+    Gramática:
+        alt     → concat ('|' concat)*
+        concat  → postfix+
+        postfix → atom ('*' | '+' | '?')*
+        atom    → '(' alt ')' | set ('#' set)? | 'c' | "cadena" | código | ident | '_'
+
+    Los códigos son secuencias de dígitos (formato que ya producen
+    extract_token_rules y process_string_constant) y representan un carácter.
+    """
+
+    def __init__(self, definitions: dict, builder: SyntaxTreeBuilder, templates=None):
+        self.definitions = definitions
+        self.builder = builder
+        self.text = ""
+        self.pos = 0
+        if templates is None:
+            templates = compile_definitions(definitions)
+        self.templates = templates
+
+    def parse(self, text: str) -> Node:
+        """Parsea `text` completo; es reentrante para expandir definiciones."""
+        saved = self.text, self.pos
+        self.text = text
+        self.pos = 0
+        node = self._parse_alt()
+        self._skip_ws()
+        if self.pos < len(self.text):
+            raise RegexSyntaxError(
+                f"Carácter inesperado '{self.text[self.pos]}' en la posición "
+                f"{self.pos} de: {text}"
+            )
+        self.text, self.pos = saved
+        return node
+
+    # ── utilidades de lectura ──
+    def _skip_ws(self):
+        text = self.text
+        while self.pos < len(text) and text[self.pos] in " \t\n\r":
+            self.pos += 1
+
+    def _peek(self) -> str:
+        self._skip_ws()
+        if self.pos < len(self.text):
+            return self.text[self.pos]
+        return ""
+
+    def _read_quoted(self) -> str:
+        """Lee un literal entre comillas y retorna su contenido decodificado."""
+        text = self.text
+        quote = text[self.pos]
+        self.pos += 1
+        chars = []
+        while self.pos < len(text) and text[self.pos] != quote:
+            if text[self.pos] == "\\" and self.pos + 1 < len(text):
+                esc = text[self.pos + 1]
+                chars.append(_ESCAPES.get(esc, esc))
+                self.pos += 2
+            else:
+                chars.append(text[self.pos])
+                self.pos += 1
+        if self.pos >= len(text):
+            raise RegexSyntaxError(f"Literal sin cerrar en: {text}")
+        self.pos += 1
+        return "".join(chars)
+
+    # ── reglas de la gramática ──
+    def _parse_alt(self) -> Node:
+        b = self.builder
+        node = self._parse_concat()
+        while self._peek() == "|":
+            self.pos += 1
+            node = b.union(node, self._parse_concat())
+        return node
+
+    def _parse_concat(self) -> Node:
+        b = self.builder
+        node = None
+        while True:
+            ch = self._peek()
+            if ch == "" or ch in "|)":
+                break
+            item = self._parse_postfix()
+            node = item if node is None else b.concat(node, item)
+        if node is None:
+            return b.leaf("λ")
+        return node
+
+    def _parse_postfix(self) -> Node:
+        b = self.builder
+        node = self._parse_atom()
+        while True:
+            ch = self._peek()
+            if ch == "*":
+                node = b.star(node)
+            elif ch == "+":
+                node = b.concat(node, b.star(b.clone(node)))
+            elif ch == "?":
+                node = b.union(node, b.leaf("λ"))
+            else:
+                return node
+            self.pos += 1
+
+    def _parse_atom(self) -> Node:
+        b = self.builder
+        text = self.text
+        ch = self._peek()
+
+        if ch == "(":
+            self.pos += 1
+            if self._peek() == ")":
+                self.pos += 1
+                return b.leaf("λ")
+            node = self._parse_alt()
+            if self._peek() != ")":
+                raise RegexSyntaxError(f"Falta ')' en: {text}")
+            self.pos += 1
+            return node
+
+        if ch == "[":
+            codes = self._parse_set()
+            if self._peek() == "#":
+                self.pos += 1
+                if self._peek() != "[":
+                    raise RegexSyntaxError(f"Se esperaba un conjunto después de '#' en: {text}")
+                removed = set(self._parse_set())
+                codes = [c for c in codes if c not in removed]
+            return b.char_class(codes)
+
+        if ch == "'" or ch == '"':
+            literal = self._read_quoted()
+            if literal == "":
+                return b.leaf("λ")
+            node = None
+            for c in literal:
+                leaf = b.leaf(str(ord(c)))
+                node = leaf if node is None else b.concat(node, leaf)
+            return node
+
+        if ch == "\\" and self.pos + 1 < len(text):
+            esc = text[self.pos + 1]
+            self.pos += 2
+            return b.leaf(str(ord(_ESCAPES.get(esc, esc))))
+
+        if "0" <= ch <= "9":
+            start = self.pos
+            while self.pos < len(text) and "0" <= text[self.pos] <= "9":
+                self.pos += 1
+            return b.leaf(text[start : self.pos])
+
+        if ch == "_":
+            self.pos += 1
+            return b.char_class(ANY_CODES)
+
+        if is_alnum(ch):
+            start = self.pos
+            self.pos = identifier_end(text, start, self.definitions)
+            ident = text[start : self.pos]
+            if ident in self.definitions:
+                return self._expand_definition(ident)
+            # Identificador no definido: se toma como la secuencia de sus caracteres
+            node = None
+            for c in ident:
+                leaf = b.leaf(str(ord(c)))
+                node = leaf if node is None else b.concat(node, leaf)
+            return node
+
+        if ch in "*+?#":
+            raise RegexSyntaxError(f"Operador '{ch}' sin operando en: {text}")
+
+        # Cualquier otro carácter (por ejemplo '.') es un literal
+        self.pos += 1
+        return b.leaf(str(ord(ch)))
+
+    def _parse_set(self) -> list:
+        """
+        Lee un conjunto [ ... ] y retorna la lista ordenada de códigos.
+        Soporta rangos ('a'-'z'), complementos ([^ ...]) y cadenas ("abc").
+        """
+        text = self.text
+        self.pos += 1  # '['
+        complement = False
+        self._skip_ws()
+        if self.pos < len(text) and text[self.pos] == "^":
+            complement = True
+            self.pos += 1
+        codes = set()
+        while True:
+            self._skip_ws()
+            if self.pos >= len(text):
+                raise RegexSyntaxError(f"Conjunto sin cerrar en: {text}")
+            ch = text[self.pos]
+            if ch == "]":
+                self.pos += 1
+                break
+            if ch == "'" or ch == '"':
+                literal = self._read_quoted()
+                self._skip_ws()
+                if len(literal) == 1 and self.pos < len(text) and text[self.pos] == "-":
+                    self.pos += 1
+                    self._skip_ws()
+                    if self.pos < len(text) and text[self.pos] in "'\"":
+                        upper = self._read_quoted()
+                        for code in range(ord(literal), ord(upper[:1] or literal) + 1):
+                            codes.add(code)
+                        continue
+                for c in literal:
+                    codes.add(ord(c))
+            elif "0" <= ch <= "9":
+                start = self.pos
+                while self.pos < len(text) and "0" <= text[self.pos] <= "9":
+                    self.pos += 1
+                codes.add(int(text[start : self.pos]))
+            else:
+                codes.add(ord(ch))
+                self.pos += 1
+        if complement:
+            return [c for c in PRINTABLE_CODES if c not in codes]
+        return sorted(codes)
+
+    def _expand_definition(self, ident: str) -> Node:
+        return self.builder.clone(self.templates[ident])
+
+
+def compile_definitions(definitions: dict) -> dict:
+    """
+    Parsea cada definición 'let' una sola vez, en orden topológico del grafo de
+    dependencias, y retorna nombre → plantilla. Una definición usada por varias
+    otras se comparte en lugar de volver a parsearse.
+    Lanza RegexSyntaxError si las definiciones forman un ciclo.
+    """
+    try:
+        order = order_definitions(definitions)
+    except ValueError as exc:
+        raise RegexSyntaxError(str(exc)) from exc
+    templates = {}
+    parser = RegexParser(definitions, TemplateBuilder(), templates)
+    for name in order:
+        templates[name] = parser.parse(definitions[name])
+    return templates
+
+
+def build_rules_tree(rules: list, definitions: dict, start_id: int = 1000, markers=None):
+    """
+    Construye el árbol de sintaxis de todas las reglas de un archivo YALex:
+
+        (regla_0 · marcador_0) | (regla_1 · marcador_1) | ...
+
+    Parámetros:
+      - rules: lista de tuplas (regexp, acción), como en parse_yalex()["rules"].
+      - definitions: diccionario de definiciones 'let'.
+      - markers: marcador de cada regla; por defecto start_id, start_id + 1, ...
+        Permite construir un subconjunto de reglas conservando la numeración
+        (y por lo tanto la prioridad) de la especificación completa.
+
+    Retorna (raíz, position_symbol_map, marker_mapping), donde marker_mapping
+    asocia cada marcador con (símbolo_literal, TOKEN).
+    """
+    builder = SyntaxTreeBuilder()
+    parser = RegexParser(definitions, builder)
+    root = None
+    marker_mapping = {}
+    if markers is None:
+        markers = range(start_id, start_id + len(rules))
+    for (regexp, action), marker in zip(rules, markers):
+        alt = builder.concat(parser.parse(regexp), builder.leaf(str(marker)))
+        root = alt if root is None else builder.union(root, alt)
+        marker_mapping[marker] = (regexp, clean_token_action(action))
+    return root, builder.position_symbol_map, marker_mapping
@@ -9,37 +9,16 @@ from colorama import Fore, Style
 import graphviz
 import os
 import string
-from yalex_utils import expand_underscore
+from graph_render import (
+    SUMMARY_DPI,
+    char_class_label,
+    render_graph,
+    should_summarize,
+)
 
 # Funciones auxiliares para manejo de cadenas sin métodos nativos
 
 
-def manual_split_by_space(s: str) -> list:
-    """Divide la cadena s en tokens separados por espacios, sin usar .split()."""
-    result = []
-    current = ""
-    for ch in s:
-        if ch == " ":
-            if current != "":
-                result.append(current)
-                current = ""
-        else:
-            current += ch
-    if current != "":
-        result.append(current)
-    return result
-
-
-def manual_join(strings: list, sep: str) -> str:
-    """Une las cadenas de la lista strings utilizando sep como separador, sin usar .join()."""
-    result = ""
-    for i in range(len(strings)):
-        if i > 0:
-            result += sep
-        result += strings[i]
-    return result
-
-
 def custom_is_digit(c: str) -> bool:
     """
     Retorna True si el carácter c es un dígito ('0' a '9'), sin usar isdigit().
@@ -168,10 +147,6 @@ class Node:
         self.position = None  # Sirve para identificar la posición del nodo
 
 
-# Definimos las precedencias de los operadores
-precedence = {"|": 1, ".": 2, "*": 3}
-
-
 def is_marker(token: str) -> bool:
     r"""
     Retorna True si el token es una secuencia de dígitos (verificado manualmente)
@@ -186,218 +161,6 @@ def is_marker(token: str) -> bool:
     return False
 
 
-def is_operand_token(token: str) -> bool:
-    r"""
-    Retorna True si el token se considera operando:
-      - Es una cadena no vacía en la que cada carácter es alfanumérico (manual) o '_'
-      - O es una secuencia escapada, es decir, comienza con "\".
-    """
-    if token == "":
-        return False
-    if token[0] == "\\":
-        return True
-    for ch in token:
-        if not (is_alnum(ch) or ch == "λ"):
-            return False
-    return True
-
-
-def tokenize_for_concat(infix: str) -> list:
-    """
-    Tokeniza la expresión infija a nivel de tokens.
-    Se ignoran los espacios (comparando manualmente con " \t\n\r").
-    Se agrupan los dígitos en un solo token usando custom_is_digit.
-    Además, se tratan los operadores especiales, las secuencias escapadas y
-    se deja el carácter '_' sin convertir a su valor ASCII.
-    """
-    tokens = []
-    i = 0
-    while i < len(infix):
-        if infix[i] in " \t\n\r":
-            i += 1
-            continue
-        elif infix[i] == "_":
-            tokens.append(expand_underscore())
-            i += 1
-        # Si se detecta el delimitador '$', se toma todo hasta el siguiente '$'
-        elif infix[i] == "$":
-            token = ""
-            i += 1  # Saltar el '$' de apertura
-            while i < len(infix) and infix[i] != "$":
-                token += infix[i]
-                i += 1
-            if i < len(infix) and infix[i] == "$":
-                i += 1  # Saltar el '$' de cierre
-            tokens.append(token)  # Agrega el contenido sin los delimitadores
-        elif custom_is_digit(infix[i]):
-            num = ""
-            while i < len(infix) and custom_is_digit(infix[i]):
-                num += infix[i]
-                i += 1
-            tokens.append(num)
-        elif infix[i] in {"|", ".", "*", "(", ")"}:
-            tokens.append(infix[i])
-            i += 1
-        elif infix[i] == "\\" and i + 1 < len(infix):
-            tokens.append(infix[i] + infix[i + 1])
-            i += 2
-        elif infix[i] == "λ":
-            # Deja el lambda tal cual, sin convertirlo a ASCII.
-            tokens.append("λ")
-            i += 1
-        else:
-            # Para otros caracteres, se usa su valor ASCII (convertido manualmente)
-            tokens.append(str(ord(infix[i])))
-            i += 1
-    return tokens
-
-
-def insert_concatenation_operators(infix: str) -> str:
-    """
-    Inserta el operador de concatenación (".") en la cadena infija.
-    Se utiliza tokenize_for_concat para obtener la lista de tokens; si un token es seguido por un
-    operando o por "(", se inserta un punto.
-    """
-    tokens = tokenize_for_concat(infix)
-    result_tokens = []
-    n = len(tokens)
-    for i in range(n):
-        result_tokens.append(tokens[i])
-        if i < n - 1:
-            # Insertar punto si el token actual no es un operador y el siguiente no es un operador o "("
-            if is_marker(tokens[i]) and is_marker(tokens[i + 1]):
-                continue
-
-            # Insertar punto si el token actual no es un operador y el siguiente no es un operador o "("
-            elif is_marker(tokens[i]) and (
-                is_operand_token(tokens[i + 1]) or tokens[i + 1] == "("
-            ):
-                result_tokens.append(".")
-
-            # Insertar punto si el token actual no es un operador y el siguiente no es un operador o "("
-            elif (
-                not is_marker(tokens[i])
-                and is_operand_token(tokens[i])
-                and (is_operand_token(tokens[i + 1]) or tokens[i + 1] == "(")
-            ):
-                result_tokens.append(".")
-
-            # Insertar punto si el token actual no es un operador y el siguiente no es un operador o "("
-            elif tokens[i] in {")", "*"} and (
-                is_operand_token(tokens[i + 1]) or tokens[i + 1] == "("
-            ):
-                result_tokens.append(".")
-
-    # Insertar punto si el token actual no es un operador y el siguiente no es un operador o "("
-    return manual_join(result_tokens, "")
-
-
-def toPostFix(infixExpression: str) -> str:
-    """
-    Convierte la expresión regular en notación infija a notación postfix.
-    Se inserta el operador de concatenación, se tokeniza manualmente y se aplica el algoritmo
-    de conversión, tratando los marcadores (números ≥ 1000) como elementos atómicos.
-    """
-
-    # Primero se inserta el operador de concatenación
-    infix_with_concat = insert_concatenation_operators(infixExpression)
-    print("Expresión regular con concatenación:", infix_with_concat)
-
-    tokens = tokenize_for_concat(infix_with_concat)
-    output = []
-    operators = []
-    for token in tokens:
-        if token in {"|", ".", "*"}:
-            # Es operador: se aplica la precedencia
-            while (
-                operators
-                and operators[-1] != "("
-                and operators[-1] in {"|", ".", "*"}
-                and precedence[operators[-1]] >= precedence[token]
-            ):
-                output.append(operators.pop())
-            operators.append(token)
-        elif token == "(":
-            operators.append(token)
-        elif token == ")":
-            while operators and operators[-1] != "(":
-                output.append(operators.pop())
-            if operators and operators[-1] == "(":
-                operators.pop()
-        else:
-            # Es operando (incluye marcadores y números ASCII)
-            output.append(token)
-    while operators:
-        op = operators.pop()
-        if op not in {"(", ")"}:
-            output.append(op)
-    return manual_join(output, " ")
-
-
-def is_operand(token: str) -> bool:
-    """
-    Retorna True si el token no es uno de los operadores ("|", ".", "*"),
-    por lo que se considera operando.
-    """
-    return token not in {"|", ".", "*"}
-
-
-def build_syntax_tree(postfix: str):
-    """
-    Construye el árbol de sintaxis a partir de la expresión en notación postfix.
-    Se asume que la expresión postfix es una cadena de tokens separados por espacios.
-    Cada token representa un operando (literal o marcador) o un operador (|, . o *).
-    """
-    # Dividir la expresión postfix en tokens
-    tokens = manual_split_by_space(postfix)
-    stack = []
-    pos_counter = iter(range(1, 10**6))  # Contador para posiciones únicas
-    position_symbol_map = {}
-    for token in tokens:
-        if is_operand(token):
-            # Es un operando: creamos un nodo y le asignamos posición
-            node = Node(token)
-            node.position = next(pos_counter)
-            node.firstpos.add(node.position)
-            node.lastpos.add(node.position)
-            position_symbol_map[node.position] = token
-            stack.append(node)
-        elif token == "*":
-            # Operador de Kleene: se toma el último nodo de la pila
-            child = stack.pop()
-            node = Node("*", left=child)
-            node.nullable = True
-            node.firstpos = child.firstpos.copy()
-            node.lastpos = child.lastpos.copy()
-            stack.append(node)
-        elif token == ".":
-            # Concatenación: se toman los dos últimos nodos de la pila
-            right = stack.pop()
-            left = stack.pop()
-            node = Node(".", left, right)
-            node.nullable = left.nullable and right.nullable
-            if left.nullable:
-                node.firstpos = left.firstpos | right.firstpos
-            else:
-                node.firstpos = left.firstpos.copy()
-            if right.nullable:
-                node.lastpos = right.lastpos | left.lastpos
-            else:
-                node.lastpos = right.lastpos.copy()
-            stack.append(node)
-        elif token == "|":
-            right = stack.pop()
-            left = stack.pop()
-            node = Node("|", left, right)
-            node.nullable = left.nullable or right.nullable
-            node.firstpos = left.firstpos | right.firstpos
-            node.lastpos = left.lastpos | right.lastpos
-            stack.append(node)
-
-    # Al finalizar, la pila debe contener el nodo raíz
-    return stack.pop(), position_symbol_map
-
-
 # Función que calcula el siguientepos
 def compute_followpos(node, followpos):
     """
@@ -674,6 +437,74 @@ def minimize_afd(states, transitions, accepting_states, old_token_actions):
     )
 
 
+def prune_dead_states(
+    states, transitions, accepting_states, initial_state, token_actions=None
+):
+    """
+    Elimina del AFD los estados inalcanzables desde el estado inicial y los
+    estados muertos (desde los que no se llega a ningún estado de aceptación).
+
+    Las transiciones hacia un estado eliminado también se eliminan, de modo que
+    la ausencia de transición es el estado muerto explícito: lex() deja de
+    escanear en cuanto ya no es posible una coincidencia más larga.
+
+    Retorna (states, transitions, accepting_states, token_actions, stats), donde
+    stats = {"states_before", "states_after", "unreachable", "dead",
+    "transitions_before", "transitions_after"}.
+    """
+    successors = {state: set() for state in states}
+    predecessors = {state: set() for state in states}
+    for (state, _), next_state in transitions.items():
+        successors[state].add(next_state)
+        predecessors[next_state].add(state)
+
+    def reach(sources, edges):
+        seen = set(sources)
+        stack = list(sources)
+        while stack:
+            state = stack.pop()
+            for other in edges[state]:
+                if other not in seen:
+                    seen.add(other)
+                    stack.append(other)
+        return seen
+
+    # Alcanzables hacia adelante desde el inicial y hacia atrás desde la aceptación
+    reachable = reach([initial_state], successors)
+    live = reach([s for s in accepting_states if s in states], predecessors)
+    # El estado inicial se conserva aunque el lenguaje sea vacío
+    keep = (reachable & live) | {initial_state}
+
+    new_states = {name: group for name, group in states.items() if name in keep}
+    new_transitions = {
+        (state, symbol): next_state
+        for (state, symbol), next_state in transitions.items()
+        if state in keep and next_state in keep
+    }
+    new_accepting = {s for s in accepting_states if s in keep}
+    new_token_actions = None
+    if token_actions is not None:
+        new_token_actions = {s: t for s, t in token_actions.items() if s in keep}
+
+    stats = {
+        "states_before": len(states),
+        "states_after": len(new_states),
+        "unreachable": len(set(states) - reachable),
+        "dead": len(reachable - live - {initial_state}),
+        "transitions_before": len(transitions),
+        "transitions_after": len(new_transitions),
+    }
+    return new_states, new_transitions, new_accepting, new_token_actions, stats
+
+
+def format_prune_stats(stats: dict) -> str:
+    return (
+        f"{stats['states_before']} → {stats['states_after']} estados "
+        f"({stats['unreachable']} inalcanzables, {stats['dead']} muertos), "
+        f"{stats['transitions_before']} → {stats['transitions_after']} transiciones"
+    )
+
+
 # Función para imprimir el AFD
 def print_afd(states, transitions, accepting_states):
     print(Fore.CYAN + "\n--- Tabla de Estados - AFD directo ---" + Style.RESET_ALL)
@@ -714,29 +545,59 @@ def print_mini_afd(states, transitions, accepting_states):
         )
 
 
+def afd_digraph(states, transitions, accepting_states):
+    """
+    Arma el grafo del AFD. Si el AFD supera SUMMARY_THRESHOLD estados se dibuja
+    resumido: una sola arista por par de estados con la clase de caracteres
+    colapsada como etiqueta, y los estados agrupados en clusters de aceptación
+    y de no aceptación.
+    """
+    dot = graphviz.Digraph(format="pdf")
+    dot.attr(rankdir="LR")
+
+    if not should_summarize(len(states)):
+        dot.attr(size="10,7", ratio="fill", dpi="300")
+        for state in states:
+            if state in accepting_states:
+                dot.node(state, state, shape="doublecircle", color="blue")
+            else:
+                dot.node(state, state, shape="circle")
+        for (state, symbol), next_state in transitions.items():
+            dot.edge(state, next_state, label=symbol)
+        return dot
+
+    dot.attr(dpi=SUMMARY_DPI)
+    with dot.subgraph(name="cluster_accepting") as acc:
+        acc.attr(label="Aceptación", color="blue")
+        for state in states:
+            if state in accepting_states:
+                acc.node(state, state, shape="doublecircle", color="blue")
+    with dot.subgraph(name="cluster_other") as other:
+        other.attr(label="No aceptación")
+        for state in states:
+            if state not in accepting_states:
+                other.node(state, state, shape="circle")
+
+    grouped = {}
+    for (state, symbol), next_state in transitions.items():
+        grouped.setdefault((state, next_state), []).append(symbol)
+    for (state, next_state), symbols in grouped.items():
+        dot.edge(state, next_state, label=char_class_label(symbols))
+    return dot
+
+
 # Función para generar la representación gráfica del AFD en una carpeta específica
 def visualize_afd(states, transitions, accepting_states, route):
     """
     Genera la representación gráfica del AFD y la guarda en:
-      "./grafos/<route>/direct_AFD/grafo_AFD.png"
+      "./grafos/<route>/direct_AFD/grafo_AFD.pdf"
     """
     output_dir = os.path.join(".", "grafos", route, "direct_AFD")
     os.makedirs(output_dir, exist_ok=True)
 
-    dot = graphviz.Digraph(format="pdf")
-    dot.attr(rankdir="LR")
-    dot.attr(size="10,7", ratio="fill", dpi="300")
-
-    for state in states:
-        if state in accepting_states:
-            dot.node(state, state, shape="doublecircle", color="blue")
-        else:
-            dot.node(state, state, shape="circle")
-    for (state, symbol), next_state in transitions.items():
-        dot.edge(state, next_state, label=symbol)
-
+    dot = afd_digraph(states, transitions, accepting_states)
     output_path = os.path.join(output_dir, "grafo_AFD")
-    dot.render(output_path, view=False)
+    render_graph(dot, output_path, view=False)
 
 
 # Función para generar la representación gráfica del AFD minimizado
@@ -745,22 +606,11 @@ def visualize_minimized_afd(
 ):
     """
     Genera la representación gráfica del AFD minimizado y la guarda en:
-      "./grafos/<route>/minimize_AFD/grafo_mini_AFD.png"
+      "./grafos/<route>/minimize_AFD/grafo_mini_AFD.pdf"
     """
     output_dir = os.path.join(".", "grafos", route, "minimize_AFD")
     os.makedirs(output_dir, exist_ok=True)
 
-    dot = graphviz.Digraph(format="pdf")
-    dot.attr(rankdir="LR")
-    dot.attr(size="10,7", ratio="fill", dpi="300")
-
-    for state in states:
-        if state in accepting_states:
-            dot.node(state, state, shape="doublecircle", color="blue")
-        else:
-            dot.node(state, state, shape="circle")
-    for (state, symbol), next_state in transitions.items():
-        dot.edge(state, next_state, label=symbol)
-
+    dot = afd_digraph(states, transitions, accepting_states)
     output_path = os.path.join(output_dir, "grafo_mini_AFD")
-    dot.render(output_path, view=False)
+    render_graph(dot, output_path, view=False)
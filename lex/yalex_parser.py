@@ -3,45 +3,36 @@ import pickle
 import itertools
 from graphviz import Digraph
 import os
-import tok
+import sys
 
 from regexpToAFD import (
-    toPostFix,
-    build_syntax_tree,
     construct_afd,
+    format_prune_stats,
     print_afd,
+    prune_dead_states,
     print_mini_afd,
     minimize_afd,
     visualize_afd,
     visualize_minimized_afd,
 )
+from lazy_afd import build_lazy_afd
+from keywords import split_keyword_rules
+from graph_render import (
+    SUMMARY_DPI,
+    char_class_label,
+    render_graph,
+    should_summarize,
+    start_render_queue,
+    wait_for_renders,
+)
+from regex_parser import build_rules_tree
 from yalex_utils import (
+    clean_token_action,
     parse_yalex,
-    expand_regex,
-    expand_bracket_ranges,
-    escape_token_literals,
-    convert_plus_operator,
-    convert_optional_operator,
-    simplify_expression,
-    attach_markers_to_final_regexp,
-    process_regexp,
     compute_symbol_code,
 )
 
 
-def manual_join(strings: list, sep: str) -> str:
-    """
-    Concatena las cadenas en 'strings' utilizando 'sep' como separador,
-    sin usar el método join.
-    """
-    result = ""
-    for i in range(len(strings)):
-        if i > 0:
-            result += sep
-        result += strings[i]
-    return result
-
-
 def make_json_serializable(afd):
     """
     Transforma el diccionario AFD en uno que sea serializable a JSON.
@@ -77,13 +68,16 @@ def make_json_serializable(afd):
                 str(marker): token for marker, token in mapping.items()
             }
 
-    return {
+    result = {
         "states": json_states,
         "transitions": json_transitions,
         "accepting_states": json_accepting_states,
         "initial_state": json_initial_state,
         "token_actions": json_token_actions,
     }
+    if "keywords" in afd:
+        result["keywords"] = afd["keywords"]
+    return result
 
 
 def visualize_syntax_tree(root, route, file_format="png"):
@@ -94,7 +88,7 @@ def visualize_syntax_tree(root, route, file_format="png"):
     Se guarda en la carpeta "./grafos/<route>/arbol_expresion".
 
     Parámetros:
-      - root: nodo raíz del árbol de sintaxis (resultado de build_syntax_tree).
+      - root: nodo raíz del árbol de sintaxis (resultado de build_rules_tree).
       - route: nombre base (por ejemplo, el nombre del archivo YAL sin extensión).
       - file_format: formato de la imagen de salida (ej. "png", "pdf").
     """
@@ -104,13 +98,25 @@ def visualize_syntax_tree(root, route, file_format="png"):
 
     dot = Digraph(comment="Árbol de Expresión", format=file_format)
     dot.attr(rankdir="TB")
-    dot.attr(size="10,7", ratio="fill", dpi="300")
+
+    # Árboles grandes: cada alternativa de solo hojas ((48|49|...|57)) se
+    # dibuja como un único nodo con la clase de caracteres colapsada.
+    summarize = should_summarize(count_nodes(root))
+    if summarize:
+        dot.attr(dpi=SUMMARY_DPI)
+    else:
+        dot.attr(size="10,7", ratio="fill", dpi="300")
 
     counter = [1]
 
     def add_node(node):
         node_id = str(counter[0])
         counter[0] += 1
+        if summarize and node.value == "|":
+            leaves = alternation_leaves(node)
+            if leaves is not None:
+                dot.node(node_id, "Clase: " + char_class_label(leaves), shape="box")
+                return node_id
         label = f"Valor: {node.value}"
         if node.position is not None:
             label += f"\nPos: {node.position}"
@@ -126,85 +132,155 @@ def visualize_syntax_tree(root, route, file_format="png"):
     add_node(root)
     # Especificamos un nombre de archivo para la imagen (sin extensión)
     output_path = os.path.join(output_dir, "arbol_expresion")
-    dot.render(output_path, view=False)
+    render_graph(dot, output_path, view=False)
 
 
-if __name__ == "__main__":
-    # 1. Leer y parsear el .yal
-    route = "slr-4"
-    yal_path = os.path.join("../spec/yalfiles", f"{route}.yal")
-    result = parse_yalex(yal_path)
+def count_nodes(root) -> int:
+    """Cuenta los nodos del árbol de sintaxis (sin recursión)."""
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if node.left:
+            stack.append(node.left)
+        if node.right:
+            stack.append(node.right)
+    return count
 
-    # 2. Separar reglas / acciones y obtener símbolo literal
-    regex_alt, action_alt = [], []
-    for rule, act in result["rules"]:
-        regex_alt.append(rule)
-        action_alt.append(act)
-
-    # 3-9. Pre-procesamiento de la ER combinada
-    combined = "(" + manual_join(regex_alt, ")|(") + ")"
-    expanded = expand_regex(combined, result["definitions"])
-    brackets = expand_bracket_ranges(expanded)
-    processed = process_regexp(brackets)
-    escaped = escape_token_literals(processed)
-    plus_conv = convert_plus_operator(escaped)
-    opt_conv = convert_optional_operator(plus_conv)
-    simplified = simplify_expression(opt_conv)
-
-    # print("\nSimbolos:")
-    # print(regex_alt)
-    # print("\nAcciones:")
-    # print(action_alt)
-
-    # 10. Adjuntar marcadores y mapear (symCode / ws / id , TOKEN)
-    final_expr, marker_map_full = attach_markers_to_final_regexp(
-        simplified, action_alt, regex_alt
-    )
 
-    print("\nExpresión final:")
-    print(final_expr)
+def alternation_leaves(node):
+    """
+    Si el subárbol es una alternativa formada solo por hojas, retorna la lista
+    de sus símbolos; en otro caso retorna None.
+    """
+    leaves = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.value == "|":
+            stack.append(current.right)
+            stack.append(current.left)
+        elif current.left is None and current.right is None:
+            leaves.append(current.value)
+        else:
+            return None
+    return leaves
+
+
+def lexer_name(route: str) -> str:
+    """'slr-4' → 'lexer-4'; cualquier otro nombre → 'lexer-<route>'."""
+    if route[:4] == "slr-":
+        return "lexer-" + route[4:]
+    return "lexer-" + route
+
+
+def build_lexer(
+    yal_path,
+    lexers_dir,
+    route=None,
+    lazy=False,
+    visualize=True,
+    verbose=True,
+    keywords=False,
+):
+    """
+    Compila un archivo .yal y exporta el analizador léxico a `lexers_dir`:
+      - <lexer>.json y <lexer>.pickle con el AFD minimizado, o
+      - <lexer>-lazy.pickle con el AFD perezoso si `lazy` es True.
+
+    Con `keywords`, las reglas literales subsumidas por otra regla (palabras
+    reservadas dentro de 'id') no entran al AFD: se guardan en "keywords" y
+    lex() las clasifica después del match.
 
-    # 11. Convertir la expresión regular a postfix
-    postfix = toPostFix(final_expr)
-    # print("\nPostfix generado:")
-    # print(postfix)
+    Retorna la ruta del pickle generado.
+    """
+    if route is None:
+        route = os.path.splitext(os.path.basename(yal_path))[0]
+    out_prefix = os.path.join(lexers_dir, lexer_name(route))
+    os.makedirs(lexers_dir, exist_ok=True)
+
+    # 1. Leer y parsear el .yal
+    result = parse_yalex(yal_path)
+
+    # El símbolo de cada token sale de la primera regla que lo retorna
+    token_to_symbol = {}
+    for regexp, action in result["rules"]:
+        tok_name = clean_token_action(action)
+        if tok_name not in token_to_symbol:
+            token_to_symbol[tok_name] = regexp
+
+    # 1b. Palabras reservadas: fuera del AFD, con la numeración original de marcadores
+    rules, markers, keyword_rules = result["rules"], None, {}
+    if keywords:
+        rules, markers, keyword_rules = split_keyword_rules(rules, result["definitions"])
+        if verbose:
+            print(f"Palabras reservadas fuera del AFD: {sorted(keyword_rules)}")
+    keyword_table = {
+        lexeme: (token_to_symbol.get(tok_name, ""), tok_name)
+        for lexeme, (_, tok_name) in keyword_rules.items()
+    }
 
-    # 12. Construir el árbol de sintaxis a partir del postfix
-    syntax_tree, pos_sym_map = build_syntax_tree(postfix)
+    # 2-12. Parsear cada regla directamente al árbol de sintaxis (una sola pasada),
+    # adjuntando un marcador por alternativa: marcador → (symCode / ws / id, TOKEN)
+    syntax_tree, pos_sym_map, marker_map_full = build_rules_tree(
+        rules, result["definitions"], markers=markers
+    )
 
     # Visualizar el árbol de expresión y guardarlo en la misma carpeta que el AFD
-    visualize_syntax_tree(syntax_tree, route, file_format="pdf")
+    if visualize:
+        visualize_syntax_tree(syntax_tree, route, file_format="pdf")
+
+    # 12b. Modo perezoso: se exporta el autómata de posiciones y los estados
+    # del AFD se construyen durante el escaneo, sin subconjuntos ni minimización.
+    if lazy:
+        lazy_afd = build_lazy_afd(
+            syntax_tree, pos_sym_map, marker_map_full, keywords=keyword_table
+        )
+        with open(out_prefix + "-lazy.pickle", "wb") as f:
+            pickle.dump(lazy_afd, f)
+        if verbose:
+            print(f"\nAFD perezoso exportado a {out_prefix}-lazy.pickle.")
+        return out_prefix + "-lazy.pickle"
 
     # 13. Construcción y minimización del AFD
     marker_to_action = {m: tkn for m, (_, tkn) in marker_map_full.items()}
     states, trans, acc, st_tok = construct_afd(
         syntax_tree, pos_sym_map, marker_to_action
     )
+    # Se podan los estados inalcanzables y muertos antes de minimizar (menos
+    # estados que refinar) y otra vez después, por si la minimización deja alguno
+    states, trans, acc, st_tok, stats = prune_dead_states(
+        states, trans, acc, "A", st_tok
+    )
+    if verbose:
+        print("Poda del AFD directo: " + format_prune_stats(stats))
     new_states, new_trans, new_acc, new_init, new_tok = minimize_afd(
         states, trans, acc, st_tok
     )
-    visualize_afd(states, trans, acc, route)
-    visualize_minimized_afd(new_states, new_trans, new_acc, new_init, route)
-
-    print("Tokens viejos generados")
-    for state, token in st_tok.items():
-        print(f"{state} -> {token}")
-    print("Tokens generados:")
-    for state, token in new_tok.items():
-        print(f"{state} -> {token}")
-
-    # 14. Mostrar
-    print("\nMapping de marcadores:")
-    for m, v in marker_map_full.items():
-        print(f"{m}: {v}")
-
-    # 15. token_to_symbol → dicta (códigoASCII / ws / id)
-    token_to_symbol = {}
-    for sym_code, tok_name in marker_map_full.values():
-        if tok_name not in token_to_symbol:
-            token_to_symbol[tok_name] = sym_code
-
-    # 16. Conversión recursiva de new_tok a tuplas
+    new_states, new_trans, new_acc, new_tok, stats = prune_dead_states(
+        new_states, new_trans, new_acc, new_init, new_tok
+    )
+    if verbose:
+        print("Poda del AFD minimizado: " + format_prune_stats(stats))
+    if visualize:
+        visualize_afd(states, trans, acc, route)
+        visualize_minimized_afd(new_states, new_trans, new_acc, new_init, route)
+
+    if verbose:
+        print("Tokens viejos generados")
+        for state, token in st_tok.items():
+            print(f"{state} -> {token}")
+        print("Tokens generados:")
+        for state, token in new_tok.items():
+            print(f"{state} -> {token}")
+
+        # 14. Mostrar
+        print("\nMapping de marcadores:")
+        for m, v in marker_map_full.items():
+            print(f"{m}: {v}")
+
+    # 15. Conversión recursiva de new_tok a tuplas
     def convert(obj):
         if isinstance(obj, str):
             return (token_to_symbol.get(obj, ""), obj)
@@ -214,7 +290,7 @@ if __name__ == "__main__":
 
     token_actions_final = {st: convert(tk) for st, tk in new_tok.items()}
 
-    # 17. Diccionario final y exportación
+    # 16. Diccionario final y exportación
     afd_minimized = {
         "states": new_states,
         "transitions": new_trans,
@@ -222,16 +298,40 @@ if __name__ == "__main__":
         "initial_state": new_init,
         "token_actions": token_actions_final,
     }
-
-    if not os.path.exists("../lexers"):
-        os.makedirs("./lexers", exist_ok=True)
+    if keywords:
+        afd_minimized["keywords"] = keyword_table
 
     # Exportar a JSON para lexing (solo para visualizar)
     json_afd = make_json_serializable(afd_minimized)
-    with open("../lexers/lexer-4.json", "w") as f:
+    with open(out_prefix + ".json", "w") as f:
         json.dump(json_afd, f, indent=4)
-    print("\nDatos del AFD minimizado exportados a lexer.json.")
+    if verbose:
+        print(f"\nDatos del AFD minimizado exportados a {out_prefix}.json.")
 
-    with open("../lexers/lexer-4.pickle", "wb") as f:
+    with open(out_prefix + ".pickle", "wb") as f:
         pickle.dump(afd_minimized, f)
-    print("\nDatos del AFD minimizado exportados a lexer.pickle.")
+    if verbose:
+        print(f"\nDatos del AFD minimizado exportados a {out_prefix}.pickle.")
+    return out_prefix + ".pickle"
+
+
+if __name__ == "__main__":
+    # Uso: python yalex_parser.py [ruta] [--lazy] [--keywords] [--graphs]   (por defecto slr-4)
+    args = [a for a in sys.argv[1:] if a[:2] != "--"]
+    route = args[0] if args else "slr-4"
+    yal_path = os.path.join("../spec/yalfiles", f"{route}.yal")
+    # Los grafos son opcionales; con --graphs se renderizan en segundo plano
+    # mientras se construye el AFD
+    graphs = "--graphs" in sys.argv
+    if graphs:
+        start_render_queue()
+    build_lexer(
+        yal_path,
+        "../lexers",
+        route,
+        lazy="--lazy" in sys.argv,
+        visualize=graphs,
+        keywords="--keywords" in sys.argv,
+    )
+    if graphs:
+        wait_for_renders()
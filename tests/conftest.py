@@ -0,0 +1,83 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for sub in ("yapar", "lex"):
+    sys.path.insert(0, os.path.join(ROOT, sub))
+sys.path.insert(0, ROOT)
+
+SPEC_DIR = os.path.join(ROOT, "spec")
+TESTS_DIR = os.path.join(ROOT, "tests")
+LEXERS_DIR = os.path.join(ROOT, "lexers")
+
+# Especificaciones con lexer (.yal) y gramática (.yalp); la entrada de ejemplo
+# de cada una es tests/test_yalp<n>.txt
+SPECS = ["slr-1", "slr-2", "slr-3", "slr-4"]
+
+# Entradas erróneas para comparar drivers: errores sintácticos, fin de entrada
+# prematuro, caracteres que el lexer no reconoce y la entrada vacía (según la
+# especificación, cada una cae en uno u otro caso)
+BAD_INPUTS = [
+    "a + ;",
+    "1 + ;",
+    "(a + b",
+    "(1 + 2",
+    "a b;",
+    "1 2;",
+    "a # b;",
+    "x := := 3;",
+    "a := (b;",
+    "",
+]
+
+
+def spec_paths(route: str) -> dict:
+    n = route[4:]
+    return {
+        "yal": os.path.join(SPEC_DIR, "yalfiles", route + ".yal"),
+        "yalp": os.path.join(SPEC_DIR, "yalpfiles", route + ".yalp"),
+        "dfa": os.path.join(LEXERS_DIR, f"lexer-{n}.pickle"),
+        "input": os.path.join(TESTS_DIR, f"test_yalp{n}.txt"),
+    }
+
+
+@pytest.fixture(params=SPECS)
+def spec(request):
+    paths = spec_paths(request.param)
+    paths["route"] = request.param
+    return paths
+
+
+@pytest.fixture(scope="session")
+def tables_for(tmp_path_factory):
+    """Compila (una vez por sesión) las tablas de una especificación."""
+    from parser import build_parser_tables
+
+    cache = {}
+
+    def build(route: str, method: str = "slr") -> dict:
+        key = (route, method)
+        if key not in cache:
+            paths = spec_paths(route)
+            out = tmp_path_factory.mktemp(f"{route}-{method}")
+            cache[key] = build_parser_tables(
+                paths["yalp"], paths["dfa"], str(out), visualize=False, method=method
+            )
+        return cache[key]
+
+    return build
+
+
+def input_tokens(route: str, text: str | None = None) -> list:
+    """(token, lexema) de la entrada de ejemplo (o de `text`), sin los ignorados."""
+    from artifacts import load_artifact
+    from lexer import TokenBuffer
+    from sim_slr import SKIP_TOKENS
+
+    paths = spec_paths(route)
+    if text is None:
+        with open(paths["input"], encoding="utf-8") as f:
+            text = f.read()
+    return list(TokenBuffer(SKIP_TOKENS).fill(text, load_artifact(paths["dfa"])))
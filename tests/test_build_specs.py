@@ -0,0 +1,96 @@
+import os
+
+import build_specs
+import parser as yapar_parser
+from conftest import spec_paths
+
+
+def use_tmp_dirs(monkeypatch, tmp_path):
+    monkeypatch.setattr(build_specs, "LEXERS_DIR", str(tmp_path / "lexers"))
+    monkeypatch.setattr(build_specs, "OUTPUT_DIR", str(tmp_path / "output"))
+
+
+def test_lazy_build_compiles_lexer_and_tables(monkeypatch, tmp_path):
+    use_tmp_dirs(monkeypatch, tmp_path)
+    assert build_specs.main(["slr-2", "--force", "--lazy", "--jobs", "1"]) == 0
+    assert os.path.exists(tmp_path / "lexers" / "lexer-2-lazy.pickle")
+    assert os.path.exists(tmp_path / "output" / "slr-2" / "SLR" / "slr_table.pickle")
+
+
+def test_lazy_token_map_matches_eager(monkeypatch, tmp_path):
+    use_tmp_dirs(monkeypatch, tmp_path)
+    paths = spec_paths("slr-4")
+    build_specs.build_spec("slr-4", paths["yal"], paths["yalp"], force=True, lazy=True)
+    tokens_decl = yapar_parser.parse_yalp_file(paths["yalp"])[0]
+    lazy_map = yapar_parser.infer_token_map_from_pickle(
+        str(tmp_path / "lexers" / "lexer-4-lazy.pickle"), tokens_decl
+    )
+    assert lazy_map == yapar_parser.infer_token_map_from_pickle(paths["dfa"], tokens_decl)
+
+
+def test_parser_main_accepts_lazy_pickle(monkeypatch, tmp_path):
+    use_tmp_dirs(monkeypatch, tmp_path)
+    paths = spec_paths("slr-1")
+    build_specs.build_spec("slr-1", paths["yal"], paths["yalp"], force=True, lazy=True)
+    monkeypatch.setattr(yapar_parser, "visualize_lr0_automaton", lambda *a, **k: None)
+    out = tmp_path / "run"
+    yapar_parser.main(
+        paths["yalp"],
+        paths["input"],
+        str(tmp_path / "lexers" / "lexer-1-lazy.pickle"),
+        str(out),
+        "slr",
+    )
+    report = (out / "parser_output.txt").read_text(encoding="utf-8")
+    assert report.split()[-1] == "ACCEPT"
+
+
+def test_token_map_includes_keywords(tmp_path):
+    from yalex_parser import build_lexer
+
+    yal = tmp_path / "kw.yal"
+    yal.write_text(
+        "let letter = ['a'-'z']\n"
+        "\n"
+        "rule tokens =\n"
+        "    [' ']+              { return WHITESPACE }\n"
+        "  | \"if\"              { return IF }\n"
+        "  | letter+            { return ID }\n"
+        "  | ';'                { return SEMICOLON }\n",
+        encoding="utf-8",
+    )
+    tokens_decl = ["IF", "ID", "SEMICOLON", "WHITESPACE"]
+    maps = {}
+    for keywords in (False, True):
+        path = build_lexer(
+            str(yal),
+            str(tmp_path / str(keywords)),
+            "kw",
+            visualize=False,
+            verbose=False,
+            keywords=keywords,
+        )
+        maps[keywords] = yapar_parser.infer_token_map_from_pickle(path, tokens_decl)
+    assert "IF" in maps[True].values()
+    assert maps[True] == maps[False]
+
+
+def test_switching_build_modes_rebuilds(monkeypatch, tmp_path):
+    use_tmp_dirs(monkeypatch, tmp_path)
+    paths = spec_paths("slr-1")
+    args = ("slr-1", paths["yal"], paths["yalp"])
+    _, timings = build_specs.build_spec(*args)
+    assert timings["lexer"] is not None and timings["parser"] is not None
+    _, timings = build_specs.build_spec(*args)
+    assert timings == {"lexer": None, "parser": None}
+
+    # --keywords escribe el mismo pickle: no debe darse por al día
+    _, timings = build_specs.build_spec(*args, keywords=True)
+    assert timings["lexer"] is not None and timings["parser"] is not None
+    _, timings = build_specs.build_spec(*args, keywords=True)
+    assert timings == {"lexer": None, "parser": None}
+
+    _, timings = build_specs.build_spec(*args, lazy=True)
+    assert timings["lexer"] is not None
+    _, timings = build_specs.build_spec(*args)
+    assert timings["lexer"] is not None and timings["parser"] is not None
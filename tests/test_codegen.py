@@ -0,0 +1,42 @@
+import importlib.util
+
+import pytest
+
+import parse_trace
+from codegen import generate_parser_module
+from conftest import BAD_INPUTS, SPECS, input_tokens
+from sim_slr import run_lr_parser
+
+
+def load_generated(tables, path):
+    generate_parser_module(tables["packed"], tables["productions_list"], str(path))
+    module_spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(module_spec)
+    module_spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_generated_module_matches_run_lr_parser(tables_for, tmp_path, route):
+    tables = tables_for(route)
+    module = load_generated(tables, tmp_path / "generated_parser.py")
+    sample = input_tokens(route)
+    cases = [sample, sample[: len(sample) // 2], sample + [("NOPE", "?")]]
+    cases += [input_tokens(route, text) for text in BAD_INPUTS]
+    for tokens in cases:
+        expected_trace = parse_trace.make_trace("full")
+        expected = run_lr_parser(tables["packed"], tokens, expected_trace)
+        trace = parse_trace.make_trace("full")
+        assert module.parse(tokens, trace) == expected
+        assert trace == expected_trace
+    assert module.parse(sample) == (True, None)
+
+
+def test_generated_module_is_standalone(tables_for, tmp_path):
+    path = tmp_path / "generated_parser.py"
+    generate_parser_module(
+        tables_for("slr-1")["packed"], tables_for("slr-1")["productions_list"], str(path)
+    )
+    source = path.read_text(encoding="utf-8")
+    assert "\nimport " not in source
+    assert "\nfrom " not in source.replace("from __future__ import annotations", "")
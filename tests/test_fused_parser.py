@@ -0,0 +1,43 @@
+import pytest
+
+import parse_trace
+from artifacts import load_artifact
+from conftest import BAD_INPUTS, SPECS, spec_paths
+from fused_parser import FusedParser
+from lexer import lex
+from sim_slr import run_lr_parser
+
+
+def modular_parse(packed, text: str, dfa, trace=None):
+    return run_lr_parser(
+        packed, ((name, lexeme) for (_, name), lexeme in lex(text, dfa)), trace
+    )
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_fused_parser_matches_run_lr_parser(tables_for, route):
+    packed = tables_for(route)["packed"]
+    paths = spec_paths(route)
+    dfa = load_artifact(paths["dfa"])
+    with open(paths["input"], encoding="utf-8") as f:
+        sample = f.read()
+    fused = FusedParser(dfa, packed)
+    assert fused.parse(sample) == (True, None)
+    for text in [sample, sample[: len(sample) // 2], sample + "\n@"] + BAD_INPUTS:
+        assert fused.parse(text) == modular_parse(packed, text, dfa), text
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_fused_parser_trace_matches_lr_steps(tables_for, route):
+    # El bucle de FusedParser es una copia del de lr_steps: la traza debe
+    # coincidir registro a registro, incluido el estado de los errores
+    packed = tables_for(route)["packed"]
+    paths = spec_paths(route)
+    dfa = load_artifact(paths["dfa"])
+    with open(paths["input"], encoding="utf-8") as f:
+        sample = f.read()
+    fused = FusedParser(dfa, packed)
+    for text in [sample, sample[: len(sample) // 2], sample + "\n@"] + BAD_INPUTS:
+        expected, got = parse_trace.make_trace("full"), parse_trace.make_trace("full")
+        assert fused.parse(text, got) == modular_parse(packed, text, dfa, expected)
+        assert list(got) == list(expected), text
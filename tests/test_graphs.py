@@ -0,0 +1,27 @@
+import parser as yapar_parser
+from conftest import spec_paths
+
+
+def test_parser_main_skips_graphs_by_default(monkeypatch, tmp_path):
+    def fail(*args, **kwargs):
+        raise AssertionError("no se pidieron grafos")
+
+    monkeypatch.setattr(yapar_parser, "visualize_lr0_automaton", fail)
+    monkeypatch.setattr(yapar_parser, "start_render_queue", fail)
+    paths = spec_paths("slr-1")
+    yapar_parser.main(paths["yalp"], paths["input"], paths["dfa"], str(tmp_path))
+    report = (tmp_path / "parser_output.txt").read_text(encoding="utf-8")
+    assert report.split()[-1] == "ACCEPT"
+
+
+def test_parser_main_draws_the_automaton_with_graphs(monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr(
+        yapar_parser, "visualize_lr0_automaton", lambda *a, **k: calls.append(a)
+    )
+    monkeypatch.setattr(yapar_parser, "start_render_queue", lambda: calls.append("queue"))
+    paths = spec_paths("slr-1")
+    yapar_parser.main(
+        paths["yalp"], paths["input"], paths["dfa"], str(tmp_path), graphs=True
+    )
+    assert calls[0] == "queue" and len(calls) == 2
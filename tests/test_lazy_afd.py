@@ -0,0 +1,58 @@
+import pickle
+import string
+
+import pytest
+
+from conftest import BAD_INPUTS, SPECS, spec_paths
+from lexer import lex
+from yalex_parser import build_lexer
+
+
+def build(tmp_path, route, **kwargs):
+    path = build_lexer(
+        spec_paths(route)["yal"],
+        str(tmp_path),
+        route,
+        visualize=False,
+        verbose=False,
+        **kwargs,
+    )
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def texts(route: str) -> list:
+    with open(spec_paths(route)["input"], encoding="utf-8") as f:
+        sample = f.read()
+    return [sample, string.printable] + BAD_INPUTS
+
+
+@pytest.mark.parametrize("keywords", [False, True])
+@pytest.mark.parametrize("route", SPECS)
+def test_lazy_afd_matches_the_minimized_afd(tmp_path, route, keywords):
+    eager = build(tmp_path, route, keywords=keywords)
+    lazy = build(tmp_path, route, keywords=keywords, lazy=True)
+    for text in texts(route):
+        assert list(lazy.lex(text)) == list(lex(text, eager))
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_lazy_afd_with_a_tiny_cache_still_matches(tmp_path, route):
+    eager = build(tmp_path, route)
+    lazy = build(tmp_path, route, lazy=True)
+    lazy.memory_budget = 1
+    lazy._reset_cache()
+    for text in texts(route):
+        assert list(lazy.lex(text)) == list(lex(text, eager))
+    stats = lazy.stats()
+    assert stats["evictions"] > 0
+    assert stats["cached_states"] == 1
+
+
+def test_lazy_afd_pickles_without_its_cache(tmp_path):
+    lazy = build(tmp_path, "slr-2", lazy=True)
+    list(lazy.lex("a + b;"))
+    assert lazy.stats()["built_states"] > 0
+    restored = pickle.loads(pickle.dumps(lazy))
+    assert restored.stats()["built_states"] == 0
+    assert list(restored.lex("a + b;")) == list(lazy.lex("a + b;"))
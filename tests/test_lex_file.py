@@ -0,0 +1,24 @@
+import pytest
+
+from artifacts import load_artifact
+from conftest import SPECS, spec_paths
+from lexer import lex, lex_file
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+@pytest.mark.parametrize("route", SPECS)
+def test_lex_file_matches_lex_at_any_chunk_size(tmp_path, route, chunk_size):
+    paths = spec_paths(route)
+    dfa = load_artifact(paths["dfa"])
+    with open(paths["input"], encoding="utf-8") as f:
+        sample = f.read()
+    for k, text in enumerate([sample, "a + ;\n(1 + 2\na # b;", "x := 4.2E-1 <= 1000"]):
+        path = tmp_path / f"input{k}.txt"
+        path.write_text(text, encoding="utf-8")
+        assert list(lex_file(str(path), dfa, chunk_size)) == list(lex(text, dfa))
+
+
+def test_lex_file_of_an_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("", encoding="utf-8")
+    assert list(lex_file(str(path), load_artifact(spec_paths("slr-1")["dfa"]), 4)) == []
@@ -0,0 +1,33 @@
+import pytest
+
+import parallel_parse
+from conftest import BAD_INPUTS, SPECS, input_tokens
+from parallel_parse import parse_parallel, split_segments, split_tokens
+from sim_slr import run_lr_parser
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_parallel_parse_matches_run_lr_parser(tables_for, monkeypatch, route):
+    # segmentos chicos para que la entrada se reparta en varias tareas
+    monkeypatch.setattr(parallel_parse, "SEGMENTS_PER_TASK", 4)
+    tables = tables_for(route)
+    sample = input_tokens(route)
+    cases = [sample * 5, sample * 5 + sample[: len(sample) // 2]]
+    cases += [sample + input_tokens(route, text) + sample for text in BAD_INPUTS]
+    for tokens in cases:
+        expected = run_lr_parser(tables["packed"], tokens)
+        assert parse_parallel(tables, tokens, jobs=2) == expected
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_segments_are_whole_statements(tables_for, route):
+    tables = tables_for(route)
+    split = split_tokens(tables)
+    if split is None:
+        pytest.skip("la gramática no es una lista de sentencias")
+    tokens = input_tokens(route)
+    begin = 0
+    for end in split_segments(tokens, *split):
+        assert run_lr_parser(tables["packed"], tokens[begin:end]) == (True, None)
+        begin = end
+    assert begin == len(tokens)
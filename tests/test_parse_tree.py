@@ -0,0 +1,78 @@
+import pytest
+
+import parser as yapar_parser
+import sim_slr
+from conftest import SPECS, input_tokens, spec_paths
+from parse_tree import ParseTree
+from sim_slr import parse_statements, run_lr_parser, statement_symbols
+
+
+def leaves(tree: ParseTree) -> list:
+    out = []
+    pending = [tree.root]
+    while pending:
+        n = pending.pop()
+        if tree.is_leaf(n):
+            out.append((tree.symbol(n), tree.first[n]))
+        else:
+            pending.extend(reversed(tree.child_ids(n)))
+    return out
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_tree_leaves_are_the_input_tokens(tables_for, route):
+    tables = tables_for(route)
+    tokens = input_tokens(route)
+    tree = ParseTree(tables["packed"].terminals, tables["productions_list"])
+    assert run_lr_parser(tables["packed"], tokens, tree=tree) == (True, None)
+    assert leaves(tree) == [(tok, k) for k, (tok, _) in enumerate(tokens)]
+    assert tree.symbol(tree.root) == tables["productions_list"][0][2][0]
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_statement_trees_cover_the_input(tables_for, route):
+    tables = tables_for(route)
+    tokens = input_tokens(route)
+    statements = statement_symbols(tables["productions_list"], tables["start_symbol"])
+    results = list(
+        parse_statements(
+            tables["packed"],
+            tables["productions_list"],
+            tokens,
+            statements,
+            build_tree=True,
+        )
+    )
+    assert all(r["error"] is None for r in results)
+    assert [tok for r in results for tok in r["tokens"]] == tokens
+    for r in results:
+        found = leaves(r["tree"])
+        # índices relativos a los tokens de la sentencia, en orden
+        assert [k for _, k in found] == sorted({k for _, k in found})
+        assert all(r["tokens"][k][0] == sym for sym, k in found)
+
+
+def test_main_builds_the_tree_in_the_same_pass(monkeypatch, tmp_path):
+    paths = spec_paths("slr-2")
+    monkeypatch.setattr(yapar_parser, "visualize_lr0_automaton", lambda *a, **k: None)
+    calls = []
+    original = sim_slr.lr_steps
+
+    def counting(*args, **kwargs):
+        calls.append(kwargs.get("tree", args[3] if len(args) > 3 else None))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(sim_slr, "lr_steps", counting)
+    for options in ({}, {"trace": "ring"}, {"fused": True}):
+        calls.clear()
+        yapar_parser.main(
+            paths["yalp"],
+            paths["input"],
+            paths["dfa"],
+            str(tmp_path),
+            "slr",
+            build_tree=True,
+            **options,
+        )
+        assert len(calls) == 1 and calls[0] is not None
+        assert (tmp_path / "parse_tree.txt").read_text(encoding="utf-8").startswith("S'")
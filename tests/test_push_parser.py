@@ -0,0 +1,62 @@
+import pytest
+
+import parse_trace
+from conftest import BAD_INPUTS, SPECS, input_tokens
+from sim_slr import PushParser, run_lr_parser
+
+
+def cases(route: str) -> list:
+    """Entrada de ejemplo, su mitad y las entradas erróneas, como tokens."""
+    sample = input_tokens(route)
+    return (
+        [sample, sample[: len(sample) // 2], sample + [("NOPE", "?")]]
+        + [input_tokens(route, text) for text in BAD_INPUTS]
+    )
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_push_parser_matches_run_lr_parser(tables_for, route):
+    packed = tables_for(route)["packed"]
+    for tokens in cases(route):
+        expected_trace = parse_trace.make_trace("full")
+        expected = run_lr_parser(packed, tokens, expected_trace)
+
+        trace = parse_trace.make_trace("full")
+        parser = PushParser(packed, trace)
+        for token, lexeme in tokens:
+            parser.feed(token, lexeme)
+        assert parser.finish() == expected
+        assert trace == expected_trace
+
+
+def test_push_parser_stops_after_the_first_error(tables_for):
+    packed = tables_for("slr-1")["packed"]
+    parser = PushParser(packed)
+    assert parser.feed_many(input_tokens("slr-1", "a + ;")) is False
+    assert parser.done and parser.error is not None
+    assert parser.feed("ID", "b") is False
+    assert parser.finish() == run_lr_parser(packed, input_tokens("slr-1", "a + ;"))
+
+
+def test_push_parser_skips_ignored_tokens(tables_for):
+    packed = tables_for("slr-1")["packed"]
+    parser = PushParser(packed)
+    assert parser.feed_many([("ID", "a"), ("WS", " "), ("SEMICOLON", ";")])
+    assert parser.finish() == (True, None)
+    assert parser.feed("ID", "b") is False
+
+
+def test_push_parser_applies_default_reductions_before_the_next_token(tables_for):
+    tables = tables_for("slr-1")
+    packed = tables["packed"]
+    trace = parse_trace.make_trace("full")
+    parser = PushParser(packed, trace)
+    parser.feed("ID", "a")
+    # factor → ID y term → factor son reducciones por defecto: se aplican sin
+    # esperar al token que sigue a 'a'
+    reduced = [record[2] for record in trace if record[0] == parse_trace.REDUCE]
+    assert [tables["productions_list"][p][1:] for p in reduced] == [
+        ("factor", ["ID"]),
+        ("term", ["factor"]),
+    ]
+    assert packed.default_reduce[trace[-1][1]] != 0
@@ -0,0 +1,69 @@
+import pytest
+
+from conftest import SPECS, input_tokens
+from sim_slr import simulate_slr_parser
+
+
+def simulate(tables, tokens, **kwargs):
+    return simulate_slr_parser(
+        tables["packed"],
+        None,
+        tables["productions_list"],
+        tokens,
+        tables["start_symbol"],
+        verbose=False,
+        recovery=tables["recovery"],
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("method", ["slr", "lalr"])
+@pytest.mark.parametrize("route", SPECS)
+def test_recovery_targets_have_an_action_on_their_token(tables_for, route, method):
+    tables = tables_for(route, method)
+    for sync in tables["recovery"].values():
+        for terminal, (_, next_state) in sync.items():
+            assert tables["action_table"][next_state].get(terminal) is not None
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_valid_input_is_accepted_with_recovery_enabled(tables_for, route):
+    accepted, _, error = simulate(tables_for(route), input_tokens(route))
+    assert accepted and error is None
+
+
+def test_recovers_inside_parentheses_without_cycling(tables_for):
+    tables = tables_for("slr-2")
+    tokens = input_tokens("slr-2", "a + ;\nb * c;\n(d + e;\nf;")
+    accepted, actions, error = simulate(tables, tokens)
+    kinds = [a[0] for a in actions]
+    assert not accepted
+    assert "fatal" not in kinds
+    assert error == f"Se recuperó de {kinds.count('error')} errores sintácticos."
+    # cada error se resuelve con una sola recuperación, y después de
+    # recuperarse el siguiente token siempre se desplaza
+    assert kinds.count("error") == kinds.count("recover") <= 3
+    for k, kind in enumerate(kinds):
+        if kind == "recover":
+            following = [x for x in kinds[k + 1 :] if x != "reduce"]
+            assert following[0] in ("shift", "accept")
+    # las sentencias correctas se siguen analizando: 'b * c' y 'f'
+    shifted = [a[2] for a in actions if a[0] == "shift"]
+    assert shifted.count("TIMES") == 1
+
+
+def test_error_budget_is_enforced(tables_for):
+    tables = tables_for("slr-2")
+    tokens = input_tokens("slr-2", "a + ; " * 20)
+    accepted, actions, error = simulate(tables, tokens, max_errors=3)
+    assert not accepted
+    assert error == "Error fatal: demasiados errores."
+    assert [a[0] for a in actions].count("error") == 4
+
+
+def test_discard_budget_is_enforced(tables_for):
+    tables = tables_for("slr-2")
+    tokens = input_tokens("slr-2", ") " * 50 + "a;")
+    accepted, _, error = simulate(tables, tokens, max_discarded=10)
+    assert not accepted
+    assert error == "Error fatal: demasiados tokens descartados."
@@ -0,0 +1,90 @@
+import pytest
+
+from conftest import input_tokens
+from semantics import SemanticStack, production_index
+from sim_slr import PushParser, run_lr_parser
+
+
+def calculator(productions, env):
+    """Callbacks de slr-2 que evalúan cada sentencia y juntan los resultados."""
+    binary = {
+        "PLUS": lambda a, b: a + b,
+        "MINUS": lambda a, b: a - b,
+        "TIMES": lambda a, b: a * b,
+        "DIV": lambda a, b: a / b,
+    }
+    callbacks = {
+        production_index(productions, "factor", ["NUMBER"]): float,
+        production_index(productions, "factor", ["ID"]): lambda name: env[name],
+        production_index(productions, "factor", ["LPAREN", "expression", "RPAREN"]): (
+            lambda _, value, __: value
+        ),
+        production_index(productions, "general", ["expression", ";"]): (
+            lambda value, _: [value]
+        ),
+        production_index(productions, "general", ["general", "SEMICOLON", "expression"]): (
+            lambda values, _, value: values + [value]
+        ),
+        production_index(productions, "S", ["general"]): lambda values: values,
+        production_index(productions, "S", ["S", "general"]): (
+            lambda values, more: values + more
+        ),
+    }
+    for lhs, rhs_tail in (("expression", ("PLUS", "MINUS")), ("term", ("TIMES", "DIV"))):
+        operand = "term" if lhs == "expression" else "factor"
+        for op in rhs_tail:
+            idx = production_index(productions, lhs, [lhs, op, operand])
+            callbacks[idx] = lambda a, _, b, op=op: binary[op](a, b)
+    return callbacks
+
+
+TEXT = "1 + 2 * 3;\n(1 + 2) * 3;\n8 / 2 - a;\nb * (a + 3.5);\n"
+EXPECTED = [7.0, 9.0, 3.0, 9.0]
+
+
+def test_semantic_stack_evaluates_each_statement(tables_for):
+    tables = tables_for("slr-2")
+    semantics = SemanticStack(calculator(tables["productions_list"], {"a": 1, "b": 2}))
+    tokens = input_tokens("slr-2", TEXT)
+    assert run_lr_parser(tables["packed"], tokens, semantics=semantics) == (True, None)
+    assert semantics.result == EXPECTED
+    assert semantics.values == []
+
+
+def test_semantic_stack_in_the_push_parser(tables_for):
+    tables = tables_for("slr-2")
+    semantics = SemanticStack(calculator(tables["productions_list"], {"a": 1, "b": 2}))
+    parser = PushParser(tables["packed"], semantics=semantics)
+    for token, lexeme in input_tokens("slr-2", TEXT):
+        assert parser.feed(token, lexeme)
+    assert parser.finish() == (True, None)
+    assert semantics.result == EXPECTED
+
+
+def test_productions_without_callback_keep_their_first_value(tables_for):
+    tables = tables_for("slr-2")
+    semantics = SemanticStack({})
+    tokens = input_tokens("slr-2", "(x + 1) * 2;")
+    assert run_lr_parser(tables["packed"], tokens, semantics=semantics) == (True, None)
+    # $$ = $1 en todas las reducciones: queda el primer lexema, "("
+    assert semantics.result == "("
+
+
+def test_error_leaves_the_partial_values(tables_for):
+    tables = tables_for("slr-2")
+    semantics = SemanticStack(calculator(tables["productions_list"], {}))
+    accepted, _ = run_lr_parser(
+        tables["packed"], input_tokens("slr-2", "1 + ;"), semantics=semantics
+    )
+    assert not accepted
+    assert semantics.result is None
+    assert semantics.values == [1.0, "+"]
+
+
+def test_production_index_rejects_unknown_productions(tables_for):
+    productions = tables_for("slr-2")["productions_list"]
+    assert production_index(productions, "factor", ("ID",)) == production_index(
+        productions, "factor", ["ID"]
+    )
+    with pytest.raises(KeyError, match="factor → ID ID"):
+        production_index(productions, "factor", ["ID", "ID"])
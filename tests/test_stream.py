@@ -0,0 +1,58 @@
+import pytest
+
+import parser as yapar_parser
+from conftest import SPECS, input_tokens, spec_paths
+from sim_slr import parse_statements, statement_symbols
+
+
+@pytest.mark.parametrize(
+    "route, expected",
+    [("slr-1", "general"), ("slr-2", "general"), ("slr-3", "general"), ("slr-4", "m")],
+)
+def test_statement_symbol_comes_from_the_list_production(tables_for, route, expected):
+    tables = tables_for(route)
+    assert statement_symbols(tables["productions_list"], tables["start_symbol"]) == {
+        expected
+    }
+
+
+def test_statement_symbols_without_a_list():
+    productions = [(0, "S'", ["S"]), (1, "S", ["ID", "PLUS", "ID"])]
+    assert statement_symbols(productions, "S") == {"S"}
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_each_statement_is_reported_separately(tables_for, route):
+    tables = tables_for(route)
+    tokens = input_tokens(route)
+    statements = statement_symbols(tables["productions_list"], tables["start_symbol"])
+    results = list(
+        parse_statements(tables["packed"], tables["productions_list"], tokens, statements)
+    )
+    assert all(r["error"] is None for r in results)
+    with open(spec_paths(route)["input"], encoding="utf-8") as f:
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    assert len(results) == len(lines)
+    assert [tok for r in results for tok in r["tokens"]] == tokens
+
+
+def test_main_stream_on_a_right_recursive_grammar(monkeypatch, tmp_path, capsys):
+    paths = spec_paths("slr-4")
+    monkeypatch.setattr(yapar_parser, "visualize_lr0_automaton", lambda *a, **k: None)
+    yapar_parser.main(
+        paths["yalp"], paths["input"], paths["dfa"], str(tmp_path), stream=True
+    )
+    assert "no admite la traza completa" in capsys.readouterr().out
+    report = (tmp_path / "statements.txt").read_text(encoding="utf-8").splitlines()
+    with open(paths["input"], encoding="utf-8") as f:
+        n_lines = len([line for line in f.read().splitlines() if line.strip()])
+    assert len(report) == n_lines
+    assert all(": ACCEPT " in line for line in report)
+
+
+def test_write_statement_stream_rejects_the_full_trace(tables_for, tmp_path):
+    paths = spec_paths("slr-1")
+    with pytest.raises(ValueError, match="full"):
+        yapar_parser.write_statement_stream(
+            tables_for("slr-1"), None, paths["input"], str(tmp_path), "full", 10, False
+        )
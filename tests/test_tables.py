@@ -0,0 +1,121 @@
+import random
+
+import pytest
+
+import parse_trace
+from conftest import BAD_INPUTS, SPECS, input_tokens
+from LALR import compute_lalr_lookaheads
+from LR0 import lr0_items
+from packed_tables import PackedTables, pack_rows
+from sim_slr import run_lr_parser
+from SLR import compute_default_reductions
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_lalr_lookaheads_are_within_follow(tables_for, route):
+    tables = tables_for(route, "lalr")
+    grammar = tables["grammar"]
+    states, transitions, _ = lr0_items(grammar)
+    lookaheads = compute_lalr_lookaheads(grammar, states, transitions)
+    assert lookaheads
+    for (_, lhs, _), symbols in lookaheads.items():
+        assert symbols <= set(tables["follow"][lhs])
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_lalr_table_is_a_subset_of_the_slr_table(tables_for, route):
+    slr = tables_for(route, "slr")["action_table"]
+    lalr = tables_for(route, "lalr")["action_table"]
+    assert len(slr) == len(lalr)
+    for state, row in lalr.items():
+        for terminal, action in row.items():
+            assert slr[state].get(terminal) == action
+    assert tables_for(route, "lalr")["goto_table"] == tables_for(route, "slr")["goto_table"]
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_lalr_and_slr_accept_the_same_inputs(tables_for, route):
+    slr = tables_for(route, "slr")["packed"]
+    lalr = tables_for(route, "lalr")["packed"]
+    sample = input_tokens(route)
+    cases = [sample, sample[: len(sample) // 2]]
+    cases += [input_tokens(route, text) for text in BAD_INPUTS]
+    assert run_lr_parser(lalr, sample) == (True, None)
+    for tokens in cases:
+        assert run_lr_parser(lalr, tokens)[0] == run_lr_parser(slr, tokens)[0]
+
+
+def packed_without_defaults(tables):
+    return PackedTables(
+        tables["action_table"],
+        tables["goto_table"],
+        tables["tokens"],
+        list(tables["grammar"].productions),
+        productions_enum=tables["productions_list"],
+    )
+
+
+@pytest.mark.parametrize("method", ["slr", "lalr"])
+@pytest.mark.parametrize("route", SPECS)
+def test_packed_tables_match_the_dict_tables(tables_for, route, method):
+    tables = tables_for(route, method)
+    packed = packed_without_defaults(tables)
+    for state, row in tables["action_table"].items():
+        for terminal in packed.terminals:
+            assert packed.action(state, terminal) == row.get(terminal)
+    for state, row in tables["goto_table"].items():
+        for nonterminal in packed.nonterminals:
+            assert packed.goto(state, nonterminal) == row.get(nonterminal)
+    assert packed.action(len(tables["action_table"]), "$") is None
+    assert packed.action(0, "NOPE") is None
+
+
+def test_pack_rows_random_tables():
+    rng = random.Random(38)
+    for _ in range(50):
+        n_columns = rng.randint(1, 12)
+        rows = [
+            {
+                c: rng.choice([-3, -1, 1, 2, 7])
+                for c in range(n_columns)
+                if rng.random() < 0.3
+            }
+            for _ in range(rng.randint(1, 30))
+        ]
+        pack = pack_rows(rows, n_columns)
+        assert len(pack["row_of"]) == len(rows)
+        for state, row in enumerate(rows):
+            for column in range(n_columns):
+                expected = row.get(column, 0)
+                assert PackedTables._lookup(pack, state, column) == expected
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_default_reductions_only_in_consistent_states(tables_for, route):
+    tables = tables_for(route)
+    defaults = tables["default_reductions"]
+    assert defaults == compute_default_reductions(tables["action_table"])
+    for state, action in defaults.items():
+        assert action[0] == "r"
+        assert set(tables["action_table"][state].values()) == {action}
+    packed = tables["packed"]
+    for state, row in tables["action_table"].items():
+        for terminal in packed.terminals:
+            expected = defaults.get(state, row.get(terminal))
+            assert packed.action(state, terminal) == expected
+
+
+@pytest.mark.parametrize("route", SPECS)
+def test_default_reductions_keep_results_and_shifts(tables_for, route):
+    tables = tables_for(route)
+    with_defaults = tables["packed"]
+    without = packed_without_defaults(tables)
+    sample = input_tokens(route)
+    cases = [sample, sample[: len(sample) // 2]]
+    cases += [input_tokens(route, text) for text in BAD_INPUTS]
+    for tokens in cases:
+        trace, plain_trace = [], []
+        accepted, _ = run_lr_parser(with_defaults, tokens, trace)
+        assert accepted == run_lr_parser(without, tokens, plain_trace)[0]
+        shifts = [r for r in trace if r[0] == parse_trace.SHIFT]
+        assert shifts == [r for r in plain_trace if r[0] == parse_trace.SHIFT]
@@ -0,0 +1,46 @@
+import os
+import pickle
+
+from artifacts import clear_artifacts, load_artifact
+from conftest import spec_paths
+from lexer import TokenBuffer, lex
+from sim_slr import SKIP_TOKENS
+
+
+def test_token_buffer_matches_lex_without_skipped_tokens():
+    paths = spec_paths("slr-2")
+    dfa = load_artifact(paths["dfa"])
+    with open(paths["input"], encoding="utf-8") as f:
+        text = f.read()
+    expected = [
+        (name, lexeme) for (_, name), lexeme in lex(text, dfa) if name not in SKIP_TOKENS
+    ]
+    buffer = TokenBuffer(SKIP_TOKENS).fill(text, dfa)
+    assert len(buffer) == len(expected)
+    assert list(buffer) == expected
+    assert list(buffer) == expected  # se puede recorrer más de una vez
+
+
+def test_token_buffer_refill_reuses_its_lists():
+    dfa = load_artifact(spec_paths("slr-1")["dfa"])
+    buffer = TokenBuffer(SKIP_TOKENS).fill("a + b;", dfa)
+    names, lexemes = buffer.names, buffer.lexemes
+    buffer.fill("c;", dfa)
+    assert buffer.names is names and buffer.lexemes is lexemes
+    assert list(buffer) == [("ID", "c"), ("SEMICOLON", ";")]
+
+
+def test_load_artifact_caches_until_the_file_changes(tmp_path):
+    path = tmp_path / "artifact.pickle"
+    path.write_bytes(pickle.dumps({"version": 1}))
+    first = load_artifact(str(path))
+    assert load_artifact(str(path)) is first
+
+    path.write_bytes(pickle.dumps({"version": 2, "padding": "x"}))
+    os.utime(path, ns=(0, 0))
+    second = load_artifact(str(path))
+    assert second == {"version": 2, "padding": "x"}
+    assert load_artifact(str(path)) is second
+
+    clear_artifacts()
+    assert load_artifact(str(path)) is not second
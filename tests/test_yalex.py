@@ -0,0 +1,220 @@
+import pickle
+
+import pytest
+
+from conftest import spec_paths
+from lexer import lex
+from regex_parser import RegexSyntaxError, compile_definitions
+from yalex_parser import build_lexer
+from yalex_utils import (
+    clean_token_action,
+    extract_definitions,
+    extract_header_and_trailer,
+    extract_token_rules,
+    order_definitions,
+    remove_comments_yalex,
+    scan_identifiers,
+    split_top_level,
+)
+
+
+def canonical_afd(afd: dict) -> list:
+    """AFD renumerado en orden BFS desde el estado inicial (los nombres de
+    estado dependen del orden de iteración de conjuntos)."""
+    rows = {}
+    for (state, sym), nxt in afd["transitions"].items():
+        rows.setdefault(state, {})[sym] = nxt
+    names = {afd["initial_state"]: 0}
+    order = [afd["initial_state"]]
+    out = []
+    for state in order:
+        row = []
+        for sym in sorted(rows.get(state, {})):
+            nxt = rows[state][sym]
+            if nxt not in names:
+                names[nxt] = len(order)
+                order.append(nxt)
+            row.append((sym, names[nxt]))
+        out.append(
+            (
+                tuple(row),
+                state in afd["accepting_states"],
+                repr(afd["token_actions"].get(state)),
+            )
+        )
+    return out
+
+
+def build_from_text(tmp_path, yal_text: str, **kwargs):
+    yal = tmp_path / "spec.yal"
+    yal.write_text(yal_text, encoding="utf-8")
+    path = build_lexer(
+        str(yal), str(tmp_path), "spec", visualize=False, verbose=False, **kwargs
+    )
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def tokens(text: str, afd) -> list:
+    return [(name, lexeme) for (_, name), lexeme in lex(text, afd)]
+
+
+@pytest.mark.parametrize("route", ["slr-1", "slr-2", "slr-3", "slr-4"])
+def test_rules_build_the_committed_afd(tmp_path, route):
+    paths = spec_paths(route)
+    path = build_lexer(paths["yal"], str(tmp_path), route, visualize=False, verbose=False)
+    with open(path, "rb") as f:
+        built = pickle.load(f)
+    with open(paths["dfa"], "rb") as f:
+        committed = pickle.load(f)
+    assert canonical_afd(built) == canonical_afd(committed)
+
+
+def test_regex_operators(tmp_path):
+    afd = build_from_text(
+        tmp_path,
+        "let digit = ['0'-'9']\n"
+        "let sign = ['+''-']\n"
+        "\n"
+        "rule tokens =\n"
+        "    [' ']+         { return WS }\n"
+        "  | sign? digit+   { return INT }\n"
+        "  | ['a'-'z'] # ['x'-'z'] { return LOW }\n"
+        "  | [^'a'-'z''0'-'9'' ''+''-'] { return OTHER }\n",
+    )
+    assert tokens("-12 b X +3", afd) == [
+        ("INT", "-12"),
+        ("WS", " "),
+        ("LOW", "b"),
+        ("WS", " "),
+        ("OTHER", "X"),
+        ("WS", " "),
+        ("INT", "+3"),
+    ]
+    # 'x' queda fuera de la diferencia de conjuntos
+    assert tokens("x", afd) == [("LEXICAL", "x")]
+
+
+def test_scan_identifiers_keeps_underscore_names():
+    definitions = {"digit": "['0'-'9']", "my_digit": "digit+"}
+    assert [ident for _, _, ident in scan_identifiers("my_digit+", definitions)] == [
+        "my_digit"
+    ]
+    # un nombre no definido no absorbe '_' (el comodín)
+    assert [ident for _, _, ident in scan_identifiers("my_x", definitions)] == ["my", "x"]
+    # ni se reconocen nombres dentro de literales
+    assert scan_identifiers("'digit'", definitions) == []
+
+
+def test_order_definitions_dependencies_first():
+    definitions = {
+        "number": "digits ('.' digits)?",
+        "digits": "my_digit+",
+        "my_digit": "['0'-'9']",
+    }
+    order = order_definitions(definitions)
+    assert order.index("my_digit") < order.index("digits") < order.index("number")
+    assert list(compile_definitions(definitions)) == order
+
+
+def test_cyclic_definitions_are_reported():
+    definitions = {"a": "b 'x'", "b": "c", "c": "a | 'y'"}
+    with pytest.raises(ValueError, match="a -> b -> c -> a"):
+        order_definitions(definitions)
+    with pytest.raises(RegexSyntaxError):
+        compile_definitions(definitions)
+
+
+def test_underscore_definition_names_expand(tmp_path):
+    afd = build_from_text(
+        tmp_path,
+        "let my_digit = ['0'-'9']\n"
+        "let my_letter = ['a'-'z']\n"
+        "\n"
+        "rule tokens =\n"
+        "    [' ']+                 { return WS }\n"
+        "  | my_letter (my_letter | my_digit)* { return ID }\n"
+        "  | my_digit+              { return NUM }\n",
+    )
+    assert tokens("ab1 42", afd) == [("ID", "ab1"), ("WS", " "), ("NUM", "42")]
+
+
+def test_quiet_build_prints_nothing(tmp_path, capsys):
+    paths = spec_paths("slr-4")
+    build_lexer(paths["yal"], str(tmp_path), "slr-4", visualize=False, verbose=False)
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("route", ["slr-1", "slr-2", "slr-3", "slr-4"])
+def test_pruned_afd_has_no_dead_or_unreachable_states(tmp_path, route):
+    paths = spec_paths(route)
+    path = build_lexer(paths["yal"], str(tmp_path), route, visualize=False, verbose=False)
+    with open(path, "rb") as f:
+        afd = pickle.load(f)
+    edges = {}
+    for (state, _), nxt in afd["transitions"].items():
+        edges.setdefault(state, set()).add(nxt)
+    reachable = {afd["initial_state"]}
+    pending = [afd["initial_state"]]
+    while pending:
+        for nxt in edges.get(pending.pop(), ()):
+            if nxt not in reachable:
+                reachable.add(nxt)
+                pending.append(nxt)
+    live = set(afd["accepting_states"])
+    changed = True
+    while changed:
+        changed = False
+        for state, targets in edges.items():
+            if state not in live and targets & live:
+                live.add(state)
+                changed = True
+    assert set(afd["states"]) == reachable
+    assert reachable <= live
+
+
+def test_remove_comments_keeps_the_text_between_them():
+    text = "(* uno *)let a = 'x' (* dos\nlíneas *)\nrule t = a (* sin cerrar"
+    assert remove_comments_yalex(text) == "let a = 'x' \nrule t = a "
+    assert remove_comments_yalex("sin comentarios") == "sin comentarios"
+
+
+def test_header_and_trailer_are_extracted():
+    text = "{ import x }\nlet a = 'a'\nrule t = a { return A }\n\n{ trailer }\n"
+    header, trailer, remaining = extract_header_and_trailer(text)
+    assert header == "import x"
+    # el trailer empieza en la llave de apertura, como en el formato original
+    assert trailer == "{ trailer"
+    assert remaining == "let a = 'a'\nrule t = a { return A }"
+    assert extract_header_and_trailer("rule t = a") == ("", "", "rule t = a")
+
+
+def test_extract_definitions_removes_let_lines():
+    text = (
+        "let digit = ['0'-'9']\n"
+        "  let ws = [\"\\s\\t\"]\n"
+        "let plus = '+'\n"
+        "rule tokens =\n"
+        "    digit+ { return NUM }\n"
+    )
+    definitions, remaining = extract_definitions(text)
+    assert definitions == {"digit": "['0'-'9']", "ws": "(32|9)", "plus": "(43)"}
+    assert remaining == "rule tokens =\n    digit+ { return NUM }"
+
+
+def test_token_rules_split_at_top_level_bars():
+    body = "'|' { return BAR }\n| (a|b)+ { return: AB }\n| \":=\" {ASSIGN}\n| c"
+    assert split_top_level(body) == [
+        "'|' { return BAR }\n",
+        " (a|b)+ { return: AB }\n",
+        ' ":=" {ASSIGN}\n',
+        " c",
+    ]
+    assert extract_token_rules(body) == [
+        ("124", "BAR"),
+        ("(a|b)+", "AB"),
+        ("58 61", "ASSIGN"),
+        ("c", ""),
+    ]
+    assert clean_token_action("  Return PLUS ") == " PLUS"
+    assert clean_token_action("number") == "ID"
@@ -0,0 +1,155 @@
+from SLR import fill_lr_table
+
+
+def nullable_nonterminals(productions: dict) -> set:
+    """No terminales que derivan la cadena vacía."""
+    nullable = set()
+    changed = True
+    while changed:
+        changed = False
+        for A, bodies in productions.items():
+            if A in nullable:
+                continue
+            for body in bodies:
+                if all(X in nullable for X in body):
+                    nullable.add(A)
+                    changed = True
+                    break
+    return nullable
+
+
+def digraph(nodes: list, relation: dict, base: dict) -> dict:
+    """
+    Algoritmo digraph de DeRemer y Pennello: calcula, para cada nodo x,
+    F(x) = base(x) ∪ ⋃ { F(y) : x R y } en tiempo lineal sobre el grafo,
+    unificando de una vez las componentes fuertemente conexas.
+    Versión iterativa (sin recursión) para gramáticas grandes.
+    """
+    result = {}
+    depth = {x: 0 for x in nodes}
+    stack = []
+
+    def push(x):
+        stack.append(x)
+        depth[x] = len(stack)
+        result[x] = set(base.get(x, ()))
+        # (nodo, sucesores pendientes, profundidad al entrar)
+        return (x, iter(relation.get(x, ())), len(stack))
+
+    for root in nodes:
+        if depth[root] != 0:
+            continue
+        work = [push(root)]
+        while work:
+            x, successors, entered = work[-1]
+            descended = False
+            for y in successors:
+                if depth[y] == 0:
+                    work.append(push(y))
+                    descended = True
+                    break
+                depth[x] = min(depth[x], depth[y])
+                result[x] |= result[y]
+            if descended:
+                continue
+            work.pop()
+            if depth[x] == entered:
+                # x es raíz de su componente: todos comparten el mismo conjunto
+                while True:
+                    top = stack.pop()
+                    depth[top] = float("inf")
+                    result[top] = result[x]
+                    if top == x:
+                        break
+            if work:
+                parent = work[-1][0]
+                depth[parent] = min(depth[parent], depth[x])
+                result[parent] |= result[x]
+    return result
+
+
+def compute_lalr_lookaheads(grammar, lr0_states, lr0_transitions) -> dict:
+    """
+    Lookaheads LALR(1) sobre el autómata LR(0) (DeRemer y Pennello, 1982).
+
+    Retorna (estado, lhs, rhs) → conjunto de terminales con los que se reduce
+    el ítem completo lhs → rhs • del estado.
+    """
+    productions = grammar.productions
+    nonterminals = set(productions)
+    nullable = nullable_nonterminals(productions)
+
+    # Transiciones sobre no terminales: los nodos de las relaciones
+    nt_transitions = [(p, A) for (p, A) in lr0_transitions if A in nonterminals]
+    successors = {}
+    for (p, X), q in lr0_transitions.items():
+        successors.setdefault(p, []).append((X, q))
+
+    # DR(p, A): terminales que se leen justo después de goto(p, A)
+    direct_read = {}
+    reads = {}
+    start_body = productions[grammar.start_symbol][0]
+    for p, A in nt_transitions:
+        r = lr0_transitions[(p, A)]
+        dr = set()
+        rel = []
+        for X, _ in successors.get(r, ()):
+            if X not in nonterminals:
+                dr.add(X)
+            elif X in nullable:
+                rel.append((r, X))
+        if p == 0 and [A] == list(start_body):
+            dr.add("$")  # fin de entrada después del símbolo inicial
+        direct_read[(p, A)] = dr
+        reads[(p, A)] = rel
+
+    read_sets = digraph(nt_transitions, reads, direct_read)
+
+    # includes y lookback, recorriendo cada producción B → β desde cada (p', B)
+    includes = {}
+    lookback = {}
+    for p_start, B in nt_transitions:
+        for body in productions[B]:
+            state = p_start
+            for k, X in enumerate(body):
+                if X in nonterminals and all(Y in nullable for Y in body[k + 1 :]):
+                    includes.setdefault((state, X), []).append((p_start, B))
+                state = lr0_transitions[(state, X)]
+            lookback.setdefault((state, B, tuple(body)), []).append((p_start, B))
+
+    follow_sets = digraph(nt_transitions, includes, read_sets)
+
+    lookaheads = {}
+    for key, transitions in lookback.items():
+        la = set()
+        for t in transitions:
+            la |= follow_sets[t]
+        lookaheads[key] = la
+    return lookaheads
+
+
+def compute_lalr_table(
+    grammar,
+    lr0_states,
+    lr0_transitions,
+    enumerated_productions,
+    terminals,
+    nonterminals,
+    token_map,
+):
+    """
+    Construye las tablas ACTION/GOTO LALR(1). Mismos estados que la tabla
+    SLR(1) (los del autómata LR(0)), pero cada ítem completo se reduce solo con
+    sus lookaheads LALR en lugar de con todo FOLLOW(lhs).
+    Retorna (action_table, goto_table, conflicts).
+    """
+    lookaheads = compute_lalr_lookaheads(grammar, lr0_states, lr0_transitions)
+    return fill_lr_table(
+        lr0_states,
+        lr0_transitions,
+        enumerated_productions,
+        terminals,
+        nonterminals,
+        token_map,
+        lambda state, lhs, rhs: lookaheads.get((state, lhs, tuple(rhs)), ()),
+    )
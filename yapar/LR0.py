@@ -1,7 +1,12 @@
 import graphviz
 import os
+import sys
 import json
 import pickle
+from collections import deque
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../lex")))
+from graph_render import SUMMARY_DPI, render_graph, should_summarize
 
 
 # --- Representación de la gramática ---
@@ -31,173 +36,222 @@ class Grammar:
 
 
 def item(lhs, rhs, dot):
-  
     return (lhs, tuple(rhs), dot)
 
 
-def item_eq(a, b):
-    if a[0] != b[0]:
-        return False
-    arhs = a[1]
-    brhs = b[1]
-    if len(arhs) != len(brhs):
-        return False
-    for i in range(len(arhs)):
-        if arhs[i] != brhs[i]:
-            return False
-    if a[2] != b[2]:
-        return False
-    return True
-
-
-def item_in(it, items):
-    for i in items:
-        if item_eq(i, it):
-            return True
-    return False
-
-
-def closure(items, grammar):
-    closure_set = []
-    for i in items:
-        closure_set.append(i)
-    idx = 0
-    while idx < len(closure_set):
-        lhs = closure_set[idx][0]
-        rhs = closure_set[idx][1]
-        dot = closure_set[idx][2]
-        if dot < len(rhs):
-            B = rhs[dot]
-            
-            is_nt = False
-            for k in grammar.nonterminals:
-                if k == B:
-                    is_nt = True
-                    break
-            if is_nt:
-                prods = grammar.productions[B]
-                for prod in prods:
-                    new_item = item(B, prod, 0)
-                    if not item_in(new_item, closure_set):
-                        closure_set.append(new_item)
-        idx += 1
-    return closure_set
-
-
-def goto(I, X, grammar):
-    next_items = []
-    for it in I:
-        lhs = it[0]
-        rhs = it[1]
-        dot = it[2]
-        if dot < len(rhs) and rhs[dot] == X:
-            moved = item(lhs, rhs, dot + 1)
-            next_items.append(moved)
-    if len(next_items) == 0:
-        return []
-    return closure(next_items, grammar)
-
-
-def states_eq(a, b):
-    if len(a) != len(b):
-        return False
-    for i in a:
-        if not item_in(i, b):
-            return False
-    for i in b:
-        if not item_in(i, a):
-            return False
-    return True
-
-
-def state_in(state, states):
-    for idx in range(len(states)):
-        s = states[idx]
-        if states_eq(s, state):
-            return idx
-    return -1
+class ItemTable:
+    """
+    Interna los ítems LR(0) de la gramática como enteros consecutivos.
+
+    Los ítems de una misma producción se numeran seguidos (punto en 0, 1, ...,
+    n), de modo que avanzar el punto del ítem i da el ítem i + 1.
+
+    La cerradura de cada no terminal se precalcula una sola vez como un bitset
+    (un int de Python) sobre los ítems con el punto en 0; cerrar un kernel es
+    la unión (OR) de las máscaras de los no terminales que siguen al punto.
+    """
+
+    def __init__(self, grammar):
+        self.items = []  # id → (lhs, rhs, dot)
+        self.ids = {}  # (lhs, rhs, dot) → id
+        self.next_symbol = []  # id → símbolo después del punto (None si está completo)
+        self.start_items = {}  # no terminal → ids de sus ítems con el punto en 0
+        self.bit_items = []  # bit → id del ítem con el punto en 0
+        for lhs in grammar.productions:
+            initial = self.start_items.setdefault(lhs, [])
+            for body in grammar.productions[lhs]:
+                rhs = tuple(body)
+                if (lhs, rhs, 0) in self.ids:
+                    continue  # producción repetida
+                initial.append(len(self.items))
+                self.bit_items.append(len(self.items))
+                for dot in range(len(rhs) + 1):
+                    it = (lhs, rhs, dot)
+                    self.ids[it] = len(self.items)
+                    self.items.append(it)
+                    self.next_symbol.append(rhs[dot] if dot < len(rhs) else None)
+        self.closure_masks = self._closure_masks()
+
+    def _closure_masks(self):
+        """
+        no terminal → bitset de los ítems [B → • γ] de su cerradura, es decir,
+        de todos los no terminales alcanzables como primer símbolo.
+        """
+        bit_of = {item_id: bit for bit, item_id in enumerate(self.bit_items)}
+        direct = {}
+        first_nts = {}
+        for A, ids in self.start_items.items():
+            mask = 0
+            firsts = []
+            for i in ids:
+                mask |= 1 << bit_of[i]
+                B = self.next_symbol[i]
+                if B in self.start_items and B not in firsts:
+                    firsts.append(B)
+            direct[A] = mask
+            first_nts[A] = firsts
+
+        masks = {}
+        for A in self.start_items:
+            mask = direct[A]
+            seen = {A}
+            stack = list(first_nts[A])
+            while stack:
+                B = stack.pop()
+                if B in seen:
+                    continue
+                seen.add(B)
+                if B in masks:
+                    # ya está completa: incluye todo lo alcanzable desde B
+                    mask |= masks[B]
+                    continue
+                mask |= direct[B]
+                stack.extend(first_nts[B])
+            masks[A] = mask
+        return masks
+
+    def closure(self, kernel):
+        """Cerradura de una lista de ids: el kernel y luego los ítems agregados."""
+        masks = self.closure_masks
+        next_symbol = self.next_symbol
+        mask = 0
+        for i in kernel:
+            B = next_symbol[i]
+            if B in masks:
+                mask |= masks[B]
+        result = list(kernel)
+        in_kernel = set(kernel)
+        bit_items = self.bit_items
+        while mask:
+            low = mask & -mask
+            item_id = bit_items[low.bit_length() - 1]
+            if item_id not in in_kernel:
+                result.append(item_id)
+            mask ^= low
+        return result
 
 
 def lr0_items(grammar):
-    initial = item(
-        grammar.start_symbol, grammar.productions[grammar.start_symbol][0], 0
-    )
-    states = []
+    """
+    Colección canónica LR(0). Los estados se identifican por su kernel (un
+    estado LR(0) queda determinado por sus ítems con el punto avanzado), que
+    se indexa en un diccionario; y goto solo se calcula para los símbolos que
+    aparecen después del punto en algún ítem del estado.
+
+    La numeración es la misma de siempre: BFS desde el estado inicial,
+    recorriendo los símbolos en el orden terminales + no terminales.
+    """
+    table = ItemTable(grammar)
+    symbol_order = {}
+    for X in grammar.terminals + grammar.nonterminals:
+        symbol_order.setdefault(X, len(symbol_order))
+
+    initial = table.ids[
+        item(grammar.start_symbol, grammar.productions[grammar.start_symbol][0], 0)
+    ]
+    state_items = [table.closure([initial])]
+    index = {frozenset([initial]): 0}
     transitions = {}
 
-    initial_closure = closure([initial], grammar)
-    states.append(initial_closure)
-    pending = [initial_closure]
-    while len(pending) > 0:
-        I = pending[0]
-        for rm in range(1, len(pending)):
-            pending[rm - 1] = pending[rm]
-        pending = pending[:-1]
-        src_idx = state_in(I, states)
-        symbols = []
-        for k in grammar.terminals:
-            symbols.append(k)
-        for k in grammar.nonterminals:
-            symbols.append(k)
-        for i in range(len(symbols)):
-            X = symbols[i]
-            goto_set = goto(I, X, grammar)
-            if len(goto_set) > 0:
-                idx = state_in(goto_set, states)
-                if idx == -1:
-                    states.append(goto_set)
-                    pending.append(goto_set)
-                    idx = len(states) - 1
-                transitions[(src_idx, X)] = idx
+    pending = deque([0])
+    while pending:
+        src_idx = pending.popleft()
+        # kernels de los sucesores, agrupados por el símbolo después del punto
+        buckets = {}
+        for i in state_items[src_idx]:
+            X = table.next_symbol[i]
+            if X is not None:
+                if X not in buckets:
+                    buckets[X] = []
+                buckets[X].append(i + 1)
+        for X in sorted(buckets, key=symbol_order.__getitem__):
+            kernel = buckets[X]
+            key = frozenset(kernel)
+            idx = index.get(key)
+            if idx is None:
+                idx = len(state_items)
+                index[key] = idx
+                state_items.append(table.closure(kernel))
+                pending.append(idx)
+            transitions[(src_idx, X)] = idx
+
+    states = [[table.items[i] for i in ids] for ids in state_items]
     return states, transitions, grammar
 
 
+def item_label(prod):
+    left = prod[0] + " → "
+    before_dot = ""
+    for i in range(prod[2]):
+        before_dot += prod[1][i] + " "
+    left += before_dot
+    left += "• "
+    after_dot = ""
+    for i in range(prod[2], len(prod[1])):
+        after_dot += prod[1][i] + " "
+    left += after_dot
+    return left.strip()
+
+
 def visualize_lr0_automaton(
     states, transitions, grammar, filename="output/LRO/lr0_automaton"
 ):
+    """
+    Dibuja el autómata LR(0) y escribe su listado en <filename>.txt.
+    Si hay más de SUMMARY_THRESHOLD estados, el grafo se resume: cada estado
+    muestra solo su kernel y los estados se agrupan en clusters según el
+    símbolo con el que se llega a ellos.
+    """
     os.makedirs(os.path.dirname(filename), exist_ok=True)
     dot = graphviz.Digraph(format="png")
     dot.attr(rankdir="TB")
-    dot.attr(dpi="600")
-    for idx in range(len(states)):
-        state = states[idx]
-        label = "I" + str(idx) + ":\n"
-        for prod in state:
-            left = prod[0] + " → "
-            before_dot = ""
-            for i in range(prod[2]):
-                before_dot += prod[1][i] + " "
-            left += before_dot
-            left += "• "
-            after_dot = ""
-            for i in range(prod[2], len(prod[1])):
-                after_dot += prod[1][i] + " "
-            left += after_dot
-            label += left.strip() + "\n"
-        dot.node(str(idx), label, shape="rectangle")
+    summarize = should_summarize(len(states))
+
+    if not summarize:
+        dot.attr(dpi="600")
+        for idx in range(len(states)):
+            state = states[idx]
+            label = "I" + str(idx) + ":\n"
+            for prod in state:
+                label += item_label(prod) + "\n"
+            dot.node(str(idx), label, shape="rectangle")
+    else:
+        dot.attr(dpi=SUMMARY_DPI)
+        accessing = {}
+        for key in transitions:
+            accessing[transitions[key]] = key[1]
+        clusters = {}
+        for idx in range(len(states)):
+            clusters.setdefault(accessing.get(idx, ""), []).append(idx)
+        for symbol, members in clusters.items():
+            with dot.subgraph(name="cluster_" + str(len(symbol)) + "_" + symbol) as sub:
+                sub.attr(label=symbol or "inicio")
+                for idx in members:
+                    state = states[idx]
+                    kernel = [
+                        prod
+                        for prod in state
+                        if prod[2] > 0 or prod[0] == grammar.start_symbol
+                    ]
+                    label = "I" + str(idx) + ":\n"
+                    for prod in kernel:
+                        label += item_label(prod) + "\n"
+                    if len(state) > len(kernel):
+                        label += "(+" + str(len(state) - len(kernel)) + " ítems)"
+                    sub.node(str(idx), label, shape="rectangle")
     for key in transitions:
         src_idx = key[0]
         symbol = key[1]
         dst_idx = transitions[key]
         dot.edge(str(src_idx), str(dst_idx), label=str(symbol))
-    dot.render(filename, view=False, cleanup=True)
+    render_graph(dot, filename, view=False, cleanup=True)
     with open(filename + ".txt", "w", encoding="utf-8") as f:
         f.write("LR(0) Automaton States:\n")
         for idx in range(len(states)):
             state = states[idx]
             f.write("\nState I" + str(idx) + ":\n")
             for prod in state:
-                line = "  " + prod[0] + " → "
-                before_dot = ""
-                for i in range(prod[2]):
-                    before_dot += prod[1][i] + " "
-                line += before_dot
-                line += "• "
-                after_dot = ""
-                for i in range(prod[2], len(prod[1])):
-                    after_dot += prod[1][i] + " "
-                line += after_dot
-                f.write(line.strip() + "\n")
+                f.write(item_label(prod) + "\n")
         f.write("\nLR(0) Automaton Transitions:\n")
         for key in transitions:
             src_idx = key[0]
@@ -3,6 +3,139 @@ import json
 import pickle
 
 
+def resolve_terminal(symbol, terminal_set, token_map):
+    """
+    Terminal de la tabla ACTION que corresponde a `symbol` (directamente o a
+    través de token_map); None si no corresponde a ninguno.
+    """
+    if symbol == "$" or symbol in terminal_set:
+        return symbol
+    mapped = token_map.get(symbol)
+    if mapped in terminal_set:
+        return mapped
+    return None
+
+
+def set_action(row, state, terminal, action, conflicts):
+    """
+    Escribe `action` en ACTION[state][terminal] resolviendo conflictos al estilo
+    yacc: shift gana sobre reduce y, entre reduce, gana la producción de menor
+    número ("acc" es la reducción de la producción 0). Cada conflicto se
+    registra en `conflicts`.
+    """
+    prev = row.get(terminal)
+    if prev is None or prev == action:
+        row[terminal] = action
+        return
+
+    def rank(act):
+        if act[0] == "s":
+            return (0, 0)
+        if act == "acc":
+            return (1, 0)
+        return (1, int(act[1:]))
+
+    kind = "shift/reduce" if "s" in (prev[0], action[0]) else "reduce/reduce"
+    chosen = prev if rank(prev) <= rank(action) else action
+    conflicts.append(
+        {
+            "state": state,
+            "symbol": terminal,
+            "kind": kind,
+            "actions": [prev, action],
+            "chosen": chosen,
+        }
+    )
+    print(f"Conflicto {kind} en estado {state} con '{terminal}': {prev} / {action} → {chosen}")
+    row[terminal] = chosen
+
+
+def fill_lr_table(
+    lr0_states,
+    lr0_transitions,
+    enumerated_productions,
+    terminals,
+    nonterminals,
+    token_map,
+    lookaheads,
+):
+    """
+    Llena las tablas ACTION/GOTO sobre el autómata LR(0). Los métodos (SLR,
+    LALR) solo difieren en los terminales con los que se reduce cada ítem
+    completo: `lookaheads(estado, lhs, rhs)` los retorna como símbolos de la
+    gramática, que aquí se traducen a terminales de la tabla.
+
+    Las filas son dispersas: solo contienen las celdas con acción (una celda
+    ausente es error). Retorna (action_table, goto_table, conflicts), donde
+    conflicts es una lista de {"state", "symbol", "kind", "actions", "chosen"}.
+    """
+    terminal_set = set(terminals)
+    nonterminal_set = set(nonterminals)
+
+    # (lhs, rhs) → número de producción; ante producciones repetidas, la primera
+    production_index = {}
+    for p_idx, p_lhs, p_rhs in enumerated_productions:
+        production_index.setdefault((p_lhs, tuple(p_rhs)), p_idx)
+
+    # símbolo de la gramática → terminal de la tabla (o None)
+    resolved = {}
+
+    def table_terminal(symbol):
+        if symbol not in resolved:
+            resolved[symbol] = resolve_terminal(symbol, terminal_set, token_map)
+        return resolved[symbol]
+
+    action_table = {i: {} for i in range(len(lr0_states))}
+    goto_table = {i: {} for i in range(len(lr0_states))}
+    conflicts = []
+
+    for i, state in enumerate(lr0_states):
+        row = action_table[i]
+        for lhs, rhs, dot_pos in state:
+            # SHIFT
+            if dot_pos < len(rhs):
+                symbol = rhs[dot_pos]
+                terminal = table_terminal(symbol)
+                if terminal is not None:
+                    next_state_idx = lr0_transitions.get((i, symbol))
+                    if next_state_idx is not None:
+                        set_action(row, i, terminal, "s" + str(next_state_idx), conflicts)
+                continue
+
+            # REDUCE
+            prod_idx = production_index.get((lhs, tuple(rhs)))
+            if prod_idx is None:
+                continue
+            if prod_idx == 0:
+                # Producción aumentada
+                set_action(row, i, "$", "acc", conflicts)
+                continue
+            reduce_action = "r" + str(prod_idx)
+            for symbol in lookaheads(i, lhs, rhs):
+                terminal = table_terminal(symbol)
+                if terminal is not None:
+                    set_action(row, i, terminal, reduce_action, conflicts)
+
+    # GOTO
+    for (i, symbol), next_state_idx in lr0_transitions.items():
+        if symbol in nonterminal_set and next_state_idx is not None:
+            goto_table[i][symbol] = next_state_idx
+
+    # Orden estable de las columnas (terminales, "$" y no terminales) para los volcados
+    column = {t: k for k, t in enumerate(list(terminals) + ["$"])}
+    for i, row in action_table.items():
+        action_table[i] = dict(
+            sorted(row.items(), key=lambda kv: column.get(kv[0], len(column)))
+        )
+    column = {nt: k for k, nt in enumerate(nonterminals)}
+    for i, row in goto_table.items():
+        goto_table[i] = dict(
+            sorted(row.items(), key=lambda kv: column.get(kv[0], len(column)))
+        )
+
+    return action_table, goto_table, conflicts
+
+
 def compute_slr_table(
     grammar,
     first_sets,
@@ -14,133 +147,87 @@ def compute_slr_table(
     nonterminals,
     token_map,
 ):
-    action_table = {}
-    goto_table = {}
-
-    for i in range(len(lr0_states)):
-        action_table[i] = {}
-        for t in terminals:
-            action_table[i][t] = None
-        action_table[i]["$"] = None
-        goto_table[i] = {}
-        for nt in nonterminals:
-            goto_table[i][nt] = None
-
-    for i in range(len(lr0_states)):
-        state = lr0_states[i]
-        for item in state:
-            lhs = item[0]
-            rhs = item[1]
-            dot_pos = item[2]
+    """
+    Construye las tablas ACTION/GOTO SLR(1): cada ítem completo A → α • se
+    reduce con FOLLOW(A). Retorna (action_table, goto_table, conflicts).
+    """
+    return fill_lr_table(
+        lr0_states,
+        lr0_transitions,
+        enumerated_productions,
+        terminals,
+        nonterminals,
+        token_map,
+        lambda state, lhs, rhs: follow_sets.get(lhs, ()),
+    )
 
-            # SHIFT
-            if dot_pos < len(rhs):
-                symbol = rhs[dot_pos]
 
-                if symbol not in terminals and symbol in token_map:
-                    symbol_mapped = token_map[symbol]  
-                else:
-                    symbol_mapped = symbol
+def compute_default_reductions(action_table: dict) -> dict:
+    """
+    Reducción por defecto de cada estado consistente, es decir, de los estados
+    cuya única acción posible es una misma reducción (sin shifts ni "acc").
+    En esos estados el driver reduce sin consultar el lookahead: si el token no
+    era válido, el error se detecta igual antes del siguiente shift.
 
-                if symbol_mapped in terminals:
-                    next_state_idx = lr0_transitions.get((i, symbol), None)
-                    if next_state_idx is not None:
-                        prev = action_table[i][symbol_mapped]
-                        new = "s" + str(next_state_idx)
-                        if prev and prev != new:
-                            print("Conflicto Shift en estado", i, "símbolo", symbol)
-                        action_table[i][symbol_mapped] = new
+    Retorna estado → "rN".
+    """
+    defaults = {}
+    for state, row in action_table.items():
+        actions = {act for act in row.values() if act is not None}
+        if len(actions) == 1:
+            (action,) = actions
+            if action[0] == "r":
+                defaults[state] = action
+    return defaults
 
-            # REDUCE
-            elif dot_pos == len(rhs):
-                prod_idx = -1
-
-                
-                for j in range(len(enumerated_productions)):
-                    p_idx, p_lhs, p_rhs = enumerated_productions[j]
-
-                    
-                    lhs_igual = True
-                    if len(p_lhs) != len(lhs):
-                        lhs_igual = False
-                    else:
-                        for k in range(len(lhs)):
-                            if p_lhs[k] != lhs[k]:
-                                lhs_igual = False
-                                break
-
-                    
-                    rhs_igual = True
-                    if len(p_rhs) != len(rhs):
-                        rhs_igual = False
-                    else:
-                        for k in range(len(rhs)):
-                            if p_rhs[k] != rhs[k]:
-                                rhs_igual = False
-                                break
-
-                    if lhs_igual and rhs_igual:
-                        prod_idx = p_idx
-                        break
-
-                if prod_idx == -1:
-                    continue  
-
-                # 2. Producción aumentada 
-                if prod_idx == 0:
-                    action_table[i]["$"] = "acc"
-                else:
-                    
-                    follow_set = list(follow_sets.get(lhs, set()))
-
-                    for j in range(len(follow_set)):
-                        symbol = follow_set[j]
-
-                        
-                        if symbol == "$":
-                            terminal = "$"
-                        else:
-                            
-                            es_terminal = False
-                            for k in range(len(terminals)):
-                                if terminals[k] == symbol:
-                                    es_terminal = True
-                                    break
-
-                            if es_terminal:
-                                terminal = symbol
-                            else:
-                               
-                                encontrado = False
-                                if symbol in token_map:
-                                    mapped = token_map[symbol]
-                                    for k in range(len(terminals)):
-                                        if terminals[k] == mapped:
-                                            encontrado = True
-                                            terminal = mapped
-                                            break
-                                if not encontrado:
-                                    continue  
-
-                      
-                        nueva_accion = "r" + str(prod_idx)
-                        vieja_accion = action_table[i][terminal]
-
-                        if vieja_accion is not None and vieja_accion != nueva_accion:
-                          
-                            pass
-
-                        action_table[i][terminal] = nueva_accion
-
-        # GOTO
-        for nt in nonterminals:
-            key = (i, nt)
-            if key in lr0_transitions:
-                next_state_idx = lr0_transitions[key]
-                if next_state_idx is not None:
-                    goto_table[i][nt] = next_state_idx
-
-    return action_table, goto_table
+
+def compute_recovery_targets(
+    action_table: dict,
+    goto_table: dict,
+    follow_sets: dict,
+    terminals,
+    token_map,
+    excluded=(),
+) -> dict:
+    """
+    Destinos de recuperación de errores por estado (modo pánico guiado por la
+    gramática): en un estado con GOTO sobre A, al descartar la entrada hasta un
+    terminal de FOLLOW(A) se puede continuar desde GOTO(estado, A) como si se
+    hubiera reducido una A. Solo se guardan los terminales con una acción en
+    ACTION[GOTO(estado, A)]: con los demás el error se repetiría en el acto.
+    Los no terminales de `excluded` (los símbolos aumentados) no se usan.
+
+    Retorna estado → {terminal: (A, GOTO(estado, A))}; ante varios A para un
+    mismo terminal gana el primero en el orden de las columnas de GOTO.
+    """
+    terminal_set = set(terminals) | {"$"}
+    targets = {}
+    for state, row in goto_table.items():
+        sync = {}
+        for nonterminal, next_state in row.items():
+            if next_state is None or nonterminal in excluded:
+                continue
+            next_row = action_table.get(next_state, {})
+            for symbol in follow_sets.get(nonterminal, ()):
+                terminal = resolve_terminal(symbol, terminal_set, token_map)
+                if terminal is None or terminal in sync:
+                    continue
+                if next_row.get(terminal) is not None:
+                    sync[terminal] = (nonterminal, next_state)
+        if sync:
+            targets[state] = sync
+    return targets
+
+
+def save_conflicts(conflicts, filename="output/slr_conflicts.txt"):
+    """Vuelca la lista de conflictos de compute_slr_table (vacía si no hay)."""
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, "w", encoding="utf-8") as f:
+        for c in conflicts:
+            f.write(
+                f"STATE {c['state']:3}  TOKEN {c['symbol']:10}  {c['kind']}: "
+                f"{' / '.join(c['actions'])}  →  {c['chosen']}\n"
+            )
 
 
 def save_slr_table(action_table, goto_table, filename="output/slr_table"):
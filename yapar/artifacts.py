@@ -0,0 +1,27 @@
+import os
+import pickle
+
+# ruta absoluta → ((mtime, tamaño), objeto)
+_cache = {}
+
+
+def load_artifact(path: str):
+    """
+    Carga un pickle (AFD de lexers/, tablas comprimidas, ...) una sola vez por
+    proceso: las siguientes llamadas con la misma ruta retornan el mismo
+    objeto, salvo que el archivo haya cambiado en disco.
+    """
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with open(key, "rb") as f:
+        obj = pickle.load(f)
+    _cache[key] = (version, obj)
+    return obj
+
+
+def clear_artifacts() -> None:
+    _cache.clear()
@@ -0,0 +1,126 @@
+import inspect
+import os
+
+import parse_trace
+from packed_tables import ACCEPT
+from sim_slr import END_OF_TOKENS, NEED_TOKEN, SKIP_TOKENS, lr_steps, run_lr_parser
+
+# Enteros por línea en las tuplas del módulo generado
+INTS_PER_LINE = 16
+
+# El driver del módulo generado es el código fuente de run_lr_parser y
+# lr_steps copiado tal cual (ver driver_source), así que no puede divergir del
+# de sim_slr. Tables le da a lr_steps las tablas literales con los nombres de
+# atributo de PackedTables.
+TABLES = '''
+
+class Tables:
+    """Tablas comprimidas con los atributos de PackedTables que usa lr_steps."""
+
+    terminals = TERMINALS
+    terminal_index = {t: k for k, t in enumerate(TERMINALS)}
+    rhs_len = RHS_LEN
+    lhs_id = LHS_ID
+    default_reduce = DEFAULT_REDUCE
+    action_pack = {
+        "row_of": ACTION_ROW,
+        "default": ACTION_DEFAULT,
+        "base": ACTION_BASE,
+        "check": ACTION_CHECK,
+        "value": ACTION_VALUE,
+    }
+    goto_pack = {
+        "row_of": GOTO_ROW,
+        "default": GOTO_DEFAULT,
+        "base": GOTO_BASE,
+        "check": GOTO_CHECK,
+        "value": GOTO_VALUE,
+    }
+'''
+
+PARSE = '''
+
+def parse(tokens, trace=None, tree=None, semantics=None):
+    """
+    Analiza (token, lexema) en orden; retorna (accepted, error_msg) como
+    run_lr_parser. Los tokens de SKIP_TOKENS se ignoran.
+    """
+    return run_lr_parser(Tables, tokens, trace, tree, semantics)
+'''
+
+
+def driver_source() -> str:
+    """
+    Constantes de sim_slr, packed_tables y parse_trace que usa el driver, y el
+    código fuente de run_lr_parser y lr_steps.
+    """
+    lines = [
+        f"SKIP_TOKENS = frozenset({sorted(SKIP_TOKENS)!r})",
+        f"ACCEPT = {ACCEPT!r}",
+        f"NEED_TOKEN = {NEED_TOKEN!r}",
+        f"END_OF_TOKENS = {END_OF_TOKENS!r}",
+        "",
+        "",
+        "class parse_trace:",
+        '    """Códigos de los registros de traza (los de parse_trace)."""',
+        "",
+    ]
+    for name in ("SHIFT", "REDUCE", "ACCEPT", "ERROR"):
+        lines.append(f"    {name} = {getattr(parse_trace, name)!r}")
+    functions = [inspect.getsource(f) for f in (run_lr_parser, lr_steps)]
+    return "\n".join(lines) + "\n\n\n" + "\n\n".join(functions)
+
+
+def format_ints(name: str, values) -> str:
+    """`name = (…)` con los enteros en líneas de INTS_PER_LINE."""
+    values = list(values)
+    if not values:
+        return f"{name} = ()\n"
+    lines = [f"{name} = ("]
+    for k in range(0, len(values), INTS_PER_LINE):
+        chunk = values[k : k + INTS_PER_LINE]
+        lines.append("    " + ", ".join(str(v) for v in chunk) + ",")
+    lines.append(")")
+    return "\n".join(lines) + "\n"
+
+
+def generate_parser_module(packed, productions_enum, filename: str, source=None) -> str:
+    """
+    Escribe un módulo de Python independiente con las tablas comprimidas como
+    tuplas literales y una función parse(tokens) que es run_lr_parser sobre
+    ellas. Importarlo no requiere compilar la gramática, cargar pickles ni
+    graphviz. Retorna la ruta escrita.
+    """
+    if len(packed.rhs_len) == 0:
+        raise ValueError("Las tablas comprimidas no incluyen las producciones")
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    parts = [
+        '"""\n'
+        f"Parser generado{f' a partir de {source}' if source else ''}; no editar.\n"
+        "Uso: accepted, error_msg = parse([(token, lexema), ...])\n"
+        '"""\n\n'
+        # las anotaciones de run_lr_parser/lr_steps nombran PackedTables
+        "from __future__ import annotations\n\n",
+        f"TERMINALS = {tuple(packed.terminals)!r}\n",
+        f"NONTERMINALS = {tuple(packed.nonterminals)!r}\n",
+        f"PRODUCTIONS = {tuple((lhs, tuple(rhs)) for _, lhs, rhs in productions_enum)!r}\n\n",
+        format_ints("RHS_LEN", packed.rhs_len),
+        format_ints("LHS_ID", packed.lhs_id),
+        format_ints("DEFAULT_REDUCE", packed.default_reduce),
+    ]
+    for prefix, pack in (("ACTION", packed.action_pack), ("GOTO", packed.goto_pack)):
+        parts.append(format_ints(f"{prefix}_ROW", pack["row_of"]))
+        parts.append(format_ints(f"{prefix}_DEFAULT", pack["default"]))
+        parts.append(format_ints(f"{prefix}_BASE", pack["base"]))
+        parts.append(format_ints(f"{prefix}_CHECK", pack["check"]))
+        parts.append(format_ints(f"{prefix}_VALUE", pack["value"]))
+    parts.append(TABLES)
+    parts.append("\n\n" + driver_source())
+    parts.append(PARSE)
+
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write("".join(parts))
+    return filename
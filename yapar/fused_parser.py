@@ -0,0 +1,193 @@
+import parse_trace
+from packed_tables import ACCEPT, PackedTables
+from sim_slr import SKIP_TOKENS, run_lr_parser
+
+# Id de los tokens que se descartan (IGNORE) en el escáner fusionado
+SKIP = -2
+
+
+def accepting_token(mapping) -> str:
+    """Nombre del token de un estado de aceptación, con la misma prioridad que lex()."""
+    if isinstance(mapping, dict) and "merged" in mapping:
+        mapping = mapping["merged"]
+    if not mapping:
+        return "ID"
+    min_id = min(int(k) for k in mapping.keys())
+    tup = mapping.get(min_id) or mapping.get(str(min_id))
+    return tup[1] if tup is not None else "ID"
+
+
+class FusedParser:
+    """
+    Lexer y parser LR en un solo bucle: el escaneo del AFD minimizado entrega
+    cada token como id de terminal directamente al paso LR, en el mismo
+    frame, sin generadores ni tuplas intermedias y descartando los tokens
+    ignorados en línea. Es el punto de entrada de alto rendimiento; el
+    equivalente modular es run_lr_parser sobre lexer.lex().
+
+    El AFD se precompila una vez: transiciones por estado indexadas por
+    carácter y, por estado de aceptación, el id de su terminal. Los
+    resultados y los mensajes de error son los de run_lr_parser.
+    """
+
+    def __init__(self, dfa, packed: PackedTables):
+        if len(packed.rhs_len) == 0:
+            raise ValueError("Las tablas comprimidas no incluyen las producciones")
+        self.dfa = dfa
+        self.packed = packed
+        if not isinstance(dfa, dict):
+            # AFD perezoso: sus estados no existen antes del escaneo
+            return
+
+        terminal_index = packed.terminal_index
+
+        def token_id(name):
+            if name in SKIP_TOKENS:
+                return SKIP
+            return terminal_index.get(name, -1)
+
+        self.initial = dfa["initial_state"]
+        rows = {}
+        for (state, sym), nxt in dfa["transitions"].items():
+            if sym.isdigit():
+                rows.setdefault(state, {})[chr(int(sym))] = nxt
+        self.rows = rows
+        token_actions = dfa["token_actions"]
+        self.accept_id = {}
+        self.accept_name = {}
+        for state in dfa["accepting_states"]:
+            name = accepting_token(token_actions.get(state, {}))
+            self.accept_id[state] = token_id(name)
+            self.accept_name[state] = name
+        self.keyword_id = {}
+        self.keyword_name = {}
+        for lexeme, (_, name) in (dfa.get("keywords") or {}).items():
+            self.keyword_id[lexeme] = token_id(name)
+            self.keyword_name[lexeme] = name
+
+    def parse(self, text: str, trace=None):
+        """
+        Analiza `text`; retorna (accepted, error_msg) como run_lr_parser. Con
+        `trace` (un contenedor de parse_trace.make_trace) agrega los mismos
+        registros que run_lr_parser.
+        """
+        packed = self.packed
+        if not isinstance(self.dfa, dict):
+            return run_lr_parser(
+                packed,
+                ((name, lexeme) for (_, name), lexeme in self.dfa.lex(text)),
+                trace,
+            )
+
+        rows = self.rows
+        empty = {}
+        initial = self.initial
+        accept_id = self.accept_id
+        keyword_id = self.keyword_id
+        terminals = packed.terminals
+        eof = packed.terminal_index["$"]
+
+        default_reduce = packed.default_reduce
+        rhs_len = packed.rhs_len
+        lhs_id = packed.lhs_id
+        a_row_of = packed.action_pack["row_of"]
+        a_base = packed.action_pack["base"]
+        a_check = packed.action_pack["check"]
+        a_value = packed.action_pack["value"]
+        a_default = packed.action_pack["default"]
+        a_size = len(a_check)
+        g_row_of = packed.goto_pack["row_of"]
+        g_base = packed.goto_pack["base"]
+        g_check = packed.goto_pack["check"]
+        g_value = packed.goto_pack["value"]
+        g_default = packed.goto_pack["default"]
+        g_size = len(g_check)
+
+        record = trace.append if trace is not None else None
+        stack = [0]
+        push = stack.append
+        i = 0
+        n = len(text)
+        while True:
+            # ── escaneo: siguiente token (lexema más largo) ──
+            if i < n:
+                start = i
+                state = initial
+                j = i
+                last_state = None
+                last_j = i - 1
+                while j < n:
+                    state = rows.get(state, empty).get(text[j])
+                    if state is None:
+                        break
+                    if state in accept_id:
+                        last_state = state
+                        last_j = j
+                    j += 1
+                if last_state is None:
+                    if record is not None:
+                        record((parse_trace.ERROR, stack[-1], -1, 0))
+                    return False, "Token desconocido 'LEXICAL'."
+                i = last_j + 1
+                t = accept_id[last_state]
+                if keyword_id:
+                    t = keyword_id.get(text[start:i], t)
+                if t == SKIP:
+                    continue
+                if t < 0:
+                    if record is not None:
+                        record((parse_trace.ERROR, stack[-1], -1, 0))
+                    name = self.keyword_name.get(
+                        text[start:i], self.accept_name[last_state]
+                    )
+                    return False, f"Token desconocido '{name}'."
+            else:
+                t = eof
+
+            # ── paso LR con el id del terminal ──
+            # Es el bucle de sim_slr.lr_steps sin árbol ni valores, copiado
+            # aquí para no pagar una llamada por token; cualquier cambio debe
+            # hacerse en ambos (tests/test_fused_parser.py compara la traza
+            # paso a paso y los mensajes de error con run_lr_parser)
+            while True:
+                state = stack[-1]
+                code = default_reduce[state]
+                if not code:
+                    if t is None:
+                        break  # después de un shift: escanear el siguiente token
+                    f = a_row_of[state]
+                    pos = a_base[f] + t
+                    if pos < a_size and a_check[pos] == f:
+                        code = a_value[pos]
+                    else:
+                        code = a_default[f]
+                if code > 0:
+                    if record is not None:
+                        record((parse_trace.SHIFT, state, t, code - 1))
+                    push(code - 1)
+                    # reducciones por defecto del estado alcanzado
+                    t = None
+                    continue
+                if code == ACCEPT and t == eof:
+                    if record is not None:
+                        record((parse_trace.ACCEPT, state, 0, 0))
+                    return True, None
+                if code == 0 or code == ACCEPT:
+                    if record is not None:
+                        record((parse_trace.ERROR, state, t, 0))
+                    return (
+                        False,
+                        f"Error sintáctico en estado {state} con token '{terminals[t]}'.",
+                    )
+                prod = -code - 1
+                if record is not None:
+                    record((parse_trace.REDUCE, state, prod, 0))
+                k = rhs_len[prod]
+                if k:
+                    del stack[-k:]
+                f = g_row_of[stack[-1]]
+                pos = g_base[f] + lhs_id[prod]
+                if pos < g_size and g_check[pos] == f:
+                    push(g_value[pos] - 1)
+                else:
+                    push(g_default[f] - 1)
@@ -0,0 +1,265 @@
+import os
+import pickle
+from array import array
+from bisect import bisect_left
+
+from artifacts import load_artifact
+
+# Codificación entera de las acciones:
+#   0        → error (celda vacía)
+#   s + 1    → shift al estado s         (positivo)
+#   -(r + 1) → reduce con la producción r (negativo); "acc" es -1 (producción 0)
+ERROR = 0
+ACCEPT = -1
+
+# Desplazamientos que pack_rows prueba por fila antes de agregarla al final
+FIT_ATTEMPTS = 1024
+
+
+def encode_action(action) -> int:
+    if action is None:
+        return ERROR
+    if action == "acc":
+        return ACCEPT
+    if action[0] == "s":
+        return int(action[1:]) + 1
+    return -(int(action[1:]) + 1)
+
+
+def decode_action(code: int):
+    if code == ERROR:
+        return None
+    if code == ACCEPT:
+        return "acc"
+    if code > 0:
+        return "s" + str(code - 1)
+    return "r" + str(-code - 1)
+
+
+def pack_rows(rows: list, n_columns: int, defaults=None):
+    """
+    Comprime una tabla de enteros (lista de filas {columna: valor}, 0 = vacío)
+    en vectores planos:
+
+      - filas idénticas se guardan una sola vez (row_of[estado] → fila única);
+      - cada fila única tiene un valor por defecto (el que más ahorra: el más
+        frecuente, contando las celdas vacías) y solo guarda las excepciones;
+      - las excepciones de todas las filas se intercalan en un único vector
+        (comb vector / row displacement): la celda (f, c) está en
+        value[base[f] + c] si check[base[f] + c] == f.
+
+    `defaults` fija, si es distinto de 0, el valor por defecto de una fila; en
+    ese caso las celdas que la fila no menciona toman ese valor.
+
+    Retorna un diccionario de arrays: row_of, default, base, check, value.
+    """
+    if defaults is None:
+        defaults = [0] * len(rows)
+    unique = {}
+    row_of = array("i")
+    unique_rows = []
+    for row, forced in zip(rows, defaults):
+        key = (forced, tuple(sorted((c, v) for c, v in row.items() if v != 0)))
+        if key not in unique:
+            unique[key] = len(unique_rows)
+            unique_rows.append(key)
+        row_of.append(unique[key])
+
+    default = array("i")
+    exceptions = []
+    for forced, key in unique_rows:
+        if forced:
+            default.append(forced)
+            exceptions.append([(c, v) for c, v in key if v != forced])
+            continue
+        counts = {0: n_columns - len(key)}
+        for _, v in key:
+            counts[v] = counts.get(v, 0) + 1
+        best = max(counts, key=lambda v: (counts[v], v == 0))
+        default.append(best)
+        if best == 0:
+            exceptions.append(list(key))
+        else:
+            present = dict(key)
+            cells = [(c, present.get(c, 0)) for c in range(n_columns)]
+            exceptions.append([(c, v) for c, v in cells if v != best])
+
+    # Primer ajuste, empezando por las filas con más excepciones. Solo se prueban
+    # desplazamientos que dejan la primera celda en un hueco libre, y a lo sumo
+    # FIT_ATTEMPTS de ellos; si ninguno sirve, la fila se agrega al final.
+    base = array("i", [0] * len(unique_rows))
+    check = array("i")
+    value = array("i")
+    free = []  # posiciones libres (huecos) dentro del vector, ordenadas
+    order = sorted(range(len(unique_rows)), key=lambda f: -len(exceptions[f]))
+    for f in order:
+        cells = exceptions[f]
+        if not cells:
+            continue
+        first_col = cells[0][0]
+        b = None
+        start = bisect_left(free, first_col)
+        for p in free[start : start + FIT_ATTEMPTS]:
+            candidate = p - first_col
+            if all(
+                candidate + c >= len(check) or check[candidate + c] == -1
+                for c, _ in cells
+            ):
+                b = candidate
+                break
+        if b is None:
+            b = max(0, len(check) - first_col)
+
+        top = b + cells[-1][0] + 1
+        if top > len(check):
+            free.extend(range(len(check), top))
+            check.extend([-1] * (top - len(check)))
+            value.extend([0] * (top - len(value)))
+        for c, v in cells:
+            check[b + c] = f
+            value[b + c] = v
+            del free[bisect_left(free, b + c)]
+        base[f] = b
+
+    return {
+        "row_of": row_of,
+        "default": default,
+        "base": base,
+        "check": check,
+        "value": value,
+    }
+
+
+class PackedTables:
+    """
+    Tablas ACTION/GOTO comprimidas en vectores de enteros (ver pack_rows).
+    Las consultas devuelven lo mismo que las tablas de diccionarios:
+    action() → "sN" / "rN" / "acc" / None y goto() → estado / None.
+
+    Con `default_reductions` (estado → "rN", ver compute_default_reductions),
+    la fila de cada estado consistente se guarda vacía con la reducción como
+    valor por defecto, y action() la retorna para cualquier lookahead.
+
+    Con `productions_enum` guarda además, por producción, la longitud del
+    cuerpo (rhs_len) y el índice de su cabeza en la GOTO (lhs_id, -1 si no
+    tiene columna), que es lo que necesita run_lr_parser para reducir.
+    """
+
+    def __init__(
+        self,
+        action_table: dict,
+        goto_table: dict,
+        terminals,
+        nonterminals,
+        default_reductions=None,
+        productions_enum=None,
+    ):
+        self.terminals = list(terminals)
+        if "$" not in self.terminals:
+            self.terminals.append("$")
+        self.nonterminals = list(nonterminals)
+        self.terminal_index = {t: k for k, t in enumerate(self.terminals)}
+        self.nonterminal_index = {nt: k for k, nt in enumerate(self.nonterminals)}
+        self.n_states = len(action_table)
+        default_reductions = default_reductions or {}
+        # estado → código de su reducción por defecto (0 = sin reducción por defecto)
+        self.default_reduce = array(
+            "i",
+            [encode_action(default_reductions.get(s)) for s in range(self.n_states)],
+        )
+
+        self.rhs_len = array("i")
+        self.lhs_id = array("i")
+        for _, lhs, rhs in productions_enum or []:
+            self.rhs_len.append(len(rhs))
+            self.lhs_id.append(self.nonterminal_index.get(lhs, -1))
+
+        action_rows = []
+        goto_rows = []
+        for state in range(self.n_states):
+            action_rows.append(
+                {
+                    self.terminal_index[t]: encode_action(act)
+                    for t, act in action_table.get(state, {}).items()
+                    if t in self.terminal_index
+                }
+            )
+            # GOTO: estado + 1, 0 = sin transición
+            goto_rows.append(
+                {
+                    self.nonterminal_index[nt]: nxt + 1
+                    for nt, nxt in goto_table.get(state, {}).items()
+                    if nt in self.nonterminal_index and nxt is not None
+                }
+            )
+        # Los estados con reducción por defecto no guardan fila: el valor por
+        # defecto cubre todas las columnas
+        for state, code in enumerate(self.default_reduce):
+            if code:
+                action_rows[state] = {}
+        self.action_pack = pack_rows(
+            action_rows, len(self.terminals), list(self.default_reduce)
+        )
+        self.goto_pack = pack_rows(goto_rows, len(self.nonterminals))
+
+    @staticmethod
+    def _lookup(pack, state: int, column: int) -> int:
+        f = pack["row_of"][state]
+        pos = pack["base"][f] + column
+        check = pack["check"]
+        if pos < len(check) and check[pos] == f:
+            return pack["value"][pos]
+        return pack["default"][f]
+
+    def default_reduction(self, state: int):
+        """"rN" si el estado reduce sin consultar el lookahead; si no, None."""
+        return decode_action(self.default_reduce[state])
+
+    def action_code(self, state: int, terminal_id: int) -> int:
+        return self._lookup(self.action_pack, state, terminal_id)
+
+    def goto_code(self, state: int, nonterminal_id: int) -> int:
+        """Estado destino + 1 (0 = sin transición)."""
+        return self._lookup(self.goto_pack, state, nonterminal_id)
+
+    def action(self, state: int, token: str):
+        column = self.terminal_index.get(token)
+        if column is None or not 0 <= state < self.n_states:
+            return None
+        return decode_action(self._lookup(self.action_pack, state, column))
+
+    def goto(self, state: int, nonterminal: str):
+        column = self.nonterminal_index.get(nonterminal)
+        if column is None or not 0 <= state < self.n_states:
+            return None
+        code = self._lookup(self.goto_pack, state, column)
+        return code - 1 if code else None
+
+    def size_bytes(self) -> int:
+        """Bytes ocupados por los vectores de enteros."""
+        total = 0
+        for pack in (self.action_pack, self.goto_pack):
+            for arr in pack.values():
+                total += arr.itemsize * len(arr)
+        return total
+
+    def stats(self) -> dict:
+        return {
+            "states": self.n_states,
+            "unique_action_rows": len(self.action_pack["default"]),
+            "unique_goto_rows": len(self.goto_pack["default"]),
+            "action_vector": len(self.action_pack["value"]),
+            "goto_vector": len(self.goto_pack["value"]),
+            "bytes": self.size_bytes(),
+        }
+
+
+def save_packed_tables(packed: PackedTables, filename="output/slr_table_packed.pickle"):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, "wb") as f:
+        pickle.dump(packed, f)
+
+
+def load_packed_tables(filename="output/slr_table_packed.pickle") -> PackedTables:
+    """Tablas guardadas con save_packed_tables (cacheadas por ruta)."""
+    return load_artifact(filename)
@@ -0,0 +1,142 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from SLR import resolve_terminal
+from sim_slr import SKIP_TOKENS, run_lr_parser, statement_symbols
+
+# Segmentos que cada tarea del pool analiza de una vez (amortiza el envío)
+SEGMENTS_PER_TASK = 256
+
+# Tablas del proceso trabajador (las fija _init_worker una sola vez)
+_worker_packed = None
+
+
+def split_tokens(tables: dict):
+    """
+    Terminales con los que se corta la entrada, derivados de la gramática:
+    (separadores, aperturas, cierres), o None si el símbolo inicial no es una
+    lista S → S X | X (solo entonces cada sentencia se analiza por separado).
+
+    Los separadores son los terminales que aparecen directamente en las
+    producciones de S o de X; los pares de apertura/cierre salen de las
+    producciones de la forma a … b, como factor → LPAREN expression RPAREN.
+    """
+    productions_list = tables["productions_list"]
+    start_symbol = tables["start_symbol"]
+    statements = statement_symbols(productions_list, start_symbol)
+    if statements == {start_symbol}:
+        return None
+
+    terminal_set = set(tables["packed"].terminals)
+    token_map = tables["token_map"]
+
+    def terminal(symbol):
+        return resolve_terminal(symbol, terminal_set, token_map)
+
+    nonterminals = {lhs for _, lhs, _ in productions_list}
+    list_symbols = statements | {start_symbol}
+    separators = set()
+    opening = set()
+    closing = set()
+    for _, lhs, rhs in productions_list:
+        if lhs in list_symbols:
+            separators |= {terminal(sym) for sym in rhs} - {None}
+        if len(rhs) >= 3 and any(sym in nonterminals for sym in rhs[1:-1]):
+            first, last = terminal(rhs[0]), terminal(rhs[-1])
+            if first is not None and last is not None and first != last:
+                opening.add(first)
+                closing.add(last)
+    separators -= opening | closing
+    if not separators:
+        return None
+    return separators, opening, closing
+
+
+def split_segments(tokens: list, separators, opening, closing) -> list:
+    """
+    Puntos de corte de `tokens`: la posición siguiente a cada separador fuera
+    de paréntesis, más el final. Retorna la lista de posiciones de fin.
+    """
+    ends = []
+    depth = 0
+    for k, (tok, _) in enumerate(tokens):
+        if tok in opening:
+            depth += 1
+        elif tok in closing:
+            depth = max(depth - 1, 0)
+        elif depth == 0 and tok in separators:
+            ends.append(k + 1)
+    if not ends or ends[-1] < len(tokens):
+        ends.append(len(tokens))
+    return ends
+
+
+def _init_worker(packed):
+    global _worker_packed
+    _worker_packed = packed
+
+
+def _parse_batch(batch) -> bool:
+    """
+    Analiza un lote de segmentos. Para abaratar el envío entre procesos el
+    lote llega como (ids de terminal, longitudes de cada segmento) en arrays
+    de enteros; el parser no necesita los lexemas.
+    """
+    ids, lengths = batch
+    terminals = _worker_packed.terminals
+    start = 0
+    for length in lengths:
+        segment = [(terminals[t], "") for t in ids[start : start + length]]
+        start += length
+        accepted, _ = run_lr_parser(_worker_packed, segment)
+        if not accepted:
+            return False
+    return True
+
+
+def parse_parallel(tables: dict, token_stream, jobs=None):
+    """
+    Analiza las sentencias de nivel superior en un pool de procesos y combina
+    los resultados en orden; retorna (accepted, error_msg) igual que
+    run_lr_parser sobre la entrada completa.
+
+    Si todos los segmentos se aceptan, la entrada completa también (S → S X
+    acepta cualquier concatenación de sentencias). Si alguno falla, el corte
+    pudo caer dentro de una sentencia, así que el veredicto y el mensaje de
+    error los da un análisis secuencial.
+    """
+    packed = tables["packed"]
+    tokens = [(tok, lexeme) for tok, lexeme in token_stream if tok not in SKIP_TOKENS]
+    split = split_tokens(tables)
+    if split is None:
+        return run_lr_parser(packed, tokens)
+    ends = split_segments(tokens, *split)
+    terminal_index = packed.terminal_index
+    if len(ends) <= 1 or any(tok not in terminal_index for tok, _ in tokens):
+        return run_lr_parser(packed, tokens)
+
+    ids = array("i", [terminal_index[tok] for tok, _ in tokens])
+    batches = []
+    begin = 0
+    for k in range(0, len(ends), SEGMENTS_PER_TASK):
+        group = ends[k : k + SEGMENTS_PER_TASK]
+        starts = [begin] + group[:-1]
+        lengths = array("i", [end - start for start, end in zip(starts, group)])
+        batches.append((ids[begin : group[-1]], lengths))
+        begin = group[-1]
+
+    all_accepted = True
+    pool = ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(packed,)
+    )
+    try:
+        for accepted in pool.map(_parse_batch, batches):
+            if not accepted:
+                all_accepted = False
+                break
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    if all_accepted:
+        return True, None
+    return run_lr_parser(packed, tokens)
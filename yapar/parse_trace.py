@@ -0,0 +1,114 @@
+import os
+from array import array
+from collections import deque
+
+# Registros de traza de run_lr_parser: tuplas de 4 enteros
+#   (SHIFT,  estado, terminal, estado destino)
+#   (REDUCE, estado, producción, 0)
+#   (ACCEPT, estado, 0, 0)
+#   (ERROR,  estado, terminal, 0)     terminal = -1 si el token es desconocido
+SHIFT = 0
+REDUCE = 1
+ACCEPT = 2
+ERROR = 3
+
+TRACE_MODES = ("off", "full", "ring", "stream")
+
+# Registros que TraceWriter acumula antes de escribirlos al archivo
+WRITE_BUFFER = 8192
+
+
+class TraceWriter:
+    """
+    Traza binaria escrita de forma incremental: cada registro ocupa 4 enteros
+    de 32 bits y se vuelca al archivo cada WRITE_BUFFER registros, de modo que
+    la memoria no crece con la entrada. Se lee con read_trace.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.count = 0
+        self._file = open(path, "wb")
+        self._buffer = array("i")
+
+    def append(self, record) -> None:
+        self._buffer.extend(record)
+        self.count += 1
+        if len(self._buffer) >= 4 * WRITE_BUFFER:
+            self.flush()
+
+    def flush(self) -> None:
+        self._buffer.tofile(self._file)
+        self._buffer = array("i")
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def make_trace(mode: str = "off", size: int = 1000, path: str | None = None):
+    """
+    Contenedor de traza para run_lr_parser según `mode`:
+      "off"    → None (el driver no construye ningún registro)
+      "full"   → lista con todos los registros
+      "ring"   → deque con los últimos `size` registros
+      "stream" → TraceWriter sobre `path`
+    """
+    if mode == "off":
+        return None
+    if mode == "full":
+        return []
+    if mode == "ring":
+        return deque(maxlen=size)
+    if mode == "stream":
+        if path is None:
+            raise ValueError("El modo de traza 'stream' requiere un archivo")
+        return TraceWriter(path)
+    raise ValueError(f"Modo de traza desconocido: {mode}")
+
+
+def read_trace(path: str):
+    """Genera los registros de una traza escrita por TraceWriter."""
+    with open(path, "rb") as f:
+        while True:
+            chunk = array("i")
+            try:
+                chunk.fromfile(f, 4 * WRITE_BUFFER)
+            except EOFError:
+                pass
+            for k in range(0, len(chunk) - 3, 4):
+                yield (chunk[k], chunk[k + 1], chunk[k + 2], chunk[k + 3])
+            if len(chunk) < 4 * WRITE_BUFFER:
+                return
+
+
+def format_record(record, terminals, productions_enum) -> tuple:
+    """Traduce un registro al formato de simulate_slr_parser para los reportes."""
+    kind, state, a, b = record
+    if kind == SHIFT:
+        return ("shift", state, terminals[a], b)
+    if kind == REDUCE:
+        _, lhs, rhs = productions_enum[a]
+        return ("reduce", state, f"{lhs} → {' '.join(rhs) if rhs else 'λ'}")
+    if kind == ACCEPT:
+        return ("accept", state, "$")
+    token = terminals[a] if a >= 0 else "?"
+    return (
+        "error",
+        state,
+        token,
+        f"Error sintáctico en estado {state} con token '{token}'.",
+    )
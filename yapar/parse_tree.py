@@ -0,0 +1,214 @@
+from array import array
+
+
+class ParseTree:
+    """
+    Árbol sintáctico en una arena de vectores de enteros paralelos, que
+    run_lr_parser llena con shift() y reduce():
+
+        kind[n]   producción de un nodo interno, o -(terminal + 1) en una hoja
+        first[n]  posición de sus hijos en `children`, o en una hoja el índice
+                  del token en la entrada (sin contar los tokens ignorados)
+        count[n]  cantidad de hijos (0 en las hojas)
+
+    No se crea ningún objeto por nodo: node() y root_node() retornan vistas
+    (ParseNode) solo cuando se las pide.
+
+    En el análisis por sentencias (parse_statements), split_statement() saca
+    cada sentencia a su propio árbol y deja en la arena solo un nodo sin hijos
+    en su lugar.
+    """
+
+    def __init__(self, terminals, productions_enum):
+        self.terminals = list(terminals)
+        self.productions = productions_enum
+        self.kind = array("i")
+        self.first = array("i")
+        self.count = array("i")
+        self.children = array("i")
+        self.root = -1
+        self._stack = array("i")
+        self._tokens = 0
+        # nodos que reemplazan a una sentencia ya separada con split_statement
+        self._emitted = set()
+
+    def shift(self, terminal_id: int) -> None:
+        self._stack.append(len(self.kind))
+        self.kind.append(-terminal_id - 1)
+        self.first.append(self._tokens)
+        self.count.append(0)
+        self._tokens += 1
+
+    def reduce(self, production: int, n_children: int) -> None:
+        node = len(self.kind)
+        self.kind.append(production)
+        self.first.append(len(self.children))
+        self.count.append(n_children)
+        if n_children:
+            self.children.extend(self._stack[-n_children:])
+            del self._stack[-n_children:]
+        self._stack.append(node)
+
+    def finish(self) -> None:
+        """Fija la raíz al aceptar (el nodo del símbolo inicial)."""
+        self.root = self._stack[-1] if self._stack else -1
+        self._stack = array("i")
+
+    def split_statement(self, token_base: int = 0):
+        """
+        Separa el subárbol del nodo en el tope de la pila (la sentencia recién
+        reducida) en un ParseTree nuevo, con los índices de token relativos a
+        `token_base`, y compacta la arena: se conservan solo los subárboles de
+        la pila, con la sentencia (y todo nodo cuyos hijos ya fueron separados)
+        reducida a un nodo sin hijos.
+        """
+        statement = self._stack[-1]
+        out = ParseTree(self.terminals, self.productions)
+        out.root = out._copy_subtree(self, statement, token_base, None)
+
+        old = ParseTree(self.terminals, self.productions)
+        old.kind, old.first, old.count, old.children = (
+            self.kind,
+            self.first,
+            self.count,
+            self.children,
+        )
+        emitted = self._emitted
+        emitted.add(statement)
+        self.kind = array("i")
+        self.first = array("i")
+        self.count = array("i")
+        self.children = array("i")
+        self._emitted = set()
+        self._stack = array(
+            "i", [self._copy_subtree(old, n, 0, emitted) for n in self._stack]
+        )
+        return out
+
+    def _append(self, kind: int, first: int, children) -> int:
+        node = len(self.kind)
+        self.kind.append(kind)
+        if kind < 0:
+            self.first.append(first)
+            self.count.append(0)
+        else:
+            self.first.append(len(self.children))
+            self.count.append(len(children))
+            self.children.extend(children)
+        return node
+
+    def _copy_subtree(self, src, node: int, token_base: int, emitted) -> int:
+        """
+        Copia (sin recursión) el subárbol de `node` en `src` al final de esta
+        arena y retorna su nuevo id. Con `emitted`, los nodos de ese conjunto y
+        los que solo tienen hijos ya separados se copian sin hijos.
+        """
+        done = []
+        work = [(node, False)]
+        while work:
+            n, expanded = work.pop()
+            k = src.kind[n]
+            if k < 0:
+                done.append(self._append(k, src.first[n] - token_base, ()))
+                continue
+            if emitted is not None and n in emitted:
+                new = self._append(k, 0, ())
+                self._emitted.add(new)
+                done.append(new)
+                continue
+            if not expanded:
+                work.append((n, True))
+                for child in reversed(src.child_ids(n)):
+                    work.append((child, False))
+                continue
+            c = src.count[n]
+            kids = done[len(done) - c :]
+            del done[len(done) - c :]
+            if emitted is not None and c and all(x in self._emitted for x in kids):
+                new = self._append(k, 0, ())
+                self._emitted.add(new)
+            else:
+                new = self._append(k, 0, kids)
+            done.append(new)
+        return done[-1]
+
+    def __len__(self):
+        return len(self.kind)
+
+    def is_leaf(self, n: int) -> bool:
+        return self.kind[n] < 0
+
+    def symbol(self, n: int) -> str:
+        k = self.kind[n]
+        if k < 0:
+            return self.terminals[-k - 1]
+        return self.productions[k][1]
+
+    def child_ids(self, n: int):
+        start = self.first[n]
+        return self.children[start : start + self.count[n]]
+
+    def node(self, n: int):
+        return ParseNode(self, n)
+
+    def root_node(self):
+        return ParseNode(self, self.root) if self.root >= 0 else None
+
+    def size_bytes(self) -> int:
+        return sum(
+            arr.itemsize * len(arr)
+            for arr in (self.kind, self.first, self.count, self.children)
+        )
+
+    def dump(self, lexemes=None) -> list[str]:
+        """Líneas con el árbol indentado; `lexemes` (por índice de token) rotula las hojas."""
+        lines = []
+        if self.root < 0:
+            return lines
+        pending = [(self.root, 0)]
+        while pending:
+            n, depth = pending.pop()
+            text = self.symbol(n)
+            if self.kind[n] < 0 and lexemes is not None:
+                if 0 <= self.first[n] < len(lexemes):
+                    text += f" '{lexemes[self.first[n]]}'"
+            lines.append("  " * depth + text)
+            for child in reversed(self.child_ids(n)):
+                pending.append((child, depth + 1))
+        return lines
+
+
+class ParseNode:
+    """Vista de un nodo de ParseTree; se crea al acceder y no copia datos."""
+
+    __slots__ = ("tree", "id")
+
+    def __init__(self, tree: ParseTree, node_id: int):
+        self.tree = tree
+        self.id = node_id
+
+    @property
+    def symbol(self) -> str:
+        return self.tree.symbol(self.id)
+
+    @property
+    def is_leaf(self) -> bool:
+        return self.tree.is_leaf(self.id)
+
+    @property
+    def production(self):
+        """Número de producción del nodo interno (None en una hoja)."""
+        k = self.tree.kind[self.id]
+        return k if k >= 0 else None
+
+    @property
+    def token_index(self):
+        """Índice del token de una hoja (None en un nodo interno)."""
+        return self.tree.first[self.id] if self.is_leaf else None
+
+    @property
+    def children(self) -> list:
+        return [ParseNode(self.tree, c) for c in self.tree.child_ids(self.id)]
+
+    def __repr__(self):
+        return f"ParseNode({self.id}, {self.symbol!r})"
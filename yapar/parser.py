@@ -3,11 +3,33 @@ import pickle
 import sys
 from LR0 import Grammar, lr0_items, visualize_lr0_automaton
 from first_follow import compute_first, compute_follow
-from SLR import enumerate_productions, save_slr_table, compute_slr_table
-from sim_slr import simulate_slr_parser
+from SLR import (
+    compute_default_reductions,
+    compute_recovery_targets,
+    compute_slr_table,
+    enumerate_productions,
+    save_conflicts,
+    save_slr_table,
+)
+from LALR import compute_lalr_table
+from packed_tables import PackedTables, save_packed_tables
+from sim_slr import (
+    SKIP_TOKENS,
+    parse_statements,
+    run_lr_parser,
+    simulate_slr_parser,
+    statement_symbols,
+)
+from parse_trace import TRACE_MODES, format_record, make_trace
+from parse_tree import ParseTree
+from parallel_parse import parse_parallel
+from codegen import generate_parser_module
+from fused_parser import FusedParser
+from artifacts import load_artifact
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../lex")))
-from lexer import lex
+from lexer import TokenBuffer, lex_file
+from graph_render import start_render_queue, wait_for_renders
 
 
 def str_startswith(cadena: str, prefijo: str) -> bool:
@@ -196,27 +218,41 @@ def convertir_a_entero(cadena: str) -> int:
     return resultado
 
 
-def infer_token_map_from_pickle(
-    pickle_path: str, tokens_decl: list[str]
-) -> dict[str, str]:
-    with open(pickle_path, "rb") as f:
-        afd = pickle.load(f)
-
-    symbol_token_map, usados = {}, set()
-
+def afd_token_tuples(afd):
+    """
+    Tuplas (symCode, TOKEN) que puede producir el AFD: de token_actions en el
+    AFD minimizado o, en el perezoso (LazyAFD), de su marker_mapping, ya que
+    sus estados no existen antes del escaneo. Se agregan las palabras
+    reservadas que build_lexer(..., keywords=True) dejó fuera del autómata.
+    """
+    if not isinstance(afd, dict):
+        yield from afd.marker_mapping.values()
+        yield from afd.keywords.values()
+        return
     for estado in afd["token_actions"].values():
         leaves = (
             estado["merged"]
             if isinstance(estado, dict) and "merged" in estado
             else estado
         )
-        for sym_code, token_name in leaves.values():
-            if token_name in usados:
-                continue
-            symbol = chr(int(sym_code)) if is_all_digits(sym_code) else sym_code
-            if token_name in tokens_decl:
-                symbol_token_map[symbol] = token_name
-                usados.add(token_name)
+        yield from leaves.values()
+    yield from (afd.get("keywords") or {}).values()
+
+
+def infer_token_map_from_pickle(
+    pickle_path: str, tokens_decl: list[str]
+) -> dict[str, str]:
+    afd = load_artifact(pickle_path)
+
+    symbol_token_map, usados = {}, set()
+
+    for sym_code, token_name in afd_token_tuples(afd):
+        if token_name in usados:
+            continue
+        symbol = chr(int(sym_code)) if is_all_digits(sym_code) else sym_code
+        if token_name in tokens_decl:
+            symbol_token_map[symbol] = token_name
+            usados.add(token_name)
 
     print(">>> TOKEN_MAP INFERIDO DINÁMICAMENTE:", symbol_token_map)
     return symbol_token_map
@@ -326,63 +362,72 @@ def split_by_whitespace_inline(cadena: str) -> list[str]:
     return partes
 
 
-def main(
+def build_parser_tables(
     yalp_path: str,
-    source_file_path: str,
     dfa_pickle_path: str,
-    output_dir: str = "output",
-) -> None:
-
-    if output_dir is None:
-        tag = basename_noext(yalp_path)
-        output_dir = os.path.join("output", tag)
-
-    os.makedirs(output_dir, exist_ok=True)
-
-    log_path = os.path.join(output_dir, "debug_log.txt")
-    original_stdout = sys.stdout
-    log_file = open(log_path, "w", encoding="utf-8")
-    sys.stdout = log_file  # todo print() ➜ debug_log.txt
-
-    try:
-        # 1. Rutas base
-        lr0_dir = os.path.join(output_dir, "LR0")
-        ff_dir = os.path.join(output_dir, "first_follow")
-        slr_dir = os.path.join(output_dir, "SLR")
-
-        # 2. Parsear el .yalp y AFD → token_map
-        tokens, productions, augmented_start, start_symbol = parse_yalp_file(yalp_path)
-        token_map = infer_token_map_from_pickle(dfa_pickle_path, tokens)
-
-        # 3. Automata LR(0)
-        grammar = Grammar(productions, augmented_start)
-        states, transitions, _ = lr0_items(grammar)
-        save_pickle((states, transitions), f"{lr0_dir}/lr0_states_transitions.pickle")
+    output_dir: str,
+    visualize: bool = True,
+    method: str = "slr",
+) -> dict:
+    """
+    Compila un .yalp: autómata LR(0), FIRST/FOLLOW, producciones enumeradas y
+    tabla SLR(1) o, con method="lalr", LALR(1). Guarda los artefactos en
+    <output_dir>/{LR0,first_follow,SLR|LALR} y retorna un diccionario con todo
+    lo necesario para simular el parser.
+    """
+    if method not in ("slr", "lalr"):
+        raise ValueError(f"Método de tabla desconocido: {method}")
+
+    # 1. Rutas base
+    lr0_dir = os.path.join(output_dir, "LR0")
+    ff_dir = os.path.join(output_dir, "first_follow")
+    slr_dir = os.path.join(output_dir, method.upper())
+
+    # 2. Parsear el .yalp y AFD → token_map
+    tokens, productions, augmented_start, start_symbol = parse_yalp_file(yalp_path)
+    token_map = infer_token_map_from_pickle(dfa_pickle_path, tokens)
+
+    # 3. Automata LR(0)
+    grammar = Grammar(productions, augmented_start)
+    states, transitions, _ = lr0_items(grammar)
+    save_pickle((states, transitions), f"{lr0_dir}/lr0_states_transitions.pickle")
+    if visualize:
         visualize_lr0_automaton(
             states, transitions, grammar, filename=f"{lr0_dir}/lr0_automaton"
         )
 
-        # 4. FIRST / FOLLOW
-        first = compute_first(productions)
-        follow = compute_follow(productions, first, start_symbol)
-
-        save_pickle((first, follow), f"{ff_dir}/first_follow.pickle")
-        save_json(first, f"{ff_dir}/first.json")
-        save_json(follow, f"{ff_dir}/follow.json")
-        dump_follow_sets(follow, f"{ff_dir}/follow.txt")  # TXT ordenado
-
-        # 5. Enumerar producciones
-        productions_list = enumerate_productions(
-            grammar.productions, grammar.start_symbol
-        )
-        save_pickle(productions_list, f"{slr_dir}/productions_enum.pickle")
-        save_txt(
-            [f"{idx}: {lhs} → {' '.join(rhs)}" for idx, lhs, rhs in productions_list],
-            f"{slr_dir}/productions_enum.txt",
+    # 4. FIRST / FOLLOW
+    first = compute_first(productions)
+    # FOLLOW parte del inicio aumentado para que "$" llegue a toda la cadena
+    # de producciones iniciales (y la tabla SLR tenga la acción "acc")
+    follow = compute_follow(productions, first, grammar.start_symbol)
+
+    save_pickle((first, follow), f"{ff_dir}/first_follow.pickle")
+    save_json(first, f"{ff_dir}/first.json")
+    save_json(follow, f"{ff_dir}/follow.json")
+    dump_follow_sets(follow, f"{ff_dir}/follow.txt")  # TXT ordenado
+
+    # 5. Enumerar producciones
+    productions_list = enumerate_productions(grammar.productions, grammar.start_symbol)
+    save_pickle(productions_list, f"{slr_dir}/productions_enum.pickle")
+    save_txt(
+        [f"{idx}: {lhs} → {' '.join(rhs)}" for idx, lhs, rhs in productions_list],
+        f"{slr_dir}/productions_enum.txt",
+    )
+
+    # 6. Tabla SLR(1) / LALR(1), sobre los mismos estados LR(0)
+    if method == "lalr":
+        action_table, goto_table, conflicts = compute_lalr_table(
+            grammar,
+            states,
+            transitions,
+            productions_list,
+            tokens,
+            list(productions.keys()),
+            token_map,
         )
-
-        # 6. Tabla SLR(1)
-        action_table, goto_table = compute_slr_table(
+    else:
+        action_table, goto_table, conflicts = compute_slr_table(
             grammar,
             first,
             follow,
@@ -394,61 +439,329 @@ def main(
             token_map,
         )
 
-        save_slr_table(action_table, goto_table, filename=f"{slr_dir}/slr_table")
-        dump_action_goto(action_table, goto_table, f"{slr_dir}/slr_table")
+    table_prefix = f"{slr_dir}/{method}_table"
+    save_slr_table(action_table, goto_table, filename=table_prefix)
+    dump_action_goto(action_table, goto_table, table_prefix)
+    save_conflicts(conflicts, f"{slr_dir}/{method}_conflicts.txt")
+
+    # 6b. Reducciones por defecto de los estados consistentes
+    default_reductions = compute_default_reductions(action_table)
+    save_txt(
+        [f"STATE {st:3}  →  {act}" for st, act in default_reductions.items()],
+        f"{table_prefix}_default_reductions.txt",
+    )
+
+    # 6c. Destinos de recuperación de errores (FOLLOW de cada GOTO del estado)
+    recovery = compute_recovery_targets(
+        action_table,
+        goto_table,
+        follow,
+        tokens,
+        token_map,
+        excluded={augmented_start, grammar.start_symbol},
+    )
+    save_txt(
+        [
+            f"STATE {st:3}  TOKEN {tok:10}  →  {nt} / {nxt}"
+            for st, sync in recovery.items()
+            for tok, (nt, nxt) in sync.items()
+        ],
+        f"{table_prefix}_recovery.txt",
+    )
+
+    # 6d. Tablas comprimidas (vectores de enteros) que usa el simulador
+    packed = PackedTables(
+        action_table,
+        goto_table,
+        tokens,
+        list(grammar.productions.keys()),
+        default_reductions,
+        productions_list,
+    )
+    save_packed_tables(packed, f"{table_prefix}_packed.pickle")
+    print(f"Tablas comprimidas: {packed.stats()}")
+
+    # 6e. Módulo de Python independiente con las tablas y el driver
+    generate_parser_module(
+        packed, productions_list, f"{table_prefix}_module.py", source=yalp_path
+    )
+
+    return {
+        "tokens": tokens,
+        "start_symbol": start_symbol,
+        "grammar": grammar,
+        "token_map": token_map,
+        "first": first,
+        "follow": follow,
+        "productions_list": productions_list,
+        "action_table": action_table,
+        "goto_table": goto_table,
+        "conflicts": conflicts,
+        "default_reductions": default_reductions,
+        "recovery": recovery,
+        "packed": packed,
+    }
+
+
+def write_statement_stream(
+    tables: dict,
+    dfa,
+    source_file_path: str,
+    output_dir: str,
+    trace: str,
+    trace_size: int,
+    build_tree: bool,
+    statement_symbol=None,
+) -> bool:
+    """
+    Analiza el fuente sentencia por sentencia (parse_statements sobre
+    lex_file) y escribe cada resultado en <output_dir>/statements.txt apenas
+    se reduce. Sin `statement_symbol`, la sentencia es el elemento de la lista
+    de nivel superior de la gramática (ver statement_symbols). La traza
+    completa ("full") no está disponible: cada sentencia se olvida al
+    escribirla. Retorna True si se aceptó la entrada completa.
+    """
+    if trace == "full":
+        raise ValueError("El análisis por sentencias no admite la traza 'full'")
+    productions_list = tables["productions_list"]
+    if statement_symbol:
+        statements = {statement_symbol}
+    else:
+        statements = statement_symbols(productions_list, tables["start_symbol"])
+    token_stream = (
+        (token_name, lexeme)
+        for (_, token_name), lexeme in lex_file(source_file_path, dfa)
+        if token_name not in SKIP_TOKENS
+    )
+    results = parse_statements(
+        tables["packed"],
+        productions_list,
+        token_stream,
+        statements,
+        trace,
+        trace_size,
+        os.path.join(output_dir, "parse_trace.bin"),
+        build_tree,
+    )
+
+    accepted = True
+    count = 0
+    with open(os.path.join(output_dir, "statements.txt"), "w", encoding="utf-8") as out:
+        for result in results:
+            lexemes = [lexeme for _, lexeme in result["tokens"]]
+            if result["error"] is not None:
+                accepted = False
+                out.write(f"{result['index'] + 1}: ERROR {' '.join(lexemes)}\n")
+                out.write(f"   {result['error']}\n")
+                break
+            count += 1
+            out.write(f"{result['index'] + 1}: ACCEPT {' '.join(lexemes)}\n")
+            for record in result["trace"] or ():
+                out.write(
+                    f"   {format_record(record, tables['packed'].terminals, productions_list)}\n"
+                )
+            if result["tree"] is not None:
+                for line in result["tree"].dump(lexemes):
+                    out.write(f"   {line}\n")
+    print(f"Sentencias ({' / '.join(sorted(statements))}): {count} aceptadas")
+    return accepted
 
-        # 7. Preparar generador de tokens
-        with open(dfa_pickle_path, "rb") as f:
-            dfa = pickle.load(f)
 
-        with open(source_file_path, "r", encoding="utf-8") as fin:
-            input_text = fin.read()
+def main(
+    yalp_path: str,
+    source_file_path: str,
+    dfa_pickle_path: str,
+    output_dir: str = "output",
+    method: str = "slr",
+    trace: str = "full",
+    trace_size: int = 1000,
+    build_tree: bool = False,
+    stream: bool = False,
+    statement_symbol: str | None = None,
+    jobs: int = 0,
+    fused: bool = False,
+    graphs: bool = False,
+) -> None:
+    """
+    Compila el .yalp y analiza `source_file_path`. Con trace="full" se usa
+    simulate_slr_parser (traza completa y recuperación de errores); con
+    "off", "ring" (últimas `trace_size` acciones) o "stream" (traza binaria en
+    <output_dir>/parse_trace.bin) se usa el driver de producción run_lr_parser.
+    Con build_tree=True se construye además el árbol sintáctico (ParseTree),
+    en la misma pasada de run_lr_parser (con trace="full" la traza es la de
+    sus registros), y se escribe en <output_dir>/parse_tree.txt.
+
+    Con stream=True el fuente se lee por bloques y se analiza sentencia por
+    sentencia (ver write_statement_stream); `statement_symbol` elige el no
+    terminal que cuenta como sentencia. Ese modo no tiene traza completa:
+    con trace="full" se avisa y se usa "off".
+
+    Con jobs > 0 las sentencias de nivel superior se analizan en un pool de
+    `jobs` procesos (parse_parallel), con el mismo resultado que el análisis
+    secuencial; el reporte no incluye la traza. Con fused=True se usa el
+    lexer+parser fusionado (FusedParser), también sin traza. Ninguno de los
+    dos arma el árbol: con build_tree se usa run_lr_parser.
+
+    El autómata LR(0) solo se dibuja con graphs=True (en segundo plano,
+    mientras se construye la tabla y se simula el parser).
+    """
+    if trace not in TRACE_MODES:
+        raise ValueError(f"Modo de traza desconocido: {trace}")
+
+    if stream and trace == "full":
+        print("[INFO] --stream no admite la traza completa: se usa --trace=off.")
+        trace = "off"
+
+    if output_dir is None:
+        tag = basename_noext(yalp_path)
+        output_dir = os.path.join("output", tag)
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    log_path = os.path.join(output_dir, "debug_log.txt")
+    original_stdout = sys.stdout
+    log_file = open(log_path, "w", encoding="utf-8")
+    sys.stdout = log_file  # todo print() ➜ debug_log.txt
 
-        def token_stream_gen():
-            skip = {"WHITESPACE", "WS", "ws", "TAB", "ENTER"}
-            for (sym, token_name), lexeme in lex(input_text, dfa):
-                if token_name in skip:
-                    continue
-                yield (token_name, lexeme)  # lo que el parser espera
+    if graphs:
+        start_render_queue()
 
-        # 8. Simular el parser
-        accepted, actions, error_msg = simulate_slr_parser(
-            action_table, goto_table, productions_list, token_stream_gen(), start_symbol
+    try:
+        # 1-6. Gramática, LR(0), FIRST/FOLLOW y tabla SLR(1) / LALR(1)
+        tables = build_parser_tables(
+            yalp_path, dfa_pickle_path, output_dir, visualize=graphs, method=method
         )
+        start_symbol = tables["start_symbol"]
+        productions_list = tables["productions_list"]
+        packed = tables["packed"]
+
+        # 7. AFD (ya cargado al inferir el token map) y tokens de la entrada
+        dfa = load_artifact(dfa_pickle_path)
+
+        if stream:
+            accepted = write_statement_stream(
+                tables,
+                dfa,
+                source_file_path,
+                output_dir,
+                trace,
+                trace_size,
+                build_tree,
+                statement_symbol,
+            )
+            print("\nParser terminado →", "ACCEPTED" if accepted else "ERROR")
+            return
+
+        with open(source_file_path, "r", encoding="utf-8") as fin:
+            input_text = fin.read()
 
-        # Lista de tokens legibles para el reporte
-        tokens_for_parser = [
-            token_name
-            for (_, token_name), _ in lex(input_text, dfa)
-            if to_upper(token_name) not in {"WHITESPACE", "WS", "TAB", "ENTER"}
-        ]
+        # Una sola pasada del lexer: el parser, el árbol y el reporte
+        # recorren el mismo buffer
+        tokens = TokenBuffer(SKIP_TOKENS).fill(input_text, dfa)
+
+        # 8. Simular el parser. Con --tree el árbol se arma en la misma
+        # pasada del driver de producción (lr_steps), que es el que lo llena
+        tree = ParseTree(packed.terminals, productions_list) if build_tree else None
+        if fused and tree is None:
+            accepted, error_msg = FusedParser(dfa, packed).parse(input_text)
+            actions = []
+        elif jobs > 0 and tree is None:
+            accepted, error_msg = parse_parallel(tables, tokens, jobs)
+            actions = []
+        elif trace == "full" and tree is None:
+            accepted, actions, error_msg = simulate_slr_parser(
+                packed,
+                None,
+                productions_list,
+                iter(tokens),
+                start_symbol,
+                recovery=tables["recovery"],
+            )
+        else:
+            trace_path = os.path.join(output_dir, "parse_trace.bin")
+            records = make_trace(trace, trace_size, trace_path)
+            accepted, error_msg = run_lr_parser(packed, tokens, records, tree=tree)
+            actions = []
+            if trace == "stream":
+                records.close()
+                print(f"Traza binaria ({len(records)} registros): {trace_path}")
+            elif records is not None:
+                actions = [
+                    format_record(r, packed.terminals, productions_list)
+                    for r in records
+                ]
+
+        # 8b. Árbol sintáctico (arena de enteros)
+        if tree is not None and accepted:
+            save_txt(
+                tree.dump(tokens.lexemes),
+                os.path.join(output_dir, "parse_tree.txt"),
+            )
+            print(f"Árbol sintáctico: {len(tree)} nodos, {tree.size_bytes()} bytes")
 
         parser_outfile = os.path.join(output_dir, "parser_output.txt")
-        save_parser_output(
-            actions, accepted, error_msg, tokens_for_parser, parser_outfile
-        )
+        save_parser_output(actions, accepted, error_msg, tokens.names, parser_outfile)
 
         # 9. Resumen final (va al log)
         print("\nParser terminado →", "ACCEPTED" if accepted else "ERROR")
         print("Output escrito en :", parser_outfile)
 
     finally:
-        # 10. Restaurar stdout y cerrar el log
+        # 10. Esperar los grafos pendientes, restaurar stdout y cerrar el log
+        if graphs:
+            wait_for_renders()
         sys.stdout = original_stdout
         log_file.close()
         print(f"[INFO] Ejecución completada. Log detallado en {log_path}")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 4:
+    args = [a for a in sys.argv[1:] if not str_startswith(a, "--")]
+    if len(args) < 3:
         print(
             "Uso: python parser.py <ruta_a_yalp> <archivo_fuente> <dfa_pickle> [out_dir]"
+            " [--lalr] [--trace=full|off|ring|stream] [--trace-size=N] [--tree]"
+            " [--stream[=SIMBOLO]] [--parallel[=N]] [--fused] [--graphs]"
         )
         sys.exit(1)
 
-    yalp_path = sys.argv[1]
-    source_file_path = sys.argv[2]
-    dfa_pickle_path = sys.argv[3]
-    out_dir_arg = sys.argv[4] if len(sys.argv) >= 5 else None
-
-    main(yalp_path, source_file_path, dfa_pickle_path, out_dir_arg)
+    yalp_path = args[0]
+    source_file_path = args[1]
+    dfa_pickle_path = args[2]
+    out_dir_arg = args[3] if len(args) >= 4 else None
+    method = "lalr" if "--lalr" in sys.argv else "slr"
+    trace_mode = "full"
+    trace_size = 1000
+    stream_mode = False
+    statement_arg = None
+    jobs = 0
+    for a in sys.argv[1:]:
+        if a == "--parallel":
+            jobs = os.cpu_count() or 1
+        elif str_startswith(a, "--parallel="):
+            jobs = int(a[len("--parallel=") :])
+        elif a == "--stream":
+            stream_mode = True
+        elif str_startswith(a, "--stream="):
+            stream_mode = True
+            statement_arg = a[len("--stream=") :]
+        elif str_startswith(a, "--trace="):
+            trace_mode = a[len("--trace=") :]
+        elif str_startswith(a, "--trace-size="):
+            trace_size = int(a[len("--trace-size=") :])
+
+    main(
+        yalp_path,
+        source_file_path,
+        dfa_pickle_path,
+        out_dir_arg,
+        method,
+        trace_mode,
+        trace_size,
+        "--tree" in sys.argv,
+        stream_mode,
+        statement_arg,
+        jobs,
+        "--fused" in sys.argv,
+        "--graphs" in sys.argv,
+    )
@@ -0,0 +1,45 @@
+class SemanticStack:
+    """
+    Evaluación semántica durante el análisis: una pila de valores paralela a
+    la pila de estados de run_lr_parser. Cada shift apila el lexema y cada
+    reduce de la producción k (índice de enumerate_productions) desapila los
+    valores de su cuerpo y apila callbacks[k](*valores).
+
+    Sin callback para k se apila el primer valor del cuerpo (None si es
+    vacío), como el $$ = $1 de yacc. Al aceptar, `result` queda con el valor
+    del símbolo inicial. La memoria queda acotada por la profundidad de la
+    pila: no se construye ningún árbol.
+    """
+
+    def __init__(self, callbacks: dict):
+        self.callbacks = callbacks
+        self.values = []
+        self.result = None
+
+    def shift(self, lexeme) -> None:
+        self.values.append(lexeme)
+
+    def reduce(self, production: int, n_values: int) -> None:
+        values = self.values
+        if n_values:
+            args = values[-n_values:]
+            del values[-n_values:]
+        else:
+            args = []
+        callback = self.callbacks.get(production)
+        if callback is not None:
+            values.append(callback(*args))
+        else:
+            values.append(args[0] if args else None)
+
+    def finish(self) -> None:
+        self.result = self.values[-1] if self.values else None
+        self.values = []
+
+
+def production_index(productions_enum, lhs: str, rhs: list) -> int:
+    """Índice de la producción lhs → rhs en enumerate_productions (para los callbacks)."""
+    for idx, p_lhs, p_rhs in productions_enum:
+        if p_lhs == lhs and list(p_rhs) == list(rhs):
+            return idx
+    raise KeyError(f"No existe la producción {lhs} → {' '.join(rhs)}")
@@ -1,3 +1,23 @@
+from packed_tables import ACCEPT, PackedTables
+import parse_trace
+from parse_tree import ParseTree
+
+# Tokens del lexer que el parser ignora
+SKIP_TOKENS = frozenset({"ws", "WHITESPACE", "WS", "TAB", "ENTER"})
+
+# Lo que cede lr_steps en modo push al pedir el siguiente token (las pausas
+# ceden tuplas)
+NEED_TOKEN = -1
+
+# Fin del iterador de tokens en lr_steps
+END_OF_TOKENS = (None, "$", "")
+
+# Cotas de la recuperación de errores: cada token descartado cuesta a lo sumo
+# un recorrido de la pila, así que con ambas el trabajo extra queda acotado
+MAX_ERRORS = 50
+MAX_DISCARDED = 1000
+
+
 def str_startswith(cadena: str, prefijo: str) -> bool:
     """Equivalente a str.startswith sin usar el método incorporado."""
     if len(prefijo) > len(cadena):
@@ -24,56 +44,136 @@ def simulate_slr_parser(
     productions_enum: list[tuple[int, str, list[str]]],
     token_stream,
     start_symbol: str,
+    verbose: bool = True,
+    recovery=None,
+    max_errors: int = MAX_ERRORS,
+    max_discarded: int = MAX_DISCARDED,
 ):
     """
-    Ejecuta un parser SLR(1) a partir de sus tablas ACTION/GOTO.
+    Ejecuta un parser SLR(1) a partir de sus tablas ACTION/GOTO, registrando
+    la traza completa (para el reporte). El driver de producción, con traza
+    opcional y sin costo si está apagada, es run_lr_parser.
 
     Parámetros
     ----------
-    action_table : dict
-        Tabla ACTION[state][token] = acción ("sX", "rY", "acc", None)
-    goto_table : dict
-        Tabla GOTO[state][NonTerminal] = next_state
+    action_table : dict | PackedTables
+        Tabla ACTION[state][token] = acción ("sX", "rY", "acc", None), o las
+        tablas comprimidas (PackedTables), que se consultan directamente
+    goto_table : dict | None
+        Tabla GOTO[state][NonTerminal] = next_state (se ignora con PackedTables)
     productions_enum : list[(idx, lhs, rhs)]
         Producciones enumeradas, donde rhs es lista de símbolos (puede ser [])
     token_stream : generador
         Produce tuplas (token, lexema) ya filtradas de espacios
     start_symbol : str
         Símbolo inicial original (no el aumentado)
+    verbose : bool
+        Imprime los mensajes de depuración y de recuperación de errores
+    recovery : dict | None
+        Destinos de recuperación por estado (SLR.compute_recovery_targets); sin
+        ellos el primer error es fatal
+    max_errors, max_discarded : int
+        Errores y tokens descartados tras los cuales se abandona el análisis
 
     Retorna
     -------
     accepted : bool
+        False si hubo algún error, aunque se haya recuperado
     acciones : list
         Tuplas con la traza de acciones ejecutadas
     error_msg : str | None
         Descripción del fallo si ocurre
     """
 
+    if isinstance(action_table, PackedTables):
+        action_of = action_table.action
+        goto_of = action_table.goto
+        # Estados consistentes: reducen sin consultar el lookahead
+        default_of = action_table.default_reduction
+    else:
+
+        def default_of(state):
+            return None
+
+        def action_of(state, token):
+            return action_table.get(state, {}).get(token)
+
+        def goto_of(state, nonterminal):
+            return goto_table[state][nonterminal]
+
     # Pila LR: 
     stack = [0]
     actions_log = []
     tokens = iter(token_stream)
 
+    # Pila con la que se acepta al llegar a "$": [0, S, GOTO(0, S)]
+    accept_stack = None
+    for _, lhs, rhs in productions_enum:
+        if str_endswith(lhs, "'") and rhs == [start_symbol]:
+            accept_stack = [0, rhs[0], goto_of(0, rhs[0])]
+            break
+
+    errors = 0
+    discarded = 0
+    position = 0  # tokens leídos
+    last_recovery_at = -1
+
     # Función interna para consumir el próximo token significativo
     def next_valid_token():
-        skip = {"ws", "WHITESPACE", "WS", "TAB", "ENTER"}
+        nonlocal position
+        position += 1
         while True:
             try:
                 tok, lex = next(tokens)
-                if tok not in skip:
+                if tok not in SKIP_TOKENS:
                     return tok, lex
             except StopIteration:
                 return "$", ""
 
+    def accepted_result():
+        if errors:
+            return False, actions_log, f"Se recuperó de {errors} errores sintácticos."
+        return True, actions_log, None
+
+    def fatal(state, token, mensaje):
+        actions_log.append(("fatal", state, token, "No recuperable"))
+        return False, actions_log, mensaje
+
+    def continues_after(depth, next_state, token):
+        """
+        True si, con la pila recortada a stack[:depth] y GOTO a `next_state`,
+        `token` llega a un shift (o a la aceptación) tras las reducciones que
+        dispare. Se simula sobre una copia de los estados; no toca la pila.
+        """
+        states = stack[0:depth:2]
+        states.append(next_state)
+        while True:
+            if token == "$" and states == accept_states:
+                return True
+            act = default_of(states[-1]) or action_of(states[-1], token)
+            if act is None:
+                return False
+            if act == "acc" or str_startswith(act, "s"):
+                return True
+            _, lhs, rhs = productions_enum[int(act[1:])]
+            if rhs:
+                del states[-len(rhs) :]
+            nxt = goto_of(states[-1], lhs)
+            if nxt is None:
+                return False
+            states.append(nxt)
+
+    accept_states = accept_stack[0::2] if accept_stack is not None else None
+
     lookahead_token, lookahead_lexeme = next_valid_token()
-    print(f"[DEBUG] Primer token: {lookahead_token} ('{lookahead_lexeme}')")
+    if verbose:
+        print(f"[DEBUG] Primer token: {lookahead_token} ('{lookahead_lexeme}')")
 
     # Bucle principal LR
     while True:
         state = stack[-1]
         current_token = lookahead_token or "$"
-        action = action_table.get(state, {}).get(current_token)
+        action = default_of(state) or action_of(state, current_token)
 
         while action and str_startswith(action, "r"):
             prod_num = int(action[1:])  # "r3" → 3
@@ -88,53 +188,78 @@ def simulate_slr_parser(
 
             prev_state = stack[-1]
             stack.append(lhs)
-            goto_state = goto_table[prev_state][lhs]
+            goto_state = goto_of(prev_state, lhs)
             stack.append(goto_state)
 
             state = goto_state
-            action = action_table.get(state, {}).get(current_token)
+            action = default_of(state) or action_of(state, current_token)
 
         
-        if lookahead_token == "$":
-            for _, lhs, rhs in productions_enum:
-                if str_endswith(lhs, "'") and rhs == [start_symbol]:
-                    if stack == [0, rhs[0], goto_table[0][rhs[0]]]:
-                        actions_log.append(("accept", stack[-1], "$"))
-                        return True, actions_log, None
-
-        # MANEJO DE ERRORES
+        if lookahead_token == "$" and stack == accept_stack:
+            actions_log.append(("accept", stack[-1], "$"))
+            return accepted_result()
+
+        # MANEJO DE ERRORES (modo pánico con los destinos de `recovery`)
         if action is None:
+            errors += 1
             mensaje = f"Error sintáctico en estado {state} con token '{current_token}'."
             actions_log.append(("error", state, current_token, mensaje))
-            print("[ERROR]", mensaje)
-
-            sync_tokens = {"SEMICOLON", "$", "ID", "LPAREN"}
+            if verbose:
+                print("[ERROR]", mensaje)
+            if recovery is None:
+                return fatal(state, current_token, mensaje)
+            if errors > max_errors:
+                return fatal(state, current_token, "Error fatal: demasiados errores.")
 
-            while lookahead_token not in sync_tokens:
+            # Sin avance desde la recuperación anterior: descartar el token
+            # para no repetir el mismo error
+            if position == last_recovery_at:
+                if lookahead_token == "$":
+                    return fatal(state, current_token, "Error fatal: no se pudo recuperar.")
                 lookahead_token, lookahead_lexeme = next_valid_token()
-                print(
-                    f"[RECOVERY] Descartando → {lookahead_token} ('{lookahead_lexeme}')"
-                )
-
-            recovered = False
-            for i in range(len(stack) - 1, -1, -2):
-                st = stack[i]
-                posible = action_table.get(st, {}).get(lookahead_token)
-                if posible and not str_startswith(posible, "r"):
-                    stack = stack[: i + 1]  # cortar la pila
-                    recovered = True
-                    break
+                discarded += 1
 
-            if not recovered:
-                actions_log.append(("fatal", state, current_token, "No recuperable"))
-                return False, actions_log, "Error fatal: no se pudo recuperar."
+            # Buscar, del tope hacia el fondo de la pila, un estado cuyo destino
+            # para el lookahead lo lleve de verdad a un shift (o a aceptar);
+            # si ninguno sirve, descartar el token y volver a buscar
+            target = None
+            while True:
+                for top in range(len(stack) - 1, -1, -2):
+                    candidate = recovery.get(stack[top], {}).get(lookahead_token)
+                    if candidate is not None and continues_after(
+                        top + 1, candidate[1], lookahead_token
+                    ):
+                        target = candidate
+                        del stack[top + 1 :]
+                        break
+                if target is not None or lookahead_token == "$":
+                    break
+                if discarded >= max_discarded:
+                    break
+                lookahead_token, lookahead_lexeme = next_valid_token()
+                discarded += 1
+                if verbose:
+                    print(
+                        f"[RECOVERY] Descartando → {lookahead_token} ('{lookahead_lexeme}')"
+                    )
 
+            if target is None:
+                if discarded >= max_discarded:
+                    mensaje = "Error fatal: demasiados tokens descartados."
+                else:
+                    mensaje = "Error fatal: no se pudo recuperar."
+                return fatal(state, current_token, mensaje)
+            nonterminal, next_state = target
+            actions_log.append(("recover", stack[-1], nonterminal, next_state))
+            stack.append(nonterminal)
+            stack.append(next_state)
+            last_recovery_at = position
             continue
 
         # ACEPTACIÓN 
         if action == "acc":
             actions_log.append(("accept", state, current_token))
-            return True, actions_log, None
+            return accepted_result()
 
         # SHIFT
         if str_startswith(action, "s"):
@@ -146,3 +271,381 @@ def simulate_slr_parser(
 
             lookahead_token, lookahead_lexeme = next_valid_token()
             continue
+
+
+def run_lr_parser(
+    packed: PackedTables, token_stream, trace=None, tree=None, semantics=None
+):
+    """
+    Driver LR de producción sobre las tablas comprimidas: trabaja con los
+    códigos enteros de packed_tables (s + 1 shift, -(r + 1) reduce, 0 error)
+    sin decodificarlos a "sN"/"rN", con una pila solo de estados y las
+    longitudes/cabezas de las producciones en packed.rhs_len / packed.lhs_id.
+
+    No se recupera de errores: se detiene en el primero. `trace` es None (sin
+    traza ni costo por paso) o un contenedor de parse_trace.make_trace, al que
+    se agregan registros enteros; format_record los vuelve legibles. `tree`
+    es None o un parse_tree.ParseTree que recibe cada shift/reduce, y
+    `semantics` es None o un semantics.SemanticStack que evalúa los callbacks
+    de cada producción al reducir.
+
+    Retorna (accepted, error_msg).
+    """
+    steps = lr_steps(packed, token_stream, trace, tree, semantics)
+    try:
+        while True:
+            next(steps)
+    except StopIteration as stop:
+        return stop.value
+
+
+def lr_steps(
+    packed: PackedTables,
+    token_stream,
+    trace=None,
+    tree=None,
+    semantics=None,
+    pause_after=None,
+):
+    """
+    Bucle de run_lr_parser como generador: si `pause_after[k]` es verdadero,
+    cede (k, shifted) justo después de reducir la producción k (ya con el
+    GOTO, el árbol y los valores actualizados), lo que usa parse_statements
+    para entregar cada sentencia. `shifted` indica si el último token leído
+    ya se desplazó (la reducción fue por defecto, tras un shift) o si todavía
+    es el lookahead. Al terminar retorna (accepted, error_msg).
+
+    Con token_stream=None los tokens no se piden a un iterador sino que llegan
+    por send((token, lexema)): el generador cede NEED_TOKEN cada vez que
+    necesita el siguiente, y "$" cierra la entrada (ver PushParser).
+
+    En ambos modos, después de cada shift se aplican las reducciones por
+    defecto del estado alcanzado antes de pedir el siguiente token.
+    """
+    if len(packed.rhs_len) == 0:
+        raise ValueError("Las tablas comprimidas no incluyen las producciones")
+    terminal_index = packed.terminal_index
+    default_reduce = packed.default_reduce
+    rhs_len = packed.rhs_len
+    lhs_id = packed.lhs_id
+
+    a_row_of = packed.action_pack["row_of"]
+    a_base = packed.action_pack["base"]
+    a_check = packed.action_pack["check"]
+    a_value = packed.action_pack["value"]
+    a_default = packed.action_pack["default"]
+    a_size = len(a_check)
+    g_row_of = packed.goto_pack["row_of"]
+    g_base = packed.goto_pack["base"]
+    g_check = packed.goto_pack["check"]
+    g_value = packed.goto_pack["value"]
+    g_default = packed.goto_pack["default"]
+    g_size = len(g_check)
+
+    def terminal_ids():
+        for tok, lexeme in token_stream:
+            if tok not in SKIP_TOKENS:
+                yield terminal_index.get(tok, -1), tok, lexeme
+        yield terminal_index["$"], "$", ""
+
+    record = trace.append if trace is not None else None
+
+    tokens = terminal_ids() if token_stream is not None else None
+    stack = [0]
+    push = stack.append
+    while True:
+        if tokens is not None:
+            t, tok, lexeme = next(tokens, END_OF_TOKENS)
+            if t is None:
+                break
+        else:
+            tok, lexeme = yield NEED_TOKEN
+            if tok in SKIP_TOKENS:
+                continue
+            t = terminal_index.get(tok, -1)
+        if t < 0:
+            if record is not None:
+                record((parse_trace.ERROR, stack[-1], -1, 0))
+            return False, f"Token desconocido '{tok}'."
+        while True:
+            state = stack[-1]
+            code = default_reduce[state]
+            if not code:
+                if t is None:
+                    break  # después de un shift: pedir el siguiente token
+                f = a_row_of[state]
+                pos = a_base[f] + t
+                if pos < a_size and a_check[pos] == f:
+                    code = a_value[pos]
+                else:
+                    code = a_default[f]
+
+            if code > 0:  # shift
+                if record is not None:
+                    record((parse_trace.SHIFT, state, t, code - 1))
+                if tree is not None:
+                    tree.shift(t)
+                if semantics is not None:
+                    semantics.shift(lexeme)
+                push(code - 1)
+                # las reducciones por defecto del estado alcanzado se aplican
+                # antes de pedir el siguiente token
+                t = None
+                continue
+            if code == ACCEPT:
+                if tok == "$":
+                    if record is not None:
+                        record((parse_trace.ACCEPT, state, 0, 0))
+                    if tree is not None:
+                        tree.finish()
+                    if semantics is not None:
+                        semantics.finish()
+                    return True, None
+                code = 0
+            if code == 0:
+                if record is not None:
+                    record((parse_trace.ERROR, state, t, 0))
+                return False, f"Error sintáctico en estado {state} con token '{tok}'."
+
+            # reduce: desapilar |rhs| estados y apilar GOTO(tope, lhs)
+            prod = -code - 1
+            if record is not None:
+                record((parse_trace.REDUCE, state, prod, 0))
+            n = rhs_len[prod]
+            if tree is not None:
+                tree.reduce(prod, n)
+            if semantics is not None:
+                semantics.reduce(prod, n)
+            if n:
+                del stack[-n:]
+            f = g_row_of[stack[-1]]
+            pos = g_base[f] + lhs_id[prod]
+            if pos < g_size and g_check[pos] == f:
+                push(g_value[pos] - 1)
+            else:
+                push(g_default[f] - 1)
+            if pause_after is not None and pause_after[prod]:
+                yield prod, t is None
+
+    return False, "Fin de entrada inesperado."
+
+
+class PushParser:
+    """
+    Parser LR que recibe los tokens de a uno (estilo push) en lugar de
+    pedirlos a un iterador: feed(token, lexema) / feed_many(tokens) avanzan
+    el análisis y conservan la pila entre llamadas, y finish() entrega "$".
+    Usa las mismas tablas comprimidas y los mismos `trace`, `tree` y
+    `semantics` opcionales que run_lr_parser.
+
+    Es lr_steps en modo push: cada token se le entrega con send(), así que el
+    comportamiento es el de run_lr_parser. Después de cada shift se aplican
+    las reducciones por defecto del estado alcanzado sin esperar al
+    siguiente token. feed() retorna
+    False desde el primer error (su mensaje queda en `error`) y también
+    después de aceptar: a partir de ahí se ignora la entrada.
+    """
+
+    def __init__(self, packed: PackedTables, trace=None, tree=None, semantics=None):
+        self.packed = packed
+        self.accepted = False
+        self.error = None
+        self._steps = lr_steps(packed, None, trace, tree, semantics)
+        next(self._steps)
+
+    @property
+    def done(self) -> bool:
+        return self.accepted or self.error is not None
+
+    def feed(self, token: str, lexeme: str = "") -> bool:
+        """Procesa un token; retorna False ante un error o si el análisis ya terminó."""
+        if self.done:
+            return False
+        try:
+            self._steps.send((token, lexeme))
+        except StopIteration as stop:
+            self.accepted, self.error = stop.value
+            return self.accepted
+        return True
+
+    def feed_many(self, tokens) -> bool:
+        """Procesa (token, lexema) en orden; se detiene en el primer error."""
+        for token, lexeme in tokens:
+            if not self.feed(token, lexeme):
+                return False
+        return True
+
+    def finish(self):
+        """Entrega el fin de entrada; retorna (accepted, error_msg) como run_lr_parser."""
+        if not self.done:
+            self.feed("$")
+        return self.accepted, self.error
+
+
+def list_element(symbol: str, bodies: dict):
+    """
+    X si `symbol` es una lista (secuencia) de X, con separadores terminales:
+    recursiva a izquierda (L → L X | X), a derecha (L → X L | X) o con una
+    cola aparte (L → X T | X, T → ; X T | ; X). Si no, None.
+    """
+    element = None
+    recursive = False
+    for rhs in bodies[symbol]:
+        inner = [sym for sym in rhs if sym in bodies]
+        if symbol in inner:
+            recursive = True
+            inner.remove(symbol)
+        if not inner or (element is not None and inner[0] != element):
+            return None
+        element = inner[0]
+        if len(inner) > 2:
+            return None
+        if len(inner) == 2:
+            tail = inner[1]
+            if tail == element or list_element(tail, bodies) != element:
+                return None
+            recursive = True
+    return element if recursive else None
+
+
+def statement_symbols(productions_enum, start_symbol: str) -> set:
+    """
+    No terminales que cuentan como sentencia de nivel superior por defecto:
+    el elemento X de la lista S → S X | X (la que parse_yalp_file agrega
+    sobre "general"/"p"). Si X solo envuelve a otra lista (p → t, con
+    t → m q | m y q → ; m q | ; m), se baja hasta el elemento de esa lista
+    para no tomar el archivo completo como una sola sentencia. Si S no es una
+    lista, el propio símbolo inicial.
+    """
+    bodies = {}
+    for _, lhs, rhs in productions_enum:
+        bodies.setdefault(lhs, []).append(list(rhs))
+
+    def unwrap(symbol):
+        # A → B como única producción: A es solo un envoltorio de B
+        seen = set()
+        while (
+            symbol not in seen
+            and len(bodies[symbol]) == 1
+            and len(bodies[symbol][0]) == 1
+            and bodies[symbol][0][0] in bodies
+        ):
+            seen.add(symbol)
+            symbol = bodies[symbol][0][0]
+        return symbol
+
+    element = list_element(start_symbol, bodies) if start_symbol in bodies else None
+    if element is None:
+        return {start_symbol}
+    seen = {start_symbol}
+    while element not in seen:
+        seen.add(element)
+        inner = unwrap(element)
+        if inner == element:
+            break
+        nested = list_element(inner, bodies)
+        if nested is None:
+            break
+        element = nested
+    return {element}
+
+
+def parse_statements(
+    packed: PackedTables,
+    productions_enum,
+    token_stream,
+    statements,
+    trace_mode: str = "off",
+    trace_size: int = 1000,
+    trace_path=None,
+    build_tree: bool = False,
+    semantics=None,
+):
+    """
+    Análisis en streaming sobre run_lr_parser: genera un diccionario por cada
+    sentencia (cada reducción de un no terminal de `statements`) en cuanto se
+    reduce, con
+        index   número de sentencia
+        tokens  [(token, lexema)] leídos desde la sentencia anterior
+        trace   registros de traza de la sentencia (salvo en modo "stream",
+                que los escribe en `trace_path`)
+        tree    ParseTree de la sentencia (índices de token relativos a tokens)
+        value   valor semántico de la sentencia (con `semantics`)
+        error   None, o el mensaje del error en el último diccionario
+
+    Tras entregar una sentencia se liberan sus tokens, traza, árbol y valor,
+    así que la memoria queda acotada por la sentencia más grande (más la pila
+    LR, que en una lista recursiva a izquierda no crece). `token_stream` puede
+    venir de lexer.lex_file para no cargar el archivo completo.
+    """
+    pause = bytearray(len(productions_enum))
+    for idx, lhs, _ in productions_enum:
+        if lhs in statements:
+            pause[idx] = 1
+    trace = parse_trace.make_trace(trace_mode, trace_size, trace_path)
+    tree = ParseTree(packed.terminals, productions_enum) if build_tree else None
+
+    pending = []  # tokens leídos desde la última sentencia entregada
+    exhausted = False
+
+    def significant_tokens():
+        nonlocal exhausted
+        for tok, lexeme in token_stream:
+            if tok not in SKIP_TOKENS:
+                pending.append((tok, lexeme))
+                yield tok, lexeme
+        exhausted = True
+
+    steps = lr_steps(packed, significant_tokens(), trace, tree, semantics, pause)
+    index = 0
+    token_base = 0
+    try:
+        while True:
+            try:
+                _, shifted = next(steps)
+            except StopIteration as stop:
+                accepted, error = stop.value
+                break
+
+            # Salvo al final de la entrada o si ya se desplazó, el último token
+            # leído es el lookahead con el que se redujo: pertenece a la
+            # sentencia siguiente
+            if exhausted or shifted:
+                statement_tokens = pending[:]
+                pending.clear()
+            else:
+                statement_tokens = pending[:-1]
+                del pending[:-1]
+
+            result = {
+                "index": index,
+                "tokens": statement_tokens,
+                "trace": None,
+                "tree": None,
+                "value": None,
+                "error": None,
+            }
+            if trace is not None and trace_mode != "stream":
+                result["trace"] = list(trace)
+                trace.clear()
+            if tree is not None:
+                result["tree"] = tree.split_statement(token_base)
+            if semantics is not None:
+                result["value"] = semantics.values[-1]
+                semantics.values[-1] = None
+            token_base += len(statement_tokens)
+            index += 1
+            yield result
+    finally:
+        if trace_mode == "stream":
+            trace.close()
+
+    if not accepted:
+        yield {
+            "index": index,
+            "tokens": pending[:],
+            "trace": list(trace) if trace is not None and trace_mode != "stream" else None,
+            "tree": None,
+            "value": None,
+            "error": error,
+        }